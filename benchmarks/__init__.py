@@ -0,0 +1,5 @@
+"""Performance benchmarks for Spendly.
+
+Run individual benchmarks as modules from the repository root, e.g.
+``python -m benchmarks.bench_serialization``.
+"""
@@ -0,0 +1,373 @@
+"""End-to-end API benchmark: realistic request mixes against the real app.
+
+Seeds a fresh SQLite database at the requested scale (users, groups, members
+per group, expenses and chat messages per group), then drives the FastAPI app
+in-process through httpx's ASGI transport, with every middleware, dependency
+and serializer on the path. Closed-loop clients repeatedly pick a flow by
+weight, as a random member of a random group:
+
+- dashboard: the dashboard poll (group summaries, the group, its expenses)
+- chat_send: send a chat message, then reload the group's messages
+- expense_create: an expense chat message parsed by a stub LLM (no network;
+  ``--llm-latency-ms`` stands in for the model's response time)
+- breakdown: the group's balance breakdown
+- history: the group's messages, then pages of its expenses and ledger feed
+
+Throughput and p50/p95/p99 latency are reported per route and per flow.
+Results are saved as JSON with ``--json``; ``--compare`` prints the change
+against an earlier results file.
+
+Usage:
+    python -m benchmarks.bench_api --users 500 --groups 100 --members 5 --expenses 200 --flows 2000
+    python -m benchmarks.bench_api --json after.json --compare before.json
+    python -m benchmarks.bench_api --shards 4 --single-writer
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .bench_login import percentiles
+
+# (flow, weight)
+FLOW_MIX: List[Tuple[str, int]] = [
+    ("dashboard", 40),
+    ("chat_send", 20),
+    ("expense_create", 10),
+    ("breakdown", 15),
+    ("history", 15),
+]
+
+HISTORY_PAGES = 3
+HISTORY_PAGE_SIZE = 20
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--members", type=int, default=5, help="Members per group")
+    parser.add_argument("--expenses", type=int, default=200, help="Seed expenses per group")
+    parser.add_argument("--messages", type=int, default=200, help="Seed chat messages per group")
+    parser.add_argument("--flows", type=int, default=2000, help="Measured flows")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured flows run first")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Stub LLM response time")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--profile", default="performance", help="DB_PROFILE (SQLite pragma profile)")
+    parser.add_argument("--shards", type=int, default=0, help="SHARD_COUNT (0 = single database)")
+    parser.add_argument("--single-writer", action="store_true", help="DB_SINGLE_WRITER")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+    if args.members > args.users:
+        parser.error("--members cannot exceed --users")
+    return args
+
+
+def seed(args: argparse.Namespace) -> List[List[int]]:
+    """Create users, groups, memberships, expenses with splits and chat messages.
+
+    Returns each group's member IDs (group ``g`` has ID ``g + 1``). Rollups
+    and the ledger journal are backfilled by the app's startup, as for a
+    database that predates them.
+    """
+    from src.spendly.core.database import SessionLocal, create_tables
+    from src.spendly.models import User, Group, GroupMember, Expense, ExpenseSplit, ChatMessage
+
+    create_tables()
+    db = SessionLocal()
+    rng = random.Random(args.seed)
+    db.add_all([
+        User(name=f"Bench {i}", email=f"bench{i}@example.com", hashed_password="x")
+        for i in range(args.users)
+    ])
+    db.flush()
+    user_ids = list(range(1, args.users + 1))
+    started = datetime.utcnow() - timedelta(days=365)
+
+    members_by_group: List[List[int]] = []
+    for g in range(args.groups):
+        group = Group(name=f"Group {g}")
+        db.add(group)
+        db.flush()
+        members = rng.sample(user_ids, args.members)
+        members_by_group.append(members)
+        db.add_all(GroupMember(group_id=group.id, user_id=member) for member in members)
+
+        expenses = []
+        for n in range(args.expenses):
+            expenses.append(Expense(
+                description=rng.choice(["dinner", "taxi", "groceries", "rent", "tickets", "coffee"]),
+                amount=round(rng.uniform(5, 200), 2),
+                paid_by=rng.choice(members),
+                group_id=group.id,
+                original_message="seed",
+                created_at=started + timedelta(minutes=n * 525600 // max(1, args.expenses))
+            ))
+        db.add_all(expenses)
+        db.flush()
+        splits = []
+        for expense in expenses:
+            participants = rng.sample(members, rng.randint(1, len(members)))
+            splits.extend(
+                ExpenseSplit(expense_id=expense.id, user_id=member, amount=expense.amount / len(participants))
+                for member in participants
+            )
+        db.add_all(splits)
+        db.add_all(
+            ChatMessage(
+                group_id=group.id,
+                user_id=rng.choice(members),
+                message=f"message {n}",
+                message_type="user",
+                created_at=started + timedelta(minutes=n)
+            )
+            for n in range(args.messages)
+        )
+        db.commit()
+    db.close()
+    return members_by_group
+
+
+class StubResponse:
+    """The parts of a Gemini response the parser reads."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class StubModel:
+    """Stands in for the Gemini model: answers every prompt with a parsed expense."""
+
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    async def generate_content_async(self, prompt: str) -> StubResponse:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return StubResponse(json.dumps({
+            "description": "bench lunch",
+            "amount": 30.0,
+            "paid_by": "me",
+            "expense_type": "split",
+            "splits": [{"user": "me", "amount": 30.0}],
+        }))
+
+
+def install_stub_llm(latency_ms: float) -> None:
+    """Point the Gemini service at the stub model."""
+    from src.spendly.services.gemini import get_gemini_service
+
+    gemini_service = get_gemini_service()
+    gemini_service.model = StubModel(latency_ms)
+    gemini_service.model_name = "bench-stub"
+
+
+def build_schedule(args: argparse.Namespace, flows: int, offset: int = 0) -> List[Tuple[str, int]]:
+    """Pick (flow, group index) for every flow, identical across runs with the same seed."""
+    rng = random.Random(args.seed + offset)
+    names = [name for name, _ in FLOW_MIX]
+    weights = [weight for _, weight in FLOW_MIX]
+    return [(rng.choices(names, weights)[0], rng.randrange(args.groups)) for _ in range(flows)]
+
+
+class Recorder:
+    """Per-route and per-flow latency samples, plus failed requests."""
+
+    def __init__(self):
+        self.routes: Dict[str, List[float]] = {}
+        self.flows: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def request(self, client: Any, route: str, method: str, url: str, **kwargs: Any) -> Any:
+        """Send one request, timing it under ``route`` ("METHOD /template")."""
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.routes.setdefault(route, []).append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        return response
+
+
+async def run_flow(client: Any, recorder: Recorder, name: str, group_id: int, headers: Dict[str, str]) -> None:
+    """Issue one flow's requests in order, as the browser would."""
+    if name == "dashboard":
+        await recorder.request(client, "GET /api/groups/summary", "GET", "/api/groups/summary", headers=headers)
+        await recorder.request(client, "GET /api/groups/{group_id}", "GET", f"/api/groups/{group_id}",
+                               headers=headers)
+        await recorder.request(client, "GET /api/expenses/", "GET", "/api/expenses/",
+                               params={"group_id": group_id, "limit": 100}, headers=headers)
+    elif name == "chat_send":
+        await recorder.request(client, "POST /api/groups/{group_id}/send-message", "POST",
+                               f"/api/groups/{group_id}/send-message", json={"message": "see you there"},
+                               headers=headers)
+        await recorder.request(client, "GET /api/groups/{group_id}/messages", "GET",
+                               f"/api/groups/{group_id}/messages", headers=headers)
+    elif name == "expense_create":
+        response = await recorder.request(client, "POST /api/expenses/", "POST", "/api/expenses/",
+                                          json={"message": "I paid $30 for lunch", "group_id": group_id},
+                                          headers=headers)
+        if response.status_code < 400 and not response.json().get("success"):
+            recorder.errors["POST /api/expenses/"] = recorder.errors.get("POST /api/expenses/", 0) + 1
+    elif name == "breakdown":
+        await recorder.request(client, "GET /api/groups/{group_id}/breakdown", "GET",
+                               f"/api/groups/{group_id}/breakdown", headers=headers)
+    else:
+        await recorder.request(client, "GET /api/groups/{group_id}/messages", "GET",
+                               f"/api/groups/{group_id}/messages", headers=headers)
+        for page in range(HISTORY_PAGES):
+            await recorder.request(client, "GET /api/expenses/", "GET", "/api/expenses/", params={
+                "group_id": group_id, "skip": page * HISTORY_PAGE_SIZE, "limit": HISTORY_PAGE_SIZE
+            }, headers=headers)
+        after_seq = 0
+        for _ in range(HISTORY_PAGES):
+            response = await recorder.request(
+                client, "GET /api/groups/{group_id}/ledger", "GET", f"/api/groups/{group_id}/ledger",
+                params={"after_seq": after_seq, "limit": HISTORY_PAGE_SIZE * 5}, headers=headers
+            )
+            if response.status_code >= 400:
+                break
+            after_seq = response.json()["last_seq"]
+
+
+async def run_clients(client: Any, recorder: Recorder, schedule: List[Tuple[str, int]],
+                      members_by_group: List[List[int]], tokens: Dict[int, str], concurrency: int,
+                      seed: int) -> float:
+    """Work through the schedule with ``concurrency`` closed-loop clients; return the elapsed seconds."""
+    rng = random.Random(seed)
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in schedule:
+        queue.put_nowait(item)
+
+    async def client_loop() -> None:
+        while not queue.empty():
+            name, group_index = queue.get_nowait()
+            headers = {"Authorization": f"Bearer {tokens[rng.choice(members_by_group[group_index])]}"}
+            started = time.perf_counter()
+            await run_flow(client, recorder, name, group_index + 1, headers)
+            recorder.flows.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def summarize(samples: Dict[str, List[float]], elapsed: float, errors: Optional[Dict[str, int]] = None) -> Dict:
+    """Throughput, percentiles and errors for each route or flow."""
+    summary = {}
+    for name, latencies in sorted(samples.items()):
+        summary[name] = {"count": len(latencies), "throughput_per_s": len(latencies) / elapsed}
+        summary[name].update(percentiles(latencies))
+        if errors is not None:
+            summary[name]["errors"] = errors.get(name, 0)
+    return summary
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    import httpx
+    from main import app
+    from src.spendly.services.auth import AuthService
+    from src.spendly.models import User
+
+    seed_started = time.perf_counter()
+    members_by_group = seed(args)
+    seed_elapsed = time.perf_counter() - seed_started
+    install_stub_llm(args.llm_latency_ms)
+    # Tokens are minted directly: login (bcrypt) is measured by bench_login
+    member_ids = sorted({member for members in members_by_group for member in members})
+    tokens = {
+        user_id: AuthService.create_user_token(User(id=user_id, email=f"bench{user_id - 1}@example.com"))
+        for user_id in member_ids
+    }
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            if args.warmup:
+                await run_clients(client, Recorder(), build_schedule(args, args.warmup, offset=1),
+                                  members_by_group, tokens, args.concurrency, args.seed + 1)
+            recorder = Recorder()
+            elapsed = await run_clients(client, recorder, build_schedule(args, args.flows),
+                                        members_by_group, tokens, args.concurrency, args.seed)
+
+    requests = sum(len(latencies) for latencies in recorder.routes.values())
+    return {
+        "seed_s": seed_elapsed,
+        "elapsed_s": elapsed,
+        "flows_per_s": args.flows / elapsed,
+        "requests_per_s": requests / elapsed,
+        "errors": sum(recorder.errors.values()),
+        "routes": summarize(recorder.routes, elapsed, recorder.errors),
+        "flows": summarize(recorder.flows, elapsed),
+    }
+
+
+def environment() -> Dict[str, str]:
+    """What the results were measured on, for comparing runs."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def print_table(title: str, stats: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None) -> None:
+    print(f"{title:44} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+          + (f" {'p99 vs base':>12}" if baseline is not None else ""))
+    for name, row in stats.items():
+        line = (f"{name:44} {row['count']:6d} {row['throughput_per_s']:8.1f} {row['p50_ms']:8.1f} "
+                f"{row['p95_ms']:8.1f} {row['p99_ms']:8.1f}")
+        if baseline is not None:
+            before = baseline.get(name, {}).get("p99_ms")
+            line += f" {(row['p99_ms'] - before) / before * 100:+11.1f}%" if before else f" {'-':>12}"
+        print(line)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="spendly-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DB_PROFILE"] = args.profile
+    os.environ["SHARD_COUNT"] = str(args.shards)
+    os.environ["SHARD_URL_TEMPLATE"] = f"sqlite:///{os.path.join(workdir, 'shard{index}.db')}"
+    os.environ["SHARD_MAP_URL"] = f"sqlite:///{os.path.join(workdir, 'shardmap.db')}"
+    os.environ["DB_SINGLE_WRITER"] = str(args.single_writer)
+    os.environ["RATE_LIMIT_ENABLED"] = "false"  # Every request comes from one client
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.path.insert(0, os.getcwd())
+
+    results = asyncio.run(main(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)["results"]
+
+    print(f"seeded in {results['seed_s']:.1f} s; {results['flows_per_s']:.1f} flows/s, "
+          f"{results['requests_per_s']:.1f} requests/s, {results['errors']} errors")
+    if baseline is not None:
+        change = (results["requests_per_s"] - baseline["requests_per_s"]) / baseline["requests_per_s"] * 100
+        print(f"requests/s vs {args.compare}: {change:+.1f}%")
+    print()
+    print_table("route", results["routes"], baseline and baseline.get("routes"))
+    print()
+    print_table("flow", results["flows"], baseline and baseline.get("flows"))
+    if args.json_path:
+        with open(args.json_path, "w") as handle:
+            json.dump({"args": vars(args), "environment": environment(), "results": results}, handle, indent=2)
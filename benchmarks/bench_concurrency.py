@@ -0,0 +1,245 @@
+"""Mixed read/write concurrency benchmark: sync sessions vs the async DB layer.
+
+Replays the same schedule of CRUD operations twice, arriving at a fixed rate
+(open loop, like independent clients):
+
+1. sync: each operation opens a Session and calls CRUDService directly from the
+   coroutine, as the routes did before the async layer, so every query blocks
+   the event loop.
+2. async: each operation opens an AsyncSession and awaits AsyncCRUDService;
+   reads use the read-only pool, as GET routes do.
+
+The mix is weighted towards reads (group breakdowns, chat history, groups with
+members, filtered expense lists) with chat-message and expense writes. Latency is
+measured from each operation's scheduled arrival to its completion, so time spent
+waiting behind a blocked event loop counts. Percentiles are reported overall and
+per operation, together with event-loop lag.
+
+Usage:
+    python -m benchmarks.bench_concurrency --groups 20 --expenses 200 --ops 2000 --rate 150
+    python -m benchmarks.bench_concurrency --profile default   # stock SQLite pragmas
+    python -m benchmarks.bench_concurrency --shards 4          # group data across 4 SQLite files
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from .bench_login import percentiles
+
+# (operation, weight)
+OPERATION_MIX: List[Tuple[str, int]] = [
+    ("breakdown", 20),
+    ("chat_history", 25),
+    ("group", 15),
+    ("expenses", 15),
+    ("chat_message", 20),
+    ("expense", 5),
+]
+WRITE_OPERATIONS = frozenset({"chat_message", "expense"})
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--members", type=int, default=5, help="Members per group")
+    parser.add_argument("--expenses", type=int, default=200, help="Seed expenses per group")
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=150.0, help="Operation arrivals per second")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--profile", default="performance", help="DB_PROFILE (SQLite pragma profile)")
+    parser.add_argument("--shards", type=int, default=0, help="SHARD_COUNT (0 = single database)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args()
+
+
+def seed(args: argparse.Namespace) -> None:
+    """Create users, groups and expenses with splits (bulk inserts, no rollups needed)."""
+    from src.spendly.core.database import SessionLocal, create_tables
+    from src.spendly.models import User, Group, GroupMember, Expense, ExpenseSplit
+
+    create_tables()
+    db = SessionLocal()
+    rng = random.Random(args.seed)
+    users = [
+        User(name=f"Bench {i}", email=f"bench{i}@example.com", hashed_password="x")
+        for i in range(args.groups * args.members)
+    ]
+    db.add_all(users)
+    db.flush()
+    for g in range(args.groups):
+        group = Group(name=f"Group {g}")
+        db.add(group)
+        db.flush()
+        members = users[g * args.members:(g + 1) * args.members]
+        db.add_all(GroupMember(group_id=group.id, user_id=member.id) for member in members)
+        for _ in range(args.expenses):
+            amount = round(rng.uniform(5, 200), 2)
+            expense = Expense(
+                description=rng.choice(["dinner", "taxi", "groceries", "rent", "tickets"]),
+                amount=amount,
+                paid_by=rng.choice(members).id,
+                group_id=group.id,
+                original_message="seed"
+            )
+            db.add(expense)
+            db.flush()
+            db.add_all(
+                ExpenseSplit(expense_id=expense.id, user_id=member.id, amount=amount / len(members))
+                for member in members
+            )
+    db.commit()
+    db.close()
+
+
+def build_schedule(args: argparse.Namespace) -> List[Tuple[str, int]]:
+    """Pick (operation, group ID) for every op, identical for both scenarios."""
+    rng = random.Random(args.seed)
+    names = [name for name, _ in OPERATION_MIX]
+    weights = [weight for _, weight in OPERATION_MIX]
+    return [(rng.choices(names, weights)[0], rng.randint(1, args.groups)) for _ in range(args.ops)]
+
+
+def expense_data(group_id: int, members: int) -> Dict:
+    first_member = (group_id - 1) * members + 1
+    return {
+        "description": "bench",
+        "amount": 30.0,
+        "paid_by": first_member,
+        "group_id": group_id,
+        "split_among": "all",
+    }
+
+
+def sync_operation(args: argparse.Namespace) -> Callable[[str, int], Awaitable[None]]:
+    from src.spendly.core.database import SessionLocal
+    from src.spendly.schemas import ExpenseFilter
+    from src.spendly.services.crud import CRUDService
+
+    async def run(name: str, group_id: int) -> None:
+        db = SessionLocal()
+        try:
+            if name == "breakdown":
+                CRUDService.get_group_breakdown(db, group_id)
+            elif name == "chat_history":
+                messages = CRUDService.get_chat_messages(db, group_id)
+                CRUDService.get_user_names(db, [message.user_id for message in messages])
+            elif name == "group":
+                CRUDService.get_group(db, group_id)
+            elif name == "expenses":
+                CRUDService.query_expenses(db, ExpenseFilter(group_id=group_id), limit=20)
+            elif name == "chat_message":
+                CRUDService.create_chat_message(db, group_id, (group_id - 1) * args.members + 1, "hi")
+            else:
+                CRUDService.create_expense(db, expense_data(group_id, args.members), "bench")
+        finally:
+            db.close()
+
+    return run
+
+
+def async_operation(args: argparse.Namespace) -> Callable[[str, int], Awaitable[None]]:
+    from src.spendly.core.database import AsyncSessionLocal, AsyncReadSessionLocal
+    from src.spendly.schemas import ExpenseFilter
+    from src.spendly.services.async_crud import AsyncCRUDService
+
+    async def run(name: str, group_id: int) -> None:
+        factory = AsyncSessionLocal if name in WRITE_OPERATIONS else AsyncReadSessionLocal
+        async with factory() as db:
+            if name == "breakdown":
+                await AsyncCRUDService.get_group_breakdown(db, group_id)
+            elif name == "chat_history":
+                messages = await AsyncCRUDService.get_chat_messages(db, group_id)
+                await AsyncCRUDService.get_user_names(db, [message.user_id for message in messages])
+            elif name == "group":
+                await AsyncCRUDService.get_group(db, group_id)
+            elif name == "expenses":
+                await AsyncCRUDService.query_expenses(db, ExpenseFilter(group_id=group_id), limit=20)
+            elif name == "chat_message":
+                await AsyncCRUDService.create_chat_message(db, group_id, (group_id - 1) * args.members + 1, "hi")
+            else:
+                await AsyncCRUDService.create_expense(db, expense_data(group_id, args.members), "bench")
+
+    return run
+
+
+async def run_scenario(operation: Callable[[str, int], Awaitable[None]], schedule: List[Tuple[str, int]],
+                       rate: float) -> Dict:
+    """Start operation i at i / rate seconds; report latency from arrival and event-loop lag."""
+    latencies: List[float] = []
+    per_operation: Dict[str, List[float]] = {}
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        interval = 0.005
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, (time.perf_counter() - started - interval) * 1000))
+
+    async def one(index: int, arrival: float) -> None:
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        name, group_id = schedule[index]
+        await operation(name, group_id)
+        elapsed = (time.perf_counter() - arrival) * 1000
+        latencies.append(elapsed)
+        per_operation.setdefault(name, []).append(elapsed)
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, started + i / rate) for i in range(len(schedule))))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker_task
+
+    result = {"throughput_per_s": len(schedule) / elapsed, "elapsed_s": elapsed}
+    result.update({f"latency_{k}": v for k, v in percentiles(latencies).items()})
+    result.update({f"loop_lag_{k}": v for k, v in percentiles(lags).items()})
+    result["operations"] = {name: percentiles(samples) for name, samples in sorted(per_operation.items())}
+    return result
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    from src.spendly.core.database import dispose_engines
+
+    seed(args)
+    schedule = build_schedule(args)
+    results = {
+        "sync": await run_scenario(sync_operation(args), schedule, args.rate),
+        "async": await run_scenario(async_operation(args), schedule, args.rate),
+    }
+    await dispose_engines()
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="spendly-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DB_PROFILE"] = args.profile
+    os.environ["SHARD_COUNT"] = str(args.shards)
+    os.environ["SHARD_URL_TEMPLATE"] = f"sqlite:///{os.path.join(workdir, 'shard{index}.db')}"
+    os.environ["SHARD_MAP_URL"] = f"sqlite:///{os.path.join(workdir, 'shardmap.db')}"
+    sys.path.insert(0, os.getcwd())
+
+    results = asyncio.run(main(args))
+    print(f"{'scenario':10} {'ops/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'loop lag p99':>13}")
+    for name, stats in results.items():
+        print(f"{name:10} {stats['throughput_per_s']:8.1f} {stats['latency_p50_ms']:9.1f} "
+              f"{stats['latency_p95_ms']:9.1f} {stats['latency_p99_ms']:9.1f} {stats['loop_lag_p99_ms']:13.1f}")
+    print()
+    print(f"{'operation':14} {'sync p99 ms':>12} {'async p99 ms':>13}")
+    for operation, _ in OPERATION_MIX:
+        sync_stats = results["sync"]["operations"].get(operation, {})
+        async_stats = results["async"]["operations"].get(operation, {})
+        print(f"{operation:14} {sync_stats.get('p99_ms', 0.0):12.1f} {async_stats.get('p99_ms', 0.0):13.1f}")
+    if args.json_path:
+        with open(args.json_path, "w") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
@@ -0,0 +1,159 @@
+"""Login throughput benchmark.
+
+Two measurements:
+
+1. Service level: N concurrent password verifications run inline on the event
+   loop (the previous behaviour) versus on the password-hash pool, with the
+   event-loop lag observed by a ticker coroutine during the burst.
+2. App level: N concurrent POST /api/login requests against the real FastAPI app
+   in-process (httpx ASGI transport), with /health probed during the burst.
+
+Usage:
+    python -m benchmarks.bench_login --logins 200 --concurrency 50 --rounds 12
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (BCRYPT_ROUNDS)")
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args()
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarize millisecond samples."""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": ordered[-1]}
+
+
+async def run_burst(task: Callable[[int], Awaitable[None]], total: int, concurrency: int) -> Dict[str, float]:
+    """Run ``total`` calls with bounded concurrency and watch event-loop lag."""
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        interval = 0.005
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, (time.perf_counter() - started - interval) * 1000))
+
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(index: int) -> None:
+        async with slots:
+            started = time.perf_counter()
+            await task(index)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker_task
+
+    result = {"throughput_per_s": total / elapsed, "elapsed_s": elapsed}
+    result.update({f"latency_{k}": v for k, v in percentiles(latencies).items()})
+    result.update({f"loop_lag_{k}": v for k, v in percentiles(lags).items()})
+    return result
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    import httpx
+    from main import app
+    from src.spendly.core.database import SessionLocal, create_tables
+    from src.spendly.models import User
+    from src.spendly.services.auth import AuthService, pwd_context
+
+    password = "benchmark-password"
+    hashed = pwd_context.hash(password)
+    create_tables()
+    db = SessionLocal()
+    db.add_all([
+        User(name=f"Bench {i}", email=f"bench{i}@example.com", hashed_password=hashed)
+        for i in range(args.users)
+    ])
+    db.commit()
+    db.close()
+
+    results: Dict[str, Dict] = {}
+
+    async def inline_verify(index: int) -> None:
+        pwd_context.verify(password, hashed)
+
+    async def pooled_verify(index: int) -> None:
+        await AuthService.verify_password_async(password, hashed)
+
+    results["verify_inline"] = await run_burst(inline_verify, args.logins, args.concurrency)
+    results["verify_pool"] = await run_burst(pooled_verify, args.logins, args.concurrency)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            health_latencies: List[float] = []
+            stop = asyncio.Event()
+
+            async def probe_health() -> None:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    await client.get("/health")
+                    health_latencies.append((time.perf_counter() - started) * 1000)
+                    await asyncio.sleep(0.01)
+
+            async def login(index: int) -> None:
+                response = await client.post("/api/login", json={
+                    "email": f"bench{index % args.users}@example.com", "password": password
+                })
+                response.raise_for_status()
+
+            probe = asyncio.create_task(probe_health())
+            results["api_login"] = await run_burst(login, args.logins, args.concurrency)
+            stop.set()
+            await probe
+            results["api_login"].update({f"health_{k}": v for k, v in percentiles(health_latencies).items()})
+
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="spendly-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["RATE_LIMIT_ENABLED"] = "false"  # Every request comes from one client
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    sys.path.insert(0, os.getcwd())
+
+    results = asyncio.run(main(args))
+    print(f"{'scenario':16} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'loop lag p99':>13}")
+    for name, stats in results.items():
+        print(f"{name:16} {stats['throughput_per_s']:8.1f} {stats['latency_p50_ms']:9.1f} "
+              f"{stats['latency_p99_ms']:9.1f} {stats['loop_lag_p99_ms']:13.1f}")
+    if "health_p99_ms" in results.get("api_login", {}):
+        print(f"/health during login burst: p50 {results['api_login']['health_p50_ms']:.1f} ms, "
+              f"p99 {results['api_login']['health_p99_ms']:.1f} ms")
+    if args.json_path:
+        with open(args.json_path, "w") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
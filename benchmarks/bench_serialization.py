@@ -0,0 +1,167 @@
+"""Serialization benchmarks for the large list endpoints.
+
+Compares the previous response path (Pydantic models / dicts encoded by
+FastAPI's jsonable_encoder and the stdlib json module) with the row mappers in
+``api.serializers`` encoded by ``FastJSONResponse`` (orjson). Rows are loaded
+once up front, so only serialization is timed.
+
+Usage:
+    python -m benchmarks.bench_serialization --expenses 5000 --messages 2000
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, selectinload, joinedload
+from sqlalchemy.pool import StaticPool
+
+from src.spendly.api.serializers import (
+    serialize_group, serialize_expense, serialize_expense_detail, serialize_chat_history
+)
+from src.spendly.core.responses import FastJSONResponse
+from src.spendly.models import Base, User, Group, GroupMember, Expense, ExpenseSplit, ChatMessage
+from src.spendly.schemas.chat import ChatHistoryResponse, ChatMessageResponse
+from src.spendly.schemas.expense import Expense as ExpenseSchema
+from src.spendly.schemas.group import Group as GroupSchema
+
+
+def seed(session, users: int, groups: int, expenses: int, messages: int) -> None:
+    """Fill an empty database with deterministic sample data."""
+    session.add_all([
+        User(id=i, name=f"User {i}", email=f"user{i}@example.com", hashed_password="x")
+        for i in range(1, users + 1)
+    ])
+    session.add_all([Group(id=g, name=f"Group {g}") for g in range(1, groups + 1)])
+    for g in range(1, groups + 1):
+        for u in range(1, users + 1):
+            session.add(GroupMember(group_id=g, user_id=u))
+    start = datetime(2024, 1, 1)
+    for e in range(1, expenses + 1):
+        payer = (e % users) + 1
+        amount = float(10 + e % 90)
+        session.add(Expense(
+            id=e, description=f"Expense {e}", amount=amount, paid_by=payer, group_id=1,
+            original_message=f"I paid ${amount} for expense {e}",
+            created_at=start + timedelta(minutes=e)
+        ))
+        for u in range(1, users + 1):
+            session.add(ExpenseSplit(expense_id=e, user_id=u, amount=amount / users))
+    for m in range(1, messages + 1):
+        session.add(ChatMessage(
+            group_id=1, user_id=(m % users) + 1, message=f"Message {m}",
+            message_type="text", created_at=start + timedelta(seconds=m)
+        ))
+    session.commit()
+
+
+def legacy_expense_list(expenses: List[Expense]) -> bytes:
+    """GET /api/expenses/: hand-built dicts through jsonable_encoder + json."""
+    return json.dumps(jsonable_encoder([serialize_expense_detail(e) for e in expenses])).encode()
+
+
+def legacy_group_expenses(expenses: List[Expense]) -> bytes:
+    """GET /api/groups/{id}/expenses: Expense.from_orm per row, then encoded."""
+    models = [ExpenseSchema.model_validate(e) for e in expenses]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+def legacy_groups(groups: List[Group]) -> bytes:
+    """GET /api/groups/: Group(**dict) per row, re-validated by response_model."""
+    models = [GroupSchema(**serialize_group(g)) for g in groups]
+    adapter = TypeAdapter(List[GroupSchema])
+    return adapter.dump_json(adapter.validate_python(models))
+
+
+def legacy_chat_history(messages: List[ChatMessage], names: Dict[int, str]) -> bytes:
+    """GET /api/chat/groups/{id}/history: ChatMessageResponse per row, re-validated."""
+    response = ChatHistoryResponse(messages=[
+        ChatMessageResponse(**m) for m in serialize_chat_history(messages, names)["messages"]
+    ])
+    adapter = TypeAdapter(ChatHistoryResponse)
+    return adapter.dump_json(adapter.validate_python(response))
+
+
+def fast(payload: Callable[[], object]) -> Callable[[], bytes]:
+    """Wrap a mapper call in the FastJSONResponse render path."""
+    return lambda: FastJSONResponse(payload()).body
+
+
+def time_call(func: Callable[[], bytes], repeat: int) -> Dict[str, float]:
+    """Time a callable and return median/p95 milliseconds."""
+    func()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--expenses", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    seed(session, args.users, args.groups, args.expenses, args.messages)
+
+    expenses = session.query(Expense).options(
+        selectinload(Expense.payer), selectinload(Expense.splits).selectinload(ExpenseSplit.user)
+    ).all()
+    groups = session.query(Group).options(joinedload(Group.members).joinedload(GroupMember.user)).all()
+    messages = session.query(ChatMessage).order_by(ChatMessage.created_at.desc()).all()
+    names = {user.id: user.name for user in session.query(User).all()}
+
+    cases = {
+        "GET /api/expenses/": (
+            lambda: legacy_expense_list(expenses),
+            fast(lambda: [serialize_expense_detail(e) for e in expenses]),
+        ),
+        "GET /api/groups/{id}/expenses": (
+            lambda: legacy_group_expenses(expenses),
+            fast(lambda: [serialize_expense(e) for e in expenses]),
+        ),
+        "GET /api/groups/": (
+            lambda: legacy_groups(groups),
+            fast(lambda: [serialize_group(g) for g in groups]),
+        ),
+        "GET /api/chat/groups/{id}/history": (
+            lambda: legacy_chat_history(messages, names),
+            fast(lambda: serialize_chat_history(messages, names)),
+        ),
+    }
+
+    results = {}
+    print(f"{'endpoint':36} {'legacy ms':>10} {'fast ms':>10} {'speedup':>8}")
+    for name, (legacy, new) in cases.items():
+        legacy_stats = time_call(legacy, args.repeat)
+        fast_stats = time_call(new, args.repeat)
+        speedup = legacy_stats["median_ms"] / fast_stats["median_ms"] if fast_stats["median_ms"] else 0
+        results[name] = {"legacy": legacy_stats, "fast": fast_stats, "speedup": speedup}
+        print(f"{name:36} {legacy_stats['median_ms']:10.2f} {fast_stats['median_ms']:10.2f} {speedup:7.1f}x")
+
+    if args.json_path:
+        with open(args.json_path, "w") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
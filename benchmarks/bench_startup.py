@@ -0,0 +1,151 @@
+"""Import-time and startup benchmark, with a budget.
+
+Each run starts a fresh interpreter with ``python -X importtime`` and times:
+
+1. import: ``from src.spendly.app import create_app``
+2. create: ``create_app()`` (router and middleware imports happen here)
+3. startup: the lifespan's startup (schema version check, backfills)
+
+It reports the median of each, the slowest top-level imports and whether any
+module that should load lazily (the Gemini SDK, without GEMINI_API_KEY) was
+imported. The exit status is 1 when import + create exceeds ``--budget-ms``
+or a lazy module was imported, so CI and tests can enforce the budget (see
+``src.spendly.testing.assert_startup_within``).
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --budget-ms 1200 --json startup.json
+    ROUTERS=auth,groups python -m benchmarks.bench_startup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+# Import + create_app() budget, in milliseconds
+DEFAULT_BUDGET_MS = 1500.0
+
+# Modules that must not be imported at startup when their feature is unused
+LAZY_MODULES: List[str] = ["google.generativeai"]
+
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from src.spendly.app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+started_up = asyncio.run(startup())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_ms": (created - imported) * 1000,
+    "startup_ms": (started_up - created) * 1000,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Import + create_app() budget")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args()
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float]]:
+    """Return (module, cumulative ms) for the top-level imports in ``-X importtime`` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level after the single separator space
+        if cumulative_us.strip().isdigit() and not name[1:].startswith(" "):
+            imports.append((name.strip(), int(cumulative_us) / 1000))
+    return imports
+
+
+def run_once(env: Dict[str, str]) -> Dict:
+    """Measure one fresh interpreter."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], env=env,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(completed.stderr)
+    return result
+
+
+def measure(runs: int) -> Dict:
+    """Run the probe ``runs`` times against a scratch database; return medians and details."""
+    workdir = tempfile.mkdtemp(prefix="spendly-bench-")
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    env.setdefault("LOG_LEVEL", "WARNING")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    samples = [run_once(env) for _ in range(runs)]
+    slowest: Dict[str, List[float]] = {}
+    for sample in samples:
+        for name, elapsed in sample["imports"]:
+            slowest.setdefault(name, []).append(elapsed)
+    lazy_imported = sorted({
+        module for sample in samples for module in LAZY_MODULES if module in sample["modules"]
+    })
+    return {
+        "runs": runs,
+        "import_ms": statistics.median(sample["import_ms"] for sample in samples),
+        "create_ms": statistics.median(sample["create_ms"] for sample in samples),
+        "startup_ms": statistics.median(sample["startup_ms"] for sample in samples),
+        "modules_loaded": statistics.median(len(sample["modules"]) for sample in samples),
+        "slowest_imports": sorted(
+            ((name, statistics.median(times)) for name, times in slowest.items()), key=lambda item: -item[1]
+        ),
+        "lazy_modules_imported": lazy_imported,
+    }
+
+
+def violations(results: Dict, budget_ms: float) -> List[str]:
+    """Describe every way the results break the budget (empty when within it)."""
+    problems = []
+    total = results["import_ms"] + results["create_ms"]
+    if total > budget_ms:
+        problems.append(f"import + create_app() took {total:.0f} ms, budget is {budget_ms:.0f} ms")
+    if results["lazy_modules_imported"] and not os.environ.get("GEMINI_API_KEY"):
+        problems.append(f"lazily loaded modules were imported at startup: {results['lazy_modules_imported']}")
+    return problems
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = measure(args.runs)
+    problems = violations(results, args.budget_ms)
+
+    print(f"median of {args.runs} runs: import {results['import_ms']:.0f} ms, "
+          f"create_app {results['create_ms']:.0f} ms, lifespan startup {results['startup_ms']:.0f} ms, "
+          f"{results['modules_loaded']:.0f} modules")
+    print()
+    print(f"{'top-level import':40} {'cumulative ms':>14}")
+    for name, elapsed in results["slowest_imports"][:args.top]:
+        print(f"{name:40} {elapsed:14.1f}")
+    print()
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print(f"✅ Within the {args.budget_ms:.0f} ms budget")
+    if args.json_path:
+        with open(args.json_path, "w") as handle:
+            json.dump({"args": vars(args), "results": results, "violations": problems}, handle, indent=2)
+    sys.exit(1 if problems else 0)
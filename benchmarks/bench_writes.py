@@ -0,0 +1,100 @@
+"""Chat-message insert throughput with and without the single-writer queue.
+
+N concurrent clients each insert M chat messages through AsyncCRUDService, first
+with one transaction per message on the async pool, then with
+DB_SINGLE_WRITER (group commit on the writer thread). Reports inserts per
+second, latency percentiles and, for the writer, the mean batch size.
+
+Usage:
+    python -m benchmarks.bench_writes --clients 50 --messages 40 --window-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from .bench_login import percentiles
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=40, help="Messages per client")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="DB_WRITER_BATCH_WINDOW_MS")
+    parser.add_argument("--profile", default="performance", help="DB_PROFILE (SQLite pragma profile)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args()
+
+
+async def run_inserts(args: argparse.Namespace, group_id: int, user_id: int) -> Dict[str, float]:
+    """Insert clients x messages chat messages concurrently; return throughput and latency."""
+    from src.spendly.core.database import AsyncSessionLocal
+    from src.spendly.services.async_crud import AsyncCRUDService
+
+    latencies: List[float] = []
+
+    async def client(index: int) -> None:
+        for n in range(args.messages):
+            async with AsyncSessionLocal() as db:
+                started = time.perf_counter()
+                await AsyncCRUDService.create_chat_message(db, group_id, user_id, f"client {index} message {n}")
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    result = {"inserts_per_s": len(latencies) / elapsed, "elapsed_s": elapsed}
+    result.update({f"latency_{k}": v for k, v in percentiles(latencies).items()})
+    return result
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    from src.spendly.core.config import settings
+    from src.spendly.core.database import SessionLocal, create_tables, dispose_engines
+    from src.spendly.core.writer import db_writer
+    from src.spendly.models import User, Group, GroupMember
+
+    create_tables()
+    db = SessionLocal()
+    user = User(name="Bench", email="bench@example.com", hashed_password="x")
+    group = Group(name="Bench group")
+    db.add_all([user, group])
+    db.flush()
+    db.add(GroupMember(group_id=group.id, user_id=user.id))
+    db.commit()
+    group_id, user_id = group.id, user.id
+    db.close()
+
+    results: Dict[str, Dict] = {}
+    settings.DB_SINGLE_WRITER = False
+    results["per_request_commit"] = await run_inserts(args, group_id, user_id)
+    settings.DB_SINGLE_WRITER = True
+    results["single_writer"] = await run_inserts(args, group_id, user_id)
+    results["single_writer"].update(db_writer.stats())
+    db_writer.shutdown()
+    await dispose_engines()
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="spendly-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DB_PROFILE"] = args.profile
+    os.environ["DB_WRITER_BATCH_WINDOW_MS"] = str(args.window_ms)
+    sys.path.insert(0, os.getcwd())
+
+    results = asyncio.run(main(args))
+    print(f"{'mode':20} {'inserts/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'batch size':>11}")
+    for name, stats in results.items():
+        print(f"{name:20} {stats['inserts_per_s']:10.1f} {stats['latency_p50_ms']:9.1f} "
+              f"{stats['latency_p99_ms']:9.1f} {stats.get('mean_batch_size', 1.0):11.1f}")
+    if args.json_path:
+        with open(args.json_path, "w") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
@@ -0,0 +1,69 @@
+"""Spending analytics endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Optional
+
+from ..core.database import get_async_db
+from ..schemas.analytics import SpendingSeries, RollupRebuildResult
+from ..schemas.user import User
+from ..services.rollups import RollupService
+from .auth import get_current_active_user
+from .permissions import ensure_group_member
+from ..services.membership import membership_index
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/spending", response_model=SpendingSeries)
+async def get_spending_series(
+    group_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: str = "month",
+    current_user: User = Depends(get_current_active_user), 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get paid/owed per period from the rollup tables.
+
+    With a group_id, returns every member of the group; otherwise returns the
+    current user's spending summed across their groups. Defaults to the last
+    twelve months.
+    """
+    end = end or date.today()
+    if start is None:
+        year, month = divmod(end.year * 12 + end.month - 1 - 11, 12)
+        start = date(year, month + 1, 1)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+
+    if group_id is not None:
+        await ensure_group_member(db, current_user, group_id)
+    user_ids = None if group_id is not None else [current_user.id]
+    try:
+        return await db.run_sync(
+            RollupService.get_spending_series, start=start, end=end, granularity=granularity,
+            group_id=group_id, user_ids=user_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/rebuild", response_model=RollupRebuildResult)
+async def rebuild_rollups(
+    group_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user), 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Rebuild the spending rollups for one group, or for each of the current user's groups."""
+    if group_id is not None:
+        await ensure_group_member(db, current_user, group_id)
+        return await db.run_sync(RollupService.rebuild_rollups, group_id=group_id)
+    
+    daily_rows = monthly_rows = 0
+    for member_group_id in sorted(await membership_index.get_async(db, current_user.id)):
+        result = await db.run_sync(RollupService.rebuild_rollups, group_id=member_group_id)
+        daily_rows += result.daily_rows
+        monthly_rows += result.monthly_rows
+    return RollupRebuildResult(daily_rows=daily_rows, monthly_rows=monthly_rows)
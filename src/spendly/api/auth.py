@@ -2,39 +2,47 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+import time
 from typing import List
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.config import settings
+from ..core.log import get_logger
+from ..core.ratelimit import enforce_rate_limit, ip_rate_limit
 from ..schemas.user import UserCreate, UserLogin, UserAuth, User
-from ..services.auth import AuthService
-from ..services.crud import CRUDService
+from ..services.auth import AuthService, principal_cache, auth_latency
+from ..services.async_crud import AsyncCRUDService
+
+logger = get_logger(__name__)
 
 router = APIRouter(tags=["authentication"])  # Removed /auth prefix
 security = HTTPBearer()
 
 
-@router.post("/signup", response_model=UserAuth)
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
+@router.post(
+    "/signup",
+    response_model=UserAuth,
+    dependencies=[Depends(ip_rate_limit("signup_ip", settings.RATE_LIMIT_SIGNUP_PER_IP))]
+)
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new user account."""
     # Check if user already exists
-    existing_user = CRUDService.get_user_by_email(db, user.email)
+    existing_user = await AsyncCRUDService.get_user_by_email(db, user.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    db_user = CRUDService.create_user(db, user)
+    # Create new user (bcrypt runs off the event loop)
+    hashed_password = await AuthService.get_password_hash_async(user.password)
+    db_user = await AsyncCRUDService.create_user(db, user, hashed_password=hashed_password)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = AuthService.create_access_token(
-        data={"sub": db_user.email}, expires_delta=access_token_expires
-    )
+    access_token = AuthService.create_user_token(db_user, expires_delta=access_token_expires)
     
     return UserAuth(
         access_token=access_token,
@@ -43,10 +51,18 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/login", response_model=UserAuth)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+@router.post(
+    "/login",
+    response_model=UserAuth,
+    dependencies=[Depends(ip_rate_limit("login_ip", settings.RATE_LIMIT_LOGIN_PER_IP))]
+)
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return access token."""
-    user = AuthService.authenticate_user(db, user_credentials.email, user_credentials.password)
+    # Throttle attempts per account as well, so one IP pool can't stuff a single login
+    enforce_rate_limit(
+        "login_account", settings.RATE_LIMIT_LOGIN_PER_ACCOUNT, user_credentials.email.strip().lower()
+    )
+    user = await AuthService.authenticate_user_async(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,9 +71,7 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         )
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = AuthService.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = AuthService.create_user_token(user, expires_delta=access_token_expires)
     
     return UserAuth(
         access_token=access_token,
@@ -66,30 +80,46 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     )
 
 
-def get_current_active_user(
+async def get_current_active_user(
     credentials: HTTPAuthorizationCredentials = Depends(security), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    """Get current authenticated user."""
+    """Get current authenticated user.
+
+    Resolved principals are cached per token, so repeat calls (e.g. the 30s
+    polls) skip JWT decoding and the users query.
+    """
+    started = time.perf_counter()
+    token = credentials.credentials
     try:
-        print(f"🔐 Checking auth token: {credentials.credentials[:20]}...")
-        user = AuthService.get_current_user(credentials.credentials, db)
+        principal = principal_cache.get(token)
+        if principal is not None:
+            return principal
+        
+        payload = AuthService.decode_token(token)
+        user = await AuthService.get_user_for_payload_async(payload, db) if payload else None
         if user is None:
-            print("❌ No user found for token")
+            logger.info("Rejected token: no matching user")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        print(f"✅ User authenticated: {user.email}")
-        return User.from_orm(user)
+        logger.debug("Authenticated user %s", user.id)
+        principal = User.from_orm(user)
+        principal_cache.put(token, principal, expires_at=payload.get("exp"))
+        return principal
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Auth error: {e}")
+        logger.warning("Token validation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    finally:
+        auth_latency.observe((time.perf_counter() - started) * 1000)
 
 
 @router.get("/me", response_model=User)
@@ -98,22 +128,31 @@ async def get_current_user_info(current_user: User = Depends(get_current_active_
     return current_user
 
 
+@router.get("/auth-metrics")
+async def get_auth_metrics(current_user: User = Depends(get_current_active_user)):
+    """Get authentication latency and principal cache statistics for this worker."""
+    return {
+        "latency": auth_latency.snapshot(),
+        "principal_cache": principal_cache.stats()
+    }
+
+
 # Add user breakdown endpoint here since it's user-specific
 @router.get("/my-breakdown")
 async def get_my_breakdown(
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get expense breakdown for the current user across all groups."""
     try:
         # Get all groups the user is a member of
-        user_groups = CRUDService.get_user_groups(db, current_user.id)
+        user_groups = await AsyncCRUDService.get_user_groups(db, current_user.id)
         
         group_breakdowns = []
         
         for group in user_groups:
             try:
-                breakdown = CRUDService.get_group_breakdown(db, group.id)
+                breakdown = await AsyncCRUDService.get_group_breakdown(db, group.id)
                 # Find current user's breakdown in this group
                 user_breakdown = None
                 for ub in breakdown.user_breakdowns:
@@ -133,24 +172,29 @@ async def get_my_breakdown(
                         "my_owed": user_breakdown.total_owed
                     })
             except Exception as e:
-                print(f"⚠️ Could not get breakdown for group {group.id}: {e}")
+                logger.warning("Could not get breakdown for group %s: %s", group.id, e)
                 continue
         
         # Return as array for frontend compatibility
         return group_breakdowns
         
-    except Exception as e:
-        print(f"❌ Error getting user breakdown: {e}")
+    except Exception:
+        logger.exception("Error getting breakdown for user %s", current_user.id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not calculate breakdown"
         )
 
 
-@router.post("/users", response_model=User)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+@router.post(
+    "/users",
+    response_model=User,
+    dependencies=[Depends(ip_rate_limit("signup_ip", settings.RATE_LIMIT_SIGNUP_PER_IP))]
+)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new user (for testing)."""
-    return CRUDService.create_user(db=db, user=user)
+    hashed_password = await AuthService.get_password_hash_async(user.password)
+    return await AsyncCRUDService.create_user(db=db, user=user, hashed_password=hashed_password)
 
 
 @router.get("/users")
@@ -158,7 +202,7 @@ async def get_users(
     skip: int = 0, 
     limit: int = 100, 
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all users."""
-    return CRUDService.get_users(db, skip=skip, limit=limit)
+    return await AsyncCRUDService.get_users(db, skip=skip, limit=limit)
@@ -1,14 +1,16 @@
 """Chat endpoints."""
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from ..core.database import get_db
-from ..schemas.chat import ChatMessageCreate, ChatMessageResponse, ChatHistoryResponse
+from ..core.database import get_async_db
+from ..core.responses import FastJSONResponse
+from ..schemas.chat import ChatMessageCreate, ChatHistoryResponse
 from ..schemas.user import User
-from ..services.crud import CRUDService
-from .auth import get_current_active_user
+from ..services.async_crud import AsyncCRUDService
+from .permissions import require_group_member
+from .serializers import serialize_chat_history
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -17,13 +19,13 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 async def send_chat_message(
     group_id: int, 
     message: ChatMessageCreate, 
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a regular chat message (not an expense)."""
     
     # Save the chat message
-    CRUDService.create_chat_message(
+    await AsyncCRUDService.create_chat_message(
         db=db,
         group_id=group_id,
         user_id=current_user.id,
@@ -37,27 +39,13 @@ async def send_chat_message(
 @router.get("/groups/{group_id}/history", response_model=ChatHistoryResponse)
 async def get_chat_history(
     group_id: int, 
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get chat history for a group."""
     
-    messages = CRUDService.get_chat_messages(db, group_id)
+    messages = await AsyncCRUDService.get_chat_messages(db, group_id)
+    user_names = await AsyncCRUDService.get_user_names(db, [message.user_id for message in messages])
     
-    message_responses = []
-    for message in reversed(messages):  # Reverse to get chronological order
-        user_obj = CRUDService.get_user_by_id(db, message.user_id)  # Fixed: use get_user_by_id
-        user_name = user_obj.name if user_obj else "Unknown User"
-        
-        message_responses.append(ChatMessageResponse(
-            id=message.id,
-            group_id=message.group_id,
-            user_id=message.user_id,
-            user_name=user_name,
-            message=message.message,
-            message_type=message.message_type,
-            expense_id=message.expense_id,
-            created_at=message.created_at
-        ))
-    
-    return ChatHistoryResponse(messages=message_responses)
+    # Chronological order, as ChatHistoryResponse
+    return FastJSONResponse(serialize_chat_history(messages, user_names))
@@ -1,39 +1,50 @@
 """Expense management endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import datetime
 
-from ..core.database import get_db
-from ..schemas.expense import Expense, ExpenseRequest
+from ..core.config import settings
+from ..core.database import get_async_db
+from ..core.log import get_logger
+from ..core.responses import FastJSONResponse
+from ..schemas.expense import Expense, ExpenseRequest, ExpenseFilter, ExpenseAggregate
 from ..schemas.chat import ChatResponse
+from ..schemas.ledger import ExpenseSplitsUpdate
 from ..schemas.user import User
-from ..services.crud import CRUDService
-from ..services.gemini import GeminiService
-from ..models.expense import Expense as ExpenseModel
+from ..services.async_crud import AsyncCRUDService
+from ..services.gemini import get_gemini_service, llm_calls
 from .auth import get_current_active_user
+from .permissions import ensure_group_member
+from .ratelimit import user_rate_limit
+from ..services.membership import membership_index
+from .serializers import serialize_expense_detail
 
-router = APIRouter(prefix="/expenses", tags=["expenses"])
+logger = get_logger(__name__)
 
-# Initialize Gemini service
-gemini_service = GeminiService()
+router = APIRouter(prefix="/expenses", tags=["expenses"])
 
 
-@router.post("/", response_model=ChatResponse)
+@router.post(
+    "/",
+    response_model=ChatResponse,
+    dependencies=[Depends(user_rate_limit("llm_user", settings.RATE_LIMIT_LLM_PER_USER))]
+)
 async def process_chat_message(
     message: ExpenseRequest, 
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Process a chat message and create an expense if applicable."""
     
-    print(f"🔍 DEBUG: Received expense request from user {current_user.email}")
-    print(f"🔍 DEBUG: Message data: {message}")
-    print(f"🔍 DEBUG: Message content: '{message.message}'")
-    print(f"🔍 DEBUG: Group ID: {message.group_id}")
+    logger.debug("Expense message from user %s in group %s: %r", current_user.id, message.group_id, message.message)
     
+    await ensure_group_member(db, current_user, message.group_id)
+    
+    gemini_service = get_gemini_service()
     if not gemini_service.model:
-        print("⚠️ DEBUG: Gemini service not available")
+        logger.warning("Gemini service not available; expense message not parsed")
         return ChatResponse(
             success=False,
             message="💡 AI parsing is currently unavailable. Please use manual expense entry format like: 'EXPENSE: Pizza $25 PAID_BY: me SPLIT: everyone'"
@@ -41,18 +52,15 @@ async def process_chat_message(
     
     try:
         # Get group members for context
-        group_members = CRUDService.get_group_members(db, message.group_id)
-        print(f"✅ DEBUG: Found {len(group_members)} group members")
+        group_members = await AsyncCRUDService.get_group_members(db, message.group_id)
         user_names = [member.name for member in group_members]
-        print(f"🔍 DEBUG: Group member names: {user_names}")
         
         # Parse the message using Gemini
-        print(f"🔍 DEBUG: Calling Gemini service to parse: '{message.message}'")
         parsed_expense = await gemini_service.parse_expense_message(message.message, user_names)
-        print(f"🔍 DEBUG: Gemini parsing result: {parsed_expense}")
+        logger.debug("Gemini parsing result: %s", parsed_expense)
         
         if not parsed_expense:
-            print(f"❌ DEBUG: Gemini could not parse the expense")
+            logger.info("Gemini could not parse an expense from the message")
             return ChatResponse(
                 success=False,
                 message="I couldn't understand that as an expense. Try something like 'I paid $25 for pizza for everyone' or 'I paid $150 for food, split 2/3 to Fury, rest to me'"
@@ -63,7 +71,7 @@ async def process_chat_message(
         if parsed_expense["paid_by"].lower() in ["i", "me"]:
             paid_by_user = current_user
         else:
-            paid_by_user_obj = CRUDService.get_user_by_name(db, parsed_expense["paid_by"])
+            paid_by_user_obj = await AsyncCRUDService.get_user_by_name(db, parsed_expense["paid_by"])
             if paid_by_user_obj:
                 paid_by_user = User.from_orm(paid_by_user_obj)
         
@@ -89,7 +97,7 @@ async def process_chat_message(
             if user_name.lower() in ["i", "me"]:
                 user_id = current_user.id
             else:
-                user_obj = CRUDService.get_user_by_name(db, user_name)
+                user_obj = await AsyncCRUDService.get_user_by_name(db, user_name)
                 if user_obj:
                     user_id = user_obj.id
                 else:
@@ -118,19 +126,16 @@ async def process_chat_message(
             "group_id": message.group_id,
             "expense_type": expense_type,
             "split_among": split_among_ids,
-            "split_details": split_details  # Custom amounts per user
+            "split_details": split_details,  # Custom amounts per user
+            "recorded_by": current_user.id
         }
         
         # Create the expense
-        print(f"🔍 DEBUG: About to create expense with data: {expense_data}")
         try:
-            expense_obj = CRUDService.create_expense(db, expense_data, message.message)
+            expense_obj = await AsyncCRUDService.create_expense(db, expense_data, message.message)
             expense = Expense.from_orm(expense_obj)
-            print(f"✅ DEBUG: Successfully created expense with ID: {expense.id}")
         except Exception as e:
-            print(f"❌ DEBUG: Failed to create expense: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Failed to create expense")
             return ChatResponse(
                 success=False,
                 message=f"Failed to create expense: {str(e)}"
@@ -138,7 +143,7 @@ async def process_chat_message(
 
         # Save the chat message
         try:
-            CRUDService.create_chat_message(
+            await AsyncCRUDService.create_chat_message(
                 db=db,
                 group_id=message.group_id,
                 user_id=current_user.id,
@@ -146,11 +151,8 @@ async def process_chat_message(
                 message_type="expense",
                 expense_id=expense.id
             )
-            print(f"✅ DEBUG: Successfully created chat message for expense")
-        except Exception as e:
-            print(f"❌ DEBUG: Failed to create chat message: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Failed to create chat message for expense %s", expense.id)
         
         # Create system message about the expense with advanced splitting info
         expense_type = expense_data.get("expense_type", "split")
@@ -164,7 +166,7 @@ async def process_chat_message(
                     if user_id == current_user.id:
                         amounts_info.append(f"you owe ${amount:.2f}")
                     else:
-                        user_obj = CRUDService.get_user_by_id(db, user_id)
+                        user_obj = await AsyncCRUDService.get_user_by_id(db, user_id)
                         user_name = user_obj.name if user_obj else "Unknown"
                         amounts_info.append(f"{user_name} owes ${amount:.2f}")
                 split_info = f"lending - {', '.join(amounts_info)}"
@@ -178,7 +180,7 @@ async def process_chat_message(
                 if user_id == current_user.id:
                     amounts_info.append(f"you: ${amount:.2f}")
                 else:
-                    user_obj = CRUDService.get_user_by_id(db, user_id)
+                    user_obj = await AsyncCRUDService.get_user_by_id(db, user_id)
                     user_name = user_obj.name if user_obj else "Unknown"
                     amounts_info.append(f"{user_name}: ${amount:.2f}")
             split_info = f"split as {', '.join(amounts_info)}"
@@ -192,13 +194,13 @@ async def process_chat_message(
                 if user_id == current_user.id:
                     member_names.append("you")
                 else:
-                    user_obj = CRUDService.get_user_by_id(db, user_id)
+                    user_obj = await AsyncCRUDService.get_user_by_id(db, user_id)
                     if user_obj:
                         member_names.append(user_obj.name)
             split_info = f"split equally among {', '.join(member_names)}"
         
         system_message = f"💰 Expense added: {expense.description} - ${expense.amount:.2f} paid by {paid_by_user.name}, {split_info}"
-        CRUDService.create_chat_message(
+        await AsyncCRUDService.create_chat_message(
             db=db,
             group_id=message.group_id,
             user_id=current_user.id,
@@ -214,104 +216,145 @@ async def process_chat_message(
         )
         
     except Exception as e:
-        print(f"Error processing chat message: {e}")
+        logger.exception("Error processing chat message")
         return ChatResponse(
             success=False,
             message=f"Error processing message: {str(e)}"
         )
 
 
-@router.get("/")
+@router.get("/llm-metrics")
+async def get_llm_metrics(
+    recent: int = 20,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Summarize this worker's recent expense-parsing LLM calls.
+
+    Latency percentiles, outcome counts (ok, timeout, api_error, no_json,
+    invalid_json, declined, split_mismatch, ...), prompt/response sizes,
+    token counts and retries over the rolling window, plus the latest calls.
+    """
+    return {
+        "summary": llm_calls.summary(
+            numeric_fields=("prompt_chars", "response_chars", "prompt_tokens", "response_tokens", "retries"),
+            label_fields=("model",)
+        ),
+        "recent": llm_calls.recent(recent)
+    }
+
+
+def get_expense_filter(
+    group_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    paid_by: Optional[int] = None,
+    participant_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    description_prefix: Optional[str] = None
+) -> ExpenseFilter:
+    """Build an ExpenseFilter from query parameters."""
+    return ExpenseFilter(
+        group_id=group_id,
+        start_date=start_date,
+        end_date=end_date,
+        paid_by=paid_by,
+        participant_id=participant_id,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        description_prefix=description_prefix
+    )
+
+
+async def scope_to_member_groups(db: AsyncSession, current_user: User, filters: ExpenseFilter) -> ExpenseFilter:
+    """Check the filtered group, or limit an unscoped filter to the user's groups."""
+    if filters.group_id is not None:
+        await ensure_group_member(db, current_user, filters.group_id)
+    else:
+        filters.group_ids = sorted(await membership_index.get_async(db, current_user.id))
+    return filters
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(user_rate_limit("expenses_read_user", settings.RATE_LIMIT_EXPENSES_READ_PER_USER))]
+)
 async def get_expenses(
-    group_id: Optional[int] = None, 
+    skip: int = 0,
     limit: int = 10, 
+    filters: ExpenseFilter = Depends(get_expense_filter),
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get expenses with relationships."""
-    print(f"🔍 DEBUG: Getting expenses for group_id={group_id}, limit={limit}, user={current_user.email}")
-    
+    """Get expenses with relationships, filtered server-side."""
+    filters = await scope_to_member_groups(db, current_user, filters)
     try:
-        expenses = CRUDService.get_expenses(db, group_id=group_id, limit=limit)
-        print(f"✅ DEBUG: Found {len(expenses)} expenses in database")
+        expenses = await AsyncCRUDService.query_expenses(db, filters, skip=skip, limit=limit)
+        logger.debug("Found %d expenses for user %s (filters %s)", len(expenses), current_user.id, filters)
         
         # Format expenses with additional data for frontend
-        formatted_expenses = []
-        for exp in expenses:
-            print(f"   - Expense {exp.id}: {exp.description} - ${exp.amount} (paid by {exp.paid_by})")
-            
-            # Create expense dict with additional fields
-            expense_dict = {
-                "id": exp.id,
-                "description": exp.description,
-                "amount": exp.amount,
-                "paid_by": exp.paid_by,
-                "group_id": exp.group_id,
-                "original_message": exp.original_message,
-                "created_at": exp.created_at,
-                "payer_name": exp.payer.name if exp.payer else "Unknown",
-                "category": "Other",  # Default category for now
-                "date": exp.created_at,  # Use created_at as date
-                "splits": [
-                    {
-                        "id": split.id,
-                        "amount": split.amount,
-                        "user_id": split.user_id,
-                        "member_name": split.user.name if split.user else "Unknown"
-                    }
-                    for split in exp.splits
-                ] if exp.splits else []
-            }
-            formatted_expenses.append(expense_dict)
-        
-        print(f"📤 DEBUG: Returning {len(formatted_expenses)} formatted expenses")
-        return formatted_expenses
+        formatted_expenses = [serialize_expense_detail(exp) for exp in expenses]
+        return FastJSONResponse(formatted_expenses)
         
     except Exception as e:
-        print(f"❌ DEBUG: Error getting expenses: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting expenses")
         raise HTTPException(status_code=500, detail=f"Error getting expenses: {str(e)}")
 
 
+@router.get("/aggregate", response_model=List[ExpenseAggregate])
+async def aggregate_expenses(
+    group_by: str = "payer",
+    filters: ExpenseFilter = Depends(get_expense_filter),
+    current_user: User = Depends(get_current_active_user), 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Count and sum filtered expenses grouped by payer, participant, day or month."""
+    filters = await scope_to_member_groups(db, current_user, filters)
+    try:
+        return await AsyncCRUDService.aggregate_expenses(db, filters, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get("/{expense_id}")
 async def get_expense(
     expense_id: int, 
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific expense with full details."""
     try:
         # Get the expense
-        expense = db.query(ExpenseModel).filter(ExpenseModel.id == expense_id).first()
+        expense = await AsyncCRUDService.get_expense(db, expense_id)
         if not expense:
             raise HTTPException(status_code=404, detail="Expense not found")
+        await ensure_group_member(db, current_user, expense.group_id)
         
         # Format with additional data
-        expense_dict = {
-            "id": expense.id,
-            "description": expense.description,
-            "amount": expense.amount,
-            "paid_by": expense.paid_by,
-            "group_id": expense.group_id,
-            "original_message": expense.original_message,
-            "created_at": expense.created_at,
-            "payer_name": expense.payer.name if expense.payer else "Unknown",
-            "category": "Other",
-            "date": expense.created_at,
-            "splits": [
-                {
-                    "id": split.id,
-                    "amount": split.amount,
-                    "user_id": split.user_id,
-                    "member_name": split.user.name if split.user else "Unknown"
-                }
-                for split in expense.splits
-            ] if expense.splits else []
-        }
-        
-        return expense_dict
+        return FastJSONResponse(serialize_expense_detail(expense))
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error getting expense {expense_id}: {e}")
+        logger.exception("Error getting expense %s", expense_id)
         raise HTTPException(status_code=500, detail=f"Error getting expense: {str(e)}")
+
+
+@router.put("/{expense_id}/splits")
+async def update_expense_splits(
+    expense_id: int,
+    update: ExpenseSplitsUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Replace an expense's splits; the change is journaled in the group ledger."""
+    expense = await AsyncCRUDService.get_expense(db, expense_id)
+    if not expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    await ensure_group_member(db, current_user, expense.group_id)
+    try:
+        await AsyncCRUDService.update_expense_splits(db, expense_id, update.splits, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    expense = await AsyncCRUDService.get_expense(db, expense_id)
+    return FastJSONResponse(serialize_expense_detail(expense))
@@ -1,14 +1,25 @@
 """Group management endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from ..core.database import get_db
-from ..schemas.group import GroupCreate, Group, GroupMemberAdd, GroupBreakdown, SettleDebt
+from ..core.database import get_async_db
+from ..core.log import get_logger
+from ..core.responses import FastJSONResponse
+from ..schemas.group import GroupCreate, Group, GroupMemberAdd, GroupBreakdown, GroupSummary, SettleDebt
 from ..schemas.user import User
-from ..services.crud import CRUDService
+from ..schemas.expense import Expense
+from ..schemas.chat import ChatHistoryResponse
+from ..services.async_crud import AsyncCRUDService
+from ..services.export import LedgerExportService, EXPORT_FORMATS
+from ..services.membership import membership_index
 from .auth import get_current_active_user
+from .permissions import require_group_member, ensure_group_member
+from .serializers import serialize_group, serialize_expense, serialize_chat_history
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
@@ -17,28 +28,13 @@ router = APIRouter(prefix="/groups", tags=["groups"])
 async def create_group(
     group: GroupCreate, 
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new group."""
-    db_group = CRUDService.create_group(db, group, current_user.id)
+    db_group = await AsyncCRUDService.create_group(db, group, current_user.id)
     
     # Format group with member data (same as get_group endpoint)
-    group_dict = {
-        "id": db_group.id,
-        "name": db_group.name,
-        "description": db_group.description,
-        "created_at": db_group.created_at,
-        "members": [
-            {
-                "id": member.user.id,
-                "name": member.user.name,
-                "email": member.user.email
-            }
-            for member in db_group.members if member.user
-        ]
-    }
-    
-    return Group(**group_dict)
+    return FastJSONResponse(serialize_group(db_group))
 
 
 @router.get("/", response_model=List[Group])
@@ -46,99 +42,98 @@ async def get_groups(
     skip: int = 0, 
     limit: int = 100, 
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all groups."""
-    groups = CRUDService.get_groups(db, skip=skip, limit=limit)
+    """Get the groups the current user belongs to."""
+    groups = await AsyncCRUDService.get_groups(db, skip=skip, limit=limit, user_id=current_user.id)
     
     # Format groups with member data
-    formatted_groups = []
-    for group in groups:
-        group_dict = {
-            "id": group.id,
-            "name": group.name,
-            "description": group.description,
-            "created_at": group.created_at,
-            "members": [
-                {
-                    "id": member.user.id,
-                    "name": member.user.name,
-                    "email": member.user.email
-                }
-                for member in group.members if member.user
-            ]
-        }
-        formatted_groups.append(Group(**group_dict))
-    
-    return formatted_groups
+    return FastJSONResponse([serialize_group(group) for group in groups])
+
+
+@router.get("/summary", response_model=List[GroupSummary])
+async def get_group_summaries(
+    current_user: User = Depends(get_current_active_user), 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get dashboard summaries (counts, totals, my balance) for the current user's groups."""
+    return await AsyncCRUDService.get_user_group_summaries(db, current_user.id)
 
 
 @router.get("/{group_id}", response_model=Group)
 async def get_group(
     group_id: int, 
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific group by ID."""
-    group = CRUDService.get_group(db, group_id)
+    group = await AsyncCRUDService.get_group(db, group_id)
     if not group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
     
     # Format group with member data
-    group_dict = {
-        "id": group.id,
-        "name": group.name,
-        "description": group.description,
-        "created_at": group.created_at,
-        "members": [
-            {
-                "id": member.user.id,
-                "name": member.user.name,
-                "email": member.user.email
-            }
-            for member in group.members if member.user
-        ]
-    }
-    
-    return Group(**group_dict)
+    return FastJSONResponse(serialize_group(group))
 
 
 @router.get("/{group_id}/breakdown", response_model=GroupBreakdown)
 async def get_group_breakdown(
     group_id: int, 
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get expense breakdown for a group."""
     try:
-        breakdown = CRUDService.get_group_breakdown(db, group_id)
+        breakdown = await AsyncCRUDService.get_group_breakdown(db, group_id)
         return breakdown
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
-@router.get("/{group_id}/expenses")
+@router.get("/{group_id}/expenses", response_model=List[Expense])
 async def get_group_expenses(
     group_id: int, 
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all expenses for a specific group."""
-    from ..schemas.expense import Expense
-    
-    expenses = CRUDService.get_group_expenses(db, group_id)
-    return [Expense.from_orm(expense) for expense in expenses]
+    expenses = await AsyncCRUDService.get_group_expenses(db, group_id)
+    return FastJSONResponse([serialize_expense(expense) for expense in expenses])
+
+
+@router.get("/{group_id}/export")
+async def export_group_ledger(
+    group_id: int,
+    format: str = "csv",
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream a group's expenses with their splits and member names as CSV or JSONL."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{format}'"
+        )
+    group = await AsyncCRUDService.get_group(db, group_id)
+    if not group:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        LedgerExportService.stream_export(group_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="group-{group_id}-ledger.{format}"'}
+    )
 
 
 @router.post("/{group_id}/members")
 async def add_group_member(
     group_id: int,
     member: GroupMemberAdd,
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a member to a group."""
-    success = CRUDService.add_user_to_group(db, group_id, member.user_email)
+    success = await AsyncCRUDService.add_user_to_group(db, group_id, member.user_email)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -152,62 +147,42 @@ async def add_group_member(
 async def add_group_member_alias(
     group_id: int,
     member: GroupMemberAdd,
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a member to a group (frontend alias)."""
     return await add_group_member(group_id, member, current_user, db)
 
 
 # Add chat endpoints that frontend expects
-@router.get("/{group_id}/messages")
+@router.get("/{group_id}/messages", response_model=ChatHistoryResponse)
 async def get_group_messages(
     group_id: int, 
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get chat messages for a group (frontend alias)."""
-    from ..services.crud import CRUDService
-    from ..schemas.chat import ChatHistoryResponse, ChatMessageResponse
-    
-    messages = CRUDService.get_chat_messages(db, group_id)
-    
-    message_responses = []
-    for message in reversed(messages):  # Reverse to get chronological order
-        user_obj = CRUDService.get_user_by_id(db, message.user_id)  # Fixed: use get_user_by_id
-        user_name = user_obj.name if user_obj else "Unknown User"
-        
-        message_responses.append(ChatMessageResponse(
-            id=message.id,
-            group_id=message.group_id,
-            user_id=message.user_id,
-            user_name=user_name,
-            message=message.message,
-            message_type=message.message_type,
-            expense_id=message.expense_id,
-            created_at=message.created_at  # Fixed: use created_at instead of timestamp
-        ))
+    messages = await AsyncCRUDService.get_chat_messages(db, group_id)
+    user_names = await AsyncCRUDService.get_user_names(db, [message.user_id for message in messages])
     
-    return ChatHistoryResponse(
-        messages=message_responses
-    )
+    # Chronological order, as ChatHistoryResponse
+    return FastJSONResponse(serialize_chat_history(messages, user_names))
 
 
 @router.post("/{group_id}/send-message")
 async def send_group_message(
     group_id: int, 
     message_data: dict,
-    current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_group_member), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message to a group (frontend alias)."""
     from ..schemas.chat import ChatMessageCreate
-    from ..services.crud import CRUDService
     
     message = ChatMessageCreate(message=message_data.get("message", ""))
     
     # Create chat message  
-    chat_message = CRUDService.create_chat_message(
+    chat_message = await AsyncCRUDService.create_chat_message(
         db=db,
         group_id=group_id,
         user_id=current_user.id,
@@ -231,20 +206,31 @@ async def send_group_message(
 async def settle_debt(
     settle_data: SettleDebt, 
     current_user: User = Depends(get_current_active_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Settle debt between two members."""
+    await ensure_group_member(db, current_user, settle_data.group_id)
+    for user_id in (settle_data.payer_id, settle_data.payee_id):
+        if not await membership_index.is_member_async(db, user_id, settle_data.group_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"User {user_id} is not a member of this group"
+            )
+    if settle_data.amount <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be positive")
     try:
-        # Create a settlement expense
-        settlement_expense = CRUDService.create_expense(
-            db=db,
-            description=f"Settlement: {settle_data.payer_name} → {settle_data.payee_name}",
-            amount=settle_data.amount,
-            category="Settlement",
-            group_id=settle_data.group_id,
-            payer_id=settle_data.payer_id,
-            split_among=[settle_data.payee_id],
-            split_type="equal"
+        # A settlement is an expense paid by the payer and owed entirely by the payee
+        settlement_expense = await AsyncCRUDService.create_expense(
+            db,
+            {
+                "description": f"Settlement: {settle_data.payer_name} → {settle_data.payee_name}",
+                "amount": settle_data.amount,
+                "paid_by": settle_data.payer_id,
+                "group_id": settle_data.group_id,
+                "split_details": {settle_data.payee_id: settle_data.amount},
+                "expense_type": "settlement",
+                "recorded_by": current_user.id
+            }
         )
         
         return {
@@ -252,6 +238,6 @@ async def settle_debt(
             "message": f"Settlement of ${settle_data.amount:.2f} recorded successfully",
             "settlement_id": settlement_expense.id
         }
-    except Exception as e:
-        print(f"Error settling debt: {e}")
+    except Exception:
+        logger.exception("Error settling debt in group %s", settle_data.group_id)
         raise HTTPException(status_code=500, detail="Failed to settle debt")
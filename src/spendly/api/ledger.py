@@ -0,0 +1,50 @@
+"""Group ledger journal endpoints."""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from ..core.database import get_async_db
+from ..schemas.ledger import LedgerFeed, BalanceProjection, SnapshotRebuildResult
+from ..schemas.user import User
+from ..services.ledger import LedgerService
+from .permissions import require_group_member
+
+router = APIRouter(prefix="/groups", tags=["ledger"])
+
+
+@router.get("/{group_id}/ledger", response_model=LedgerFeed)
+async def get_ledger_events(
+    group_id: int,
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(require_group_member),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Read the group's change feed.
+
+    Pass the ``last_seq`` of the previous page as ``after_seq`` to resume;
+    an empty page means the client is up to date.
+    """
+    return await db.run_sync(LedgerService.get_events, group_id, after_seq, limit)
+
+
+@router.get("/{group_id}/balances", response_model=BalanceProjection)
+async def get_balances(
+    group_id: int,
+    at_seq: Optional[int] = Query(None, ge=0),
+    current_user: User = Depends(require_group_member),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get each member's balance (paid minus owed), optionally as of an earlier seq."""
+    return await db.run_sync(LedgerService.get_balances, group_id, at_seq)
+
+
+@router.post("/{group_id}/ledger/rebuild", response_model=SnapshotRebuildResult)
+async def rebuild_ledger_snapshots(
+    group_id: int,
+    current_user: User = Depends(require_group_member),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Replace the group's balance snapshots by replaying its whole journal."""
+    return await db.run_sync(LedgerService.rebuild_snapshots, group_id)
@@ -0,0 +1,47 @@
+"""HTML page routes."""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse
+from fastapi.templating import Jinja2Templates
+
+from ..core.assets import asset_url
+
+router = APIRouter(tags=["pages"])
+templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_url
+
+
+@router.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    """Home page - redirects to login"""
+    return templates.TemplateResponse("login.html", {"request": request})
+
+
+@router.get("/login", response_class=HTMLResponse)
+async def login_page(request: Request):
+    """Login page"""
+    return templates.TemplateResponse("login.html", {"request": request})
+
+
+@router.get("/signup", response_class=HTMLResponse)
+async def signup_page(request: Request):
+    """Signup page"""
+    return templates.TemplateResponse("signup.html", {"request": request})
+
+
+@router.get("/dashboard", response_class=HTMLResponse)
+async def dashboard(request: Request):
+    """Dashboard page"""
+    return templates.TemplateResponse("dashboard.html", {"request": request})
+
+
+@router.get("/chat", response_class=HTMLResponse)
+async def chat_page(request: Request):
+    """Chat page"""
+    return templates.TemplateResponse("chat.html", {"request": request})
+
+
+@router.get("/transactions", response_class=HTMLResponse)
+async def transactions_page(request: Request):
+    """Transactions page"""
+    return templates.TemplateResponse("transactions.html", {"request": request})
@@ -0,0 +1,69 @@
+"""Group and administrator authorization dependencies."""
+
+from typing import Any, Dict
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import get_async_db
+from ..schemas.user import User
+from ..services.auth import AuthService
+from ..services.membership import membership_index
+from .auth import get_current_active_user
+
+ADMIN_EMAILS = frozenset(
+    email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()
+)
+
+
+def is_admin_email(email: str) -> bool:
+    """Tell whether an account email is listed in ADMIN_EMAILS."""
+    return email.strip().lower() in ADMIN_EMAILS
+
+
+async def ensure_group_member(db: AsyncSession, user: User, group_id: int) -> None:
+    """Raise 403 unless the user belongs to the group."""
+    if not await membership_index.is_member_async(db, user.id, group_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of this group"
+        )
+
+
+async def require_group_member(
+    group_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Dependency for /{group_id} routes: the current user, if they are a member."""
+    await ensure_group_member(db, current_user, group_id)
+    return current_user
+
+
+async def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Dependency for administrator routes: the current user, if listed in ADMIN_EMAILS."""
+    if not is_admin_email(current_user.email):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required"
+        )
+    return current_user
+
+
+def is_admin_request(scope: Dict[str, Any]) -> bool:
+    """Tell from its bearer token alone whether an ASGI request comes from an administrator.
+
+    For middleware, which runs before dependencies: the token's signature and
+    expiry are checked, the database is not consulted.
+    """
+    if not ADMIN_EMAILS:
+        return False
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            payload = AuthService.decode_token(token.strip())
+            return payload is not None and is_admin_email(payload["sub"])
+    return False
@@ -0,0 +1,35 @@
+"""Request profile listing and download endpoints (administrators only)."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from typing import List
+
+from ..core.profiling import profile_store
+from ..schemas.profile import ProfileInfo
+from ..schemas.user import User
+from .permissions import require_admin
+
+router = APIRouter(prefix="/profiles", tags=["profiling"])
+
+
+@router.get("", response_model=List[ProfileInfo])
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(require_admin)
+):
+    """List the most recent request profiles, newest first."""
+    return profile_store.list()[:limit]
+
+
+@router.get("/{name}")
+async def download_profile(name: str, current_user: User = Depends(require_admin)):
+    """Download a profile: pstats data (.prof) or a pyinstrument page (.html)."""
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    if name.endswith(".html"):
+        return FileResponse(path, media_type="text/html")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
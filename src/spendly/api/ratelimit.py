@@ -0,0 +1,16 @@
+"""Rate-limit dependencies for authenticated routes."""
+
+from typing import Callable
+
+from fastapi import Depends
+
+from ..core.ratelimit import enforce_rate_limit
+from ..schemas.user import User
+from .auth import get_current_active_user
+
+
+def user_rate_limit(name: str, spec: str) -> Callable:
+    """Dependency factory limiting a route per authenticated user."""
+    async def dependency(current_user: User = Depends(get_current_active_user)) -> None:
+        enforce_rate_limit(name, spec, current_user.id)
+    return dependency
@@ -0,0 +1,94 @@
+"""Row-to-dict mappers for API responses.
+
+These build JSON-ready dicts straight from ORM rows, matching the shapes of the
+response schemas, so list endpoints can skip Pydantic on trusted database data.
+"""
+
+from typing import Dict, List, Optional
+
+from ..models import User, Group, Expense, ChatMessage
+
+
+def serialize_user(user: User) -> Dict:
+    """Map a User row to the ``schemas.user.User`` shape."""
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "created_at": user.created_at,
+    }
+
+
+def serialize_group(group: Group) -> Dict:
+    """Map a Group row (members and users loaded) to the ``schemas.group.Group`` shape."""
+    return {
+        "id": group.id,
+        "name": group.name,
+        "description": group.description,
+        "created_at": group.created_at,
+        "members": [
+            {
+                "id": member.user.id,
+                "name": member.user.name,
+                "email": member.user.email
+            }
+            for member in group.members if member.user
+        ]
+    }
+
+
+def serialize_expense(expense: Expense) -> Dict:
+    """Map an Expense row to the ``schemas.expense.Expense`` shape."""
+    return {
+        "id": expense.id,
+        "description": expense.description,
+        "amount": expense.amount,
+        "paid_by": expense.paid_by,
+        "group_id": expense.group_id,
+        "original_message": expense.original_message,
+        "created_at": expense.created_at,
+    }
+
+
+def serialize_expense_detail(expense: Expense) -> Dict:
+    """Map an Expense row with payer and splits to the shape the frontend expects."""
+    expense_dict = serialize_expense(expense)
+    expense_dict.update({
+        "payer_name": expense.payer.name if expense.payer else "Unknown",
+        "category": "Other",  # Default category for now
+        "date": expense.created_at,  # Use created_at as date
+        "splits": [
+            {
+                "id": split.id,
+                "amount": split.amount,
+                "user_id": split.user_id,
+                "member_name": split.user.name if split.user else "Unknown"
+            }
+            for split in expense.splits
+        ] if expense.splits else []
+    })
+    return expense_dict
+
+
+def serialize_chat_message(message: ChatMessage, user_name: Optional[str]) -> Dict:
+    """Map a ChatMessage row to the ``schemas.chat.ChatMessageResponse`` shape."""
+    return {
+        "id": message.id,
+        "group_id": message.group_id,
+        "user_id": message.user_id,
+        "user_name": user_name or "Unknown User",
+        "message": message.message,
+        "message_type": message.message_type,
+        "expense_id": message.expense_id,
+        "created_at": message.created_at,
+    }
+
+
+def serialize_chat_history(messages: List[ChatMessage], user_names: Dict[int, str]) -> Dict:
+    """Map newest-first chat rows to a chronological ``ChatHistoryResponse`` shape."""
+    return {
+        "messages": [
+            serialize_chat_message(message, user_names.get(message.user_id))
+            for message in reversed(messages)
+        ]
+    }
@@ -0,0 +1,193 @@
+"""FastAPI application factory."""
+
+import asyncio
+import importlib
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.staticfiles import StaticFiles
+
+# Logging first, so messages logged while the rest is imported are formatted too
+from .core.log import RequestContextMiddleware, configure_logging, get_logger, shutdown_logging
+from .core.config import Settings, settings as default_settings
+
+logger = get_logger(__name__)
+
+# Routers create_app can mount, in mounting order; the pages router serves the
+# HTML pages at the root, the others are mounted under /api
+ROUTERS: List[str] = ["auth", "expenses", "groups", "chat", "analytics", "ledger", "profiles", "pages"]
+
+
+def enabled_routers(spec: str) -> List[str]:
+    """Parse a ROUTERS setting ("all" or a comma list of names) into router names."""
+    if spec.strip().lower() == "all":
+        return list(ROUTERS)
+    names = [name.strip() for name in spec.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(ROUTERS))
+    if unknown:
+        raise ValueError(f"Unknown routers {unknown} in ROUTERS, expected 'all' or names from {ROUTERS}")
+    return [name for name in ROUTERS if name in names]
+
+
+def _lifespan(settings: Settings):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Application lifespan events."""
+        from .core.database import ensure_schema, SessionLocal, dispose_engines
+        from .core.metrics import metrics_store, request_metrics
+        from .core.writer import db_writer
+        from .services.auth import password_hasher
+        from .services.ledger import LedgerService
+        from .services.rollups import RollupService
+
+        # Startup
+        logger.info("Starting Spendly application")
+        backfill_seconds = 0.0
+
+        def backfill() -> None:
+            # Runs under the schema lock, before any worker serves requests
+            nonlocal backfill_seconds
+            backfill_started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                if RollupService.backfill_if_empty(db):
+                    logger.info("Spending rollups backfilled")
+                backfilled = LedgerService.backfill_missing(db)
+                if backfilled:
+                    logger.info("Ledger journal backfilled for %d groups", backfilled)
+            finally:
+                db.close()
+            backfill_seconds = time.perf_counter() - backfill_started
+
+        started = time.perf_counter()
+        if ensure_schema(migrate_data=backfill):
+            logger.info("Database schema migrated")
+        else:
+            logger.info("Database schema up to date")
+        finished = time.perf_counter()
+        request_metrics.startup.update(
+            schema=finished - started - backfill_seconds, backfill=backfill_seconds, total=finished - started
+        )
+        logger.info("Started in %.0f ms (schema %.0f ms, backfills %.0f ms)", (finished - started) * 1000,
+                    (finished - started - backfill_seconds) * 1000, backfill_seconds * 1000)
+        # Share this worker's request metrics with the other workers
+        metrics_flusher = asyncio.create_task(metrics_store.run_flusher(request_metrics)) if metrics_store else None
+        # Import the Gemini SDK in the background, so startup does not wait for it
+        # and the first expense message usually does not either
+        gemini_preload = None
+        if settings.GEMINI_API_KEY and settings.GEMINI_PRELOAD and "expenses" in app.state.routers:
+            from .services.gemini import get_gemini_service
+            gemini_preload = asyncio.create_task(asyncio.to_thread(get_gemini_service))
+        yield
+        # Shutdown
+        if gemini_preload is not None:
+            await asyncio.gather(gemini_preload, return_exceptions=True)
+        password_hasher.shutdown()
+        db_writer.shutdown()
+        await dispose_engines()
+        if metrics_flusher is not None:
+            metrics_flusher.cancel()
+            await asyncio.gather(metrics_flusher, return_exceptions=True)
+        logger.info("Shut down Spendly application")
+        shutdown_logging()
+
+    return lifespan
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build the Spendly application.
+
+    Routers are imported here, not at module import, and only those enabled
+    by ``settings.ROUTERS``, so a worker or test that needs part of the API
+    does not import the rest. The Gemini SDK is imported only when a key is
+    configured: in the background at startup (GEMINI_PRELOAD), otherwise on
+    the first expense message.
+
+    Middleware, routers and the lifespan follow ``settings``; the database
+    engines are created from the environment's settings when first imported.
+    """
+    settings = settings or default_settings
+    configure_logging()
+    routers = enabled_routers(settings.ROUTERS)
+
+    app = FastAPI(
+        title="Spendly",
+        description="A chat-based expense tracking application",
+        version="1.0.0",
+        lifespan=_lifespan(settings)
+    )
+    app.state.settings = settings
+    app.state.routers = routers
+
+    # Per-IP ceiling across the whole API; tighter per-route limits are dependencies
+    from .core.ratelimit import RateLimitMiddleware
+    app.add_middleware(RateLimitMiddleware, spec=settings.RATE_LIMIT_GLOBAL_PER_IP)
+
+    # CORS middleware (added last so it also wraps rate-limited responses)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Request-ID", "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Max-Repeats", "X-Profile-Id"],
+    )
+
+    # Opt-in profiling of single requests, by admins or by sampling
+    if settings.PROFILING_ENABLED:
+        from .api.permissions import is_admin_request
+        from .core.profiling import ProfilingMiddleware
+        app.add_middleware(ProfilingMiddleware, authorize=is_admin_request)
+
+    # SQL statements per request in debug headers, with N+1 warnings
+    if settings.QUERY_STATS_ENABLED:
+        from .core.querystats import QueryStatsMiddleware
+        app.add_middleware(QueryStatsMiddleware)
+
+    # Per-route latency, status and in-flight metrics for /metrics
+    from .core.metrics import MetricsMiddleware, collect_metrics, request_metrics
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
+    # Request IDs and debug sampling (outermost, so every response carries the ID)
+    app.add_middleware(RequestContextMiddleware)
+
+    # Static files (page templates are loaded by the pages router); pages link
+    # the fingerprinted, precompressed build under /assets when one exists
+    from .core.assets import ASSETS_URL_PREFIX, PrecompressedStaticFiles
+    app.mount(ASSETS_URL_PREFIX, PrecompressedStaticFiles(directory=settings.ASSETS_BUILD_DIR, check_dir=False),
+              name="assets")
+    app.mount("/static", StaticFiles(directory=settings.ASSETS_SOURCE_DIR), name="static")
+
+    for name in routers:
+        module = importlib.import_module(f".api.{name}", __package__)
+        app.include_router(module.router, prefix="" if name == "pages" else "/api")
+
+    # Writes to a group that is moving between shards are refused until the move is done
+    from .core.sharding import GroupMovingError
+
+    @app.exception_handler(GroupMovingError)
+    async def group_moving(request: Request, exc: GroupMovingError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(settings.SHARD_PLACEMENT_TTL_SECONDS)}
+        )
+
+    # Health check endpoint
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint"""
+        return {"status": "healthy", "app": "Spendly"}
+
+    # Prometheus scrape endpoint
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        """Request metrics in the Prometheus text format, summed over all workers."""
+        return PlainTextResponse(collect_metrics(), media_type="text/plain; version=0.0.4")
+
+    return app
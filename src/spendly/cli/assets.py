@@ -0,0 +1,46 @@
+"""Static asset build (``spendly-assets``).
+
+Minifies the JavaScript and CSS in ASSETS_SOURCE_DIR, names every file after
+its content hash, precompresses it with gzip (and brotli, when the package is
+installed) and writes the result with a manifest.json to ASSETS_BUILD_DIR.
+Run from the project root before starting the server, and again whenever
+static files change:
+
+    python -m src.spendly.cli.assets
+    python -m src.spendly.cli.assets --source static --output build/static
+"""
+
+import argparse
+import sys
+
+from ..core.assets import brotli, build_assets
+from ..core.config import settings
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=settings.ASSETS_SOURCE_DIR)
+    parser.add_argument("--output", default=settings.ASSETS_BUILD_DIR)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        report = build_assets(args.source, args.output)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    print(f"{'asset':28} {'built':36} {'source':>8} {'min':>8} {'gzip':>8} {'br':>8}")
+    for row in report:
+        print(f"{row['source']:28} {row['built']:36} {row['source_bytes']:>8,} {row['bytes']:>8,} "
+              f"{row.get('gzip_bytes', '-'):>8} {row.get('br_bytes', '-'):>8}")
+    if brotli is None:
+        print("⚠️ brotli is not installed; only gzip variants were built", file=sys.stderr)
+    print(f"✅ Built {len(report)} assets into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
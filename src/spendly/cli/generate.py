@@ -0,0 +1,97 @@
+"""Synthetic data generator for scale testing (``spendly-gen``).
+
+Fills an empty database with users, groups, memberships, expenses with
+equal/ratio/lend splits, chat messages and the ledger journal and rollups
+derived from them. Output is deterministic for a given --seed and --end-date.
+Run from the project root with the same environment as the app:
+
+    python -m src.spendly.cli.generate --users 200000 --groups 50000 --expenses 1500000 --messages 1500000
+    DATABASE_URL=sqlite:///./scale.db python -m src.spendly.cli.generate --users 1000 --groups 200 \\
+        --expenses 20000 --messages 20000 --split-mix equal=50,ratio=30,lend=20
+
+Every user can log in with --password. With sharding, generate into the
+catalog with SHARD_COUNT unset, then enable sharding and run
+``python -m src.spendly.cli.shards import-legacy`` to distribute the groups.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from typing import Dict
+
+from ..core.config import settings
+from ..core.database import engine
+from ..services.auth import AuthService
+from ..services.synthetic import SyntheticDataGenerator, parse_split_mix
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--groups", type=int, default=2500)
+    parser.add_argument("--expenses", type=int, default=100000, help="Total, spread unevenly over groups")
+    parser.add_argument("--messages", type=int, default=100000, help="Free chat messages besides expense ones")
+    parser.add_argument("--mean-group-size", type=float, default=4.0)
+    parser.add_argument("--max-group-size", type=int, default=20)
+    parser.add_argument("--split-mix", default="equal=70,ratio=20,lend=10", help="Split type weights")
+    parser.add_argument("--days", type=int, default=365, help="Length of the generated history")
+    parser.add_argument("--end-date", type=datetime.fromisoformat, default=None,
+                        help="Last day of the history, YYYY-MM-DD (default: today)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per INSERT batch")
+    parser.add_argument("--password", default="spendly", help="Password of every generated user")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if settings.SHARD_COUNT > 1:
+        print("Generate with SHARD_COUNT unset, then distribute the groups with "
+              "'python -m src.spendly.cli.shards import-legacy'", file=sys.stderr)
+        return 1
+    try:
+        generator = SyntheticDataGenerator(
+            users=args.users,
+            groups=args.groups,
+            expenses=args.expenses,
+            messages=args.messages,
+            mean_group_size=args.mean_group_size,
+            max_group_size=args.max_group_size,
+            split_mix=parse_split_mix(args.split_mix),
+            days=args.days,
+            end=args.end_date,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            password_hash=AuthService.get_password_hash(args.password)
+        )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    last_report = [0.0]
+
+    def progress(stage: str, counts: Dict[str, int]) -> None:
+        elapsed = time.perf_counter() - started
+        if stage == "rows" and elapsed - last_report[0] < 5:
+            return
+        last_report[0] = elapsed
+        rows = sum(counts.values())
+        print(f"[{elapsed:7.1f}s] {stage}: {rows:,} rows ({rows / max(elapsed, 1e-9):,.0f}/s)", flush=True)
+
+    try:
+        counts = generator.run(engine, progress)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Generated {sum(counts.values()):,} rows in {elapsed:.1f}s into {settings.DATABASE_URL}")
+    for table, count in counts.items():
+        print(f"  {table:26} {count:>12,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
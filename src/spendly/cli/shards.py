@@ -0,0 +1,65 @@
+"""Shard maintenance: inspect shards, move a group, import pre-sharding data.
+
+Run from the project root with the same environment as the app:
+
+    python -m src.spendly.cli.shards status
+    python -m src.spendly.cli.shards move 42 2             # group 42 onto shard 2
+    python -m src.spendly.cli.shards import-legacy         # every group still in DATABASE_URL
+    python -m src.spendly.cli.shards import-legacy 7 9
+"""
+
+import argparse
+import sys
+
+from ..core.config import settings
+from ..core.database import create_tables
+from ..services.shards import ShardRebalanceService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Groups, expenses and chat messages per shard")
+
+    move = commands.add_parser("move", help="Move a group onto another shard")
+    move.add_argument("group_id", type=int)
+    move.add_argument("shard", type=int, help="Target shard number")
+    move.add_argument(
+        "--settle", type=float, default=settings.SHARD_PLACEMENT_TTL_SECONDS,
+        help="Seconds to wait for cached placements to expire, before copying and before deleting the source"
+    )
+
+    legacy = commands.add_parser("import-legacy", help="Move groups from the catalog's pre-sharding tables")
+    legacy.add_argument("group_ids", type=int, nargs="*", help="Defaults to every group found there")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if settings.SHARD_COUNT < 2:
+        print("Sharding is not enabled (set SHARD_COUNT to 2 or more)", file=sys.stderr)
+        return 1
+    create_tables()
+
+    if args.command == "status":
+        for name, stats in ShardRebalanceService.shard_stats().items():
+            print(f"{name:10} groups={stats['groups']:<6} expenses={stats['expenses']:<9} "
+                  f"chat_messages={stats['chat_messages']}")
+    elif args.command == "move":
+        if args.settle < settings.SHARD_PLACEMENT_TTL_SECONDS:
+            print("⚠️ --settle is shorter than SHARD_PLACEMENT_TTL_SECONDS; workers that have not seen "
+                  "the write freeze may write rows the copy leaves behind", file=sys.stderr)
+        counts = ShardRebalanceService.move_group(args.group_id, args.shard, args.settle)
+        if not counts:
+            print(f"Group {args.group_id} is already on shard {args.shard}")
+        else:
+            print(f"✅ Moved group {args.group_id} to shard {args.shard}: {counts}")
+    else:
+        for group_id in args.group_ids or ShardRebalanceService.legacy_group_ids():
+            counts = ShardRebalanceService.import_legacy_group(group_id)
+            print(f"✅ Imported group {group_id}: {counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
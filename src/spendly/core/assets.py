@@ -0,0 +1,348 @@
+"""Fingerprinted, minified and precompressed static assets.
+
+``build_assets`` turns the source directory (``static/``) into a build
+directory holding, for every file, a minified copy named after its content
+hash (``chat.3f9a0c1d2e.js``) plus ``.gz`` and, when the ``brotli`` package
+is installed, ``.br`` variants, and a ``manifest.json`` mapping source names
+to built ones. ``PrecompressedStaticFiles`` serves the build directory,
+choosing the variant from Accept-Encoding, with immutable cache headers;
+templates link assets through ``asset_url``, which falls back to the
+unversioned ``/static`` URL when no build exists.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import stat
+from typing import Callable, Dict, List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .config import settings
+from .log import get_logger
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip variants are built
+    brotli = None
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS: Dict[str, str] = {"br": ".br", "gzip": ".gz"}
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 256
+
+# Fingerprinted names never change content, so clients may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _skip_string(source: str, index: int) -> int:
+    """Return the index just past the quoted string or template literal starting at ``index``."""
+    quote = source[index]
+    index += 1
+    while index < len(source) and source[index] != quote:
+        if quote == "`" and source.startswith("${", index):
+            index = _skip_substitution(source, index + 2)
+            continue
+        index += 2 if source[index] == "\\" else 1
+    return index + 1
+
+
+def _skip_substitution(source: str, index: int) -> int:
+    """Return the index just past the ``}`` closing a template literal's ``${`` at ``index``."""
+    depth = 1
+    while index < len(source):
+        char = source[index]
+        if char in "'\"`":
+            index = _skip_string(source, index)
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+    return index
+
+
+# A "/" after one of these (or at the start) begins a regular expression
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+
+
+def minify_js(source: str) -> str:
+    """Drop comments, indentation and blank lines from JavaScript.
+
+    Conservative by design: line breaks are kept (so automatic semicolon
+    insertion behaves as before) and strings, template literals and regular
+    expressions are copied untouched.
+    """
+    out: List[str] = []
+    index, length = 0, len(source)
+    at_line_start = True
+    last_significant = ""
+    while index < length:
+        char = source[index]
+        if at_line_start and char in " \t\r":
+            index += 1
+            continue
+        if char == "\n":
+            if not at_line_start:
+                out.append("\n")
+            at_line_start = True
+            index += 1
+            continue
+        at_line_start = False
+        if source.startswith("//", index):
+            index = source.find("\n", index)
+            index = length if index == -1 else index
+            while out and out[-1] in " \t":
+                out.pop()
+            at_line_start = not out or out[-1] == "\n"  # Drop comment-only lines too
+            continue
+        if source.startswith("/*", index):
+            end = source.find("*/", index + 2)
+            index = length if end == -1 else end + 2
+            at_line_start = not out or out[-1] == "\n"
+            continue
+        if char in "'\"`":
+            end = _skip_string(source, index)
+            out.append(source[index:end])
+            last_significant = char
+            index = end
+            continue
+        if char == "/" and (not last_significant or last_significant in _REGEX_PRECEDERS):
+            end = index + 1
+            in_class = False
+            while end < length and source[end] != "\n":
+                if source[end] == "\\":
+                    end += 2
+                    continue
+                if source[end] == "[":
+                    in_class = True
+                elif source[end] == "]":
+                    in_class = False
+                elif source[end] == "/" and not in_class:
+                    break
+                end += 1
+            out.append(source[index:end + 1])
+            last_significant = "/"
+            index = end + 1
+            continue
+        out.append(char)
+        if char not in " \t\r":
+            last_significant = char
+        index += 1
+    return "".join(out).strip() + "\n"
+
+
+# Whitespace after these, or before those, carries no meaning in CSS
+_CSS_TIGHT_AFTER = set("{};,>:(")
+_CSS_TIGHT_BEFORE = set("{};,>)")
+
+
+def minify_css(source: str) -> str:
+    """Drop comments and redundant whitespace from CSS, leaving strings untouched."""
+    out: List[str] = []
+    index, length = 0, len(source)
+    while index < length:
+        char = source[index]
+        if source.startswith("/*", index):
+            end = source.find("*/", index + 2)
+            index = length if end == -1 else end + 2
+            continue
+        if char in "'\"":
+            end = _skip_string(source, index)
+            out.append(source[index:end])
+            index = end
+            continue
+        if char.isspace():
+            while index < length and source[index].isspace():
+                index += 1
+            following = source[index:index + 1]
+            if out and out[-1][-1] not in _CSS_TIGHT_AFTER and following not in _CSS_TIGHT_BEFORE:
+                out.append(" ")
+            continue
+        if char in _CSS_TIGHT_BEFORE and out and out[-1] == " ":
+            out.pop()  # Before a comment, e.g. "color: red /* x */;"
+        if char == "}" and out and out[-1] == ";":
+            out.pop()
+        out.append(char)
+        index += 1
+    return "".join(out).strip() + "\n"
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {".js": minify_js, ".css": minify_css}
+
+
+def fingerprinted_name(name: str, content: bytes) -> str:
+    """Insert a hash of ``content`` before the extension: ``chat.js`` -> ``chat.3f9a0c1d2e.js``."""
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{extension}"
+
+
+def build_assets(source: str, output: str) -> List[Dict[str, object]]:
+    """Build every file under ``source`` into ``output`` and write the manifest.
+
+    The output directory is replaced. Returns one row per asset with its
+    source, built name and sizes, for reporting.
+    """
+    staging = f"{output.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    manifest: Dict[str, str] = {}
+    report: List[Dict[str, object]] = []
+    for directory, _, files in sorted(os.walk(source)):
+        for file_name in sorted(files):
+            path = os.path.join(directory, file_name)
+            name = os.path.relpath(path, source).replace(os.sep, "/")
+            with open(path, "rb") as handle:
+                content = handle.read()
+            extension = os.path.splitext(name)[1]
+            if extension in MINIFIERS:
+                content = MINIFIERS[extension](content.decode("utf-8")).encode("utf-8")
+            built = fingerprinted_name(name, content)
+            target = os.path.join(staging, built)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as handle:
+                handle.write(content)
+            row: Dict[str, object] = {
+                "source": name, "built": built, "source_bytes": os.path.getsize(path), "bytes": len(content),
+            }
+            if len(content) >= MIN_COMPRESS_BYTES:
+                # mtime=0 keeps the gzip output identical across builds
+                row["gzip_bytes"] = _write(f"{target}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    row["br_bytes"] = _write(f"{target}.br", brotli.compress(content, quality=11))
+            manifest[name] = built
+            report.append(row)
+    with open(os.path.join(staging, MANIFEST_NAME), "w") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    shutil.rmtree(output, ignore_errors=True)
+    os.replace(staging, output)
+    return report
+
+
+def _write(path: str, content: bytes) -> int:
+    with open(path, "wb") as handle:
+        handle.write(content)
+    return len(content)
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """Return the encodings of ENCODINGS that an Accept-Encoding header allows, best first."""
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+    accepted = []
+    for encoding in ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > 0:
+            accepted.append((quality, encoding))
+    # Stable sort: equal weights keep ENCODINGS' preference order
+    return [encoding for _, encoding in sorted(accepted, key=lambda item: -item[0])]
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """Serve a build directory, preferring the precompressed variant the client accepts.
+
+    Every response carries ``Vary: Accept-Encoding`` and immutable cache
+    headers, since built file names change whenever their content does.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405, headers={"Allow": "GET, HEAD"})
+        if path.endswith(tuple(ENCODINGS.values())) or path == MANIFEST_NAME:
+            raise HTTPException(status_code=404)
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        for encoding in accepted_encodings(accept_encoding):
+            found = await self._lookup_file(path + ENCODINGS[encoding])
+            if found is not None:
+                return self._asset_response(path, *found, scope, encoding)
+        found = await self._lookup_file(path)
+        if found is None:
+            raise HTTPException(status_code=404)
+        return self._asset_response(path, *found, scope, None)
+
+    async def _lookup_file(self, path: str) -> Optional[Tuple[str, os.stat_result]]:
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except (OSError, ValueError):
+            return None
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        return full_path, stat_result
+
+    def _asset_response(self, path: str, full_path: str, stat_result: os.stat_result, scope: Scope,
+                        encoding: Optional[str]) -> Response:
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        response = FileResponse(full_path, stat_result=stat_result, headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class AssetManifest:
+    """Source name -> fingerprinted URL, read once from a build's manifest.json."""
+
+    def __init__(self, directory: str, url_prefix: str, fallback_prefix: str):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.fallback_prefix = fallback_prefix
+        self._names: Optional[Dict[str, str]] = None
+
+    @property
+    def names(self) -> Dict[str, str]:
+        if self._names is None:
+            try:
+                with open(os.path.join(self.directory, MANIFEST_NAME)) as handle:
+                    self._names = json.load(handle)
+            except FileNotFoundError:
+                logger.info("No asset build in %s; linking unversioned static files "
+                            "(run python -m src.spendly.cli.assets)", self.directory)
+                self._names = {}
+        return self._names
+
+    def url(self, name: str) -> str:
+        """Return the fingerprinted URL of an asset, or its unversioned one without a build."""
+        built = self.names.get(name)
+        if built is None:
+            return f"{self.fallback_prefix}/{name}"
+        return f"{self.url_prefix}/{built}"
+
+
+ASSETS_URL_PREFIX = "/assets"
+STATIC_URL_PREFIX = "/static"
+
+asset_manifest = AssetManifest(settings.ASSETS_BUILD_DIR, ASSETS_URL_PREFIX, STATIC_URL_PREFIX)
+
+
+def asset_url(name: str) -> str:
+    """Template helper: ``{{ asset_url('chat.js') }}``."""
+    return asset_manifest.url(name)
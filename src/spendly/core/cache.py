@@ -0,0 +1,79 @@
+"""In-process TTL-bounded LRU cache."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time-to-live.
+
+    Lookups and stores are O(1). When the cache is full the least recently used
+    entry is evicted; ``on_evict`` (if given) is called with the key and value of
+    every entry that leaves the cache other than through ``clear``.
+    """
+
+    def __init__(self, maxsize: int, ttl: float,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                evicted = (key, value)
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        self._evicted(*evicted)
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; ttl overrides the cache default for this entry."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        evicted = []
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False))
+        for old_key, (_, old_value) in evicted:
+            self._evicted(old_key, old_value)
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove an entry and return its value (None if absent)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+        self._evicted(key, entry[1])
+        return entry[1]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evicted(self, key: Hashable, value: Any) -> None:
+        if self.on_evict is not None:
+            self.on_evict(key, value)
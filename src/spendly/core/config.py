@@ -12,18 +12,129 @@ class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./expenses.db")
     
+    # Database engine: SQLite pragma profile ("performance", "durable" or "default")
+    # and connection pools; GET/HEAD requests use the separate read-only pool
+    DB_PROFILE: str = os.getenv("DB_PROFILE", "performance")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_READ_POOL_ENABLED: bool = os.getenv("DB_READ_POOL_ENABLED", "True").lower() == "true"
+    DB_READ_POOL_SIZE: int = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+    DB_READ_MAX_OVERFLOW: int = int(os.getenv("DB_READ_MAX_OVERFLOW", "20"))
+    
+    # Optional single-writer mode: expense, chat and membership writes go through
+    # one writer thread that commits whatever arrives within the window together
+    DB_SINGLE_WRITER: bool = os.getenv("DB_SINGLE_WRITER", "False").lower() == "true"
+    DB_WRITER_BATCH_WINDOW_MS: float = float(os.getenv("DB_WRITER_BATCH_WINDOW_MS", "5"))
+    DB_WRITER_MAX_BATCH: int = int(os.getenv("DB_WRITER_MAX_BATCH", "200"))
+    
+    # Optional sharding: with SHARD_COUNT > 1, each group's expenses, splits, chat
+    # messages and rollups live in one of SHARD_COUNT databases ("{index}" is
+    # replaced by the shard number); DATABASE_URL becomes the catalog holding
+    # users, groups and memberships, and SHARD_MAP_URL holds group placements
+    # and the ID sequences of the sharded tables
+    SHARD_COUNT: int = int(os.getenv("SHARD_COUNT", "0"))
+    SHARD_URL_TEMPLATE: str = os.getenv("SHARD_URL_TEMPLATE", "sqlite:///./expenses_shard{index}.db")
+    SHARD_MAP_URL: str = os.getenv("SHARD_MAP_URL", "sqlite:///./expenses_shardmap.db")
+    SHARD_PLACEMENT_TTL_SECONDS: int = int(os.getenv("SHARD_PLACEMENT_TTL_SECONDS", "30"))
+    SHARD_ID_BLOCK_SIZE: int = int(os.getenv("SHARD_ID_BLOCK_SIZE", "100"))
+    
+    # Schema check at startup: each database stores a fingerprint of its schema
+    # and DDL runs only when it differs, by one process at a time holding this
+    # lock file (default: one per DATABASE_URL in the temp directory)
+    SCHEMA_LOCK_PATH: str = os.getenv("SCHEMA_LOCK_PATH", "")
+    
+    # Ledger journal: a balance snapshot is stored every N events per group
+    LEDGER_SNAPSHOT_INTERVAL: int = int(os.getenv("LEDGER_SNAPSHOT_INTERVAL", "200"))
+    
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Comma-separated emails of administrators (may profile requests, read profiles)
+    ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "")
+    
+    # Password hashing (bcrypt work factor; existing hashes are upgraded on login)
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    
+    # Rate limiting ("N/second|minute|hour|day", per worker process)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "False").lower() == "true"
+    RATE_LIMIT_GLOBAL_PER_IP: str = os.getenv("RATE_LIMIT_GLOBAL_PER_IP", "1200/minute")
+    RATE_LIMIT_LOGIN_PER_IP: str = os.getenv("RATE_LIMIT_LOGIN_PER_IP", "30/minute")
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = os.getenv("RATE_LIMIT_LOGIN_PER_ACCOUNT", "10/minute")
+    RATE_LIMIT_SIGNUP_PER_IP: str = os.getenv("RATE_LIMIT_SIGNUP_PER_IP", "10/minute")
+    RATE_LIMIT_LLM_PER_USER: str = os.getenv("RATE_LIMIT_LLM_PER_USER", "20/minute")
+    RATE_LIMIT_EXPENSES_READ_PER_USER: str = os.getenv("RATE_LIMIT_EXPENSES_READ_PER_USER", "120/minute")
+    
+    # Authenticated-principal cache (per process)
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    
+    # Read-through cache for user, group and group-member lookups (per process)
+    QUERY_CACHE_ENABLED: bool = os.getenv("QUERY_CACHE_ENABLED", "True").lower() == "true"
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "10000"))
+    QUERY_CACHE_USER_TTL_SECONDS: int = int(os.getenv("QUERY_CACHE_USER_TTL_SECONDS", "300"))
+    QUERY_CACHE_GROUP_TTL_SECONDS: int = int(os.getenv("QUERY_CACHE_GROUP_TTL_SECONDS", "60"))
     
     # Gemini AI
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    # Per-attempt timeout, retries of timeouts and transient API errors
+    # (unavailable, rate limited, deadline exceeded, internal; with exponential
+    # backoff) and the number of recent parse calls kept for /llm-metrics
+    GEMINI_TIMEOUT_SECONDS: float = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "20"))
+    GEMINI_MAX_RETRIES: int = int(os.getenv("GEMINI_MAX_RETRIES", "1"))
+    GEMINI_RETRY_BACKOFF_SECONDS: float = float(os.getenv("GEMINI_RETRY_BACKOFF_SECONDS", "0.5"))
+    LLM_METRICS_WINDOW: int = int(os.getenv("LLM_METRICS_WINDOW", "500"))
+    # Create the Gemini client in the background at startup rather than on the
+    # first expense message (the SDK takes most of a second to import)
+    GEMINI_PRELOAD: bool = os.getenv("GEMINI_PRELOAD", "True").lower() == "true"
     
     # Application
     APP_NAME: str = "Spendly Chat"
     APP_VERSION: str = "0.1.0"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    # Routers mounted by create_app: "all" or a comma list of auth, expenses,
+    # groups, chat, analytics, ledger, profiles and pages (disabled ones are
+    # never imported)
+    ROUTERS: str = os.getenv("ROUTERS", "all")
+    
+    # Logging: level of the app's loggers (DEBUG when DEBUG is set), per-module
+    # overrides ("services.gemini=DEBUG,api.auth=WARNING"), "text" or "json"
+    # lines, and the fraction of requests whose debug records are kept
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    
+    # Request metrics on /metrics; with several uvicorn workers, point
+    # METRICS_MULTIPROCESS_DIR at an empty directory shared by the workers
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_MULTIPROCESS_DIR: str = os.getenv("METRICS_MULTIPROCESS_DIR", "")
+    METRICS_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "1.0"))
+    
+    # SQL statement counts and time per request in X-DB-* response headers (on
+    # by default with DEBUG), warning when one statement repeats this often
+    QUERY_STATS_ENABLED: bool = os.getenv("QUERY_STATS_ENABLED", str(DEBUG)).lower() == "true"
+    QUERY_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "10"))
+    
+    # Request profiling: admins add "X-Profile: 1" or "?profile=1", and a
+    # PROFILE_SAMPLE_RATE fraction of all requests is profiled too. Profiles
+    # (the newest PROFILE_KEEP) go to PROFILE_DIR; PROFILER is "auto"
+    # (pyinstrument when installed, else cProfile) or "cprofile"
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "./profiles")
+    PROFILE_KEEP: int = int(os.getenv("PROFILE_KEEP", "100"))
+    PROFILER: str = os.getenv("PROFILER", "auto")
+    
+    # Static assets: "python -m src.spendly.cli.assets" builds static/ into
+    # ASSETS_BUILD_DIR (fingerprinted, minified, precompressed), served under
+    # /assets; pages link the built files when a build exists
+    ASSETS_SOURCE_DIR: str = os.getenv("ASSETS_SOURCE_DIR", "static")
+    ASSETS_BUILD_DIR: str = os.getenv("ASSETS_BUILD_DIR", "./build/static")
 
 
 settings = Settings()
@@ -1,19 +1,328 @@
 """Database connection and session management."""
 
-from sqlalchemy import create_engine
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+from fastapi import Request
+from sqlalchemy import create_engine, delete, event, insert, select
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
 from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.schema import CreateIndex, CreateTable, Table
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 from ..models.base import Base
+from ..models.schema import SchemaVersion
 from .config import settings
+from .sharding import CATALOG, SHARD_MAP_TABLES, SHARD_TABLES, ShardRouter, shard_name
+
+# Sync dialect -> asyncio driver used for the async engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+# Pragmas applied to every new SQLite connection, by profile name.
+# WAL lets readers and the writer proceed concurrently; synchronous=NORMAL is
+# crash-safe in WAL mode (a power loss can drop only the last commits).
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -32000,  # KiB per connection
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+# Row of the schema_version table holding the applied schema's fingerprint
+SCHEMA_VERSION_KEY = "schema"
+
+
+def to_async_url(url: str) -> str:
+    """Return the asyncio-driver form of a database URL (e.g. sqlite:// -> sqlite+aiosqlite://)."""
+    scheme, separator, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS or scheme in ASYNC_DRIVERS.values():
+        return url
+    return f"{ASYNC_DRIVERS[dialect]}{separator}{rest}"
+
+
+def _apply_sqlite_profile(engine: Engine, profile: str, read_only: bool) -> None:
+    """Run the profile's pragmas (and query_only for read pools) on each new connection."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}', expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    if read_only:
+        # journal_mode is a property of the file and is set by the write pool
+        pragmas.pop("journal_mode", None)
+        pragmas["query_only"] = "ON"
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(url: str = settings.DATABASE_URL, profile: str = settings.DB_PROFILE,
+                     read_only: bool = False, use_async: bool = False) -> Union[Engine, AsyncEngine]:
+    """Create a sync or async engine with the configured pool and SQLite profile.
+
+    Read-only engines get their own, larger pool (DB_READ_POOL_SIZE) and refuse
+    writes at the SQLite level.
+    """
+    database_url = make_url(to_async_url(url) if use_async else url)
+    is_sqlite = database_url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and database_url.database in (None, "", ":memory:")
+
+    kwargs: Dict[str, Any] = {}
+    if is_sqlite and not use_async:
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not in_memory:
+        kwargs["pool_size"] = settings.DB_READ_POOL_SIZE if read_only else settings.DB_POOL_SIZE
+        kwargs["max_overflow"] = settings.DB_READ_MAX_OVERFLOW if read_only else settings.DB_MAX_OVERFLOW
+        kwargs["pool_timeout"] = settings.DB_POOL_TIMEOUT
+
+    if use_async:
+        engine = create_async_engine(database_url, **kwargs)
+        if is_sqlite:
+            _apply_sqlite_profile(engine.sync_engine, profile, read_only)
+    else:
+        engine = create_engine(database_url, **kwargs)
+        if is_sqlite:
+            _apply_sqlite_profile(engine, profile, read_only)
+    return engine
+
+
+def _engines(read_only: bool = False, use_async: bool = False) -> Dict[str, Any]:
+    """Create one engine per shard, keyed by shard identifier."""
+    return {
+        shard_name(index): create_db_engine(
+            settings.SHARD_URL_TEMPLATE.format(index=index), read_only=read_only, use_async=use_async
+        )
+        for index in range(settings.SHARD_COUNT)
+    }
+
+
+engine = create_db_engine()
+
+# With SHARD_COUNT > 1 every session is a ShardedSession over the catalog
+# (DATABASE_URL) and the shard files; the router sends each statement and
+# each new row to the right database, so callers use sessions as before
+shard_router: Optional[ShardRouter] = None
+shard_map_engine: Optional[Engine] = None
+shard_engines: Dict[str, Engine] = {}
+if settings.SHARD_COUNT > 1:
+    shard_map_engine = create_db_engine(settings.SHARD_MAP_URL)
+    shard_engines = _engines()
+    shard_router = ShardRouter(
+        map_engine=shard_map_engine,
+        catalog_engine=engine,
+        shard_engines=shard_engines,
+        placement_ttl=settings.SHARD_PLACEMENT_TTL_SECONDS,
+        id_block_size=settings.SHARD_ID_BLOCK_SIZE
+    )
+
+
+def make_sessionmaker(**kwargs: Any) -> sessionmaker:
+    """Return a sync session factory bound to the database, or to the catalog and shards."""
+    if shard_router is None:
+        return sessionmaker(bind=engine, **kwargs)
+    return sessionmaker(
+        class_=ShardedSession,
+        shards={CATALOG: engine, **shard_engines},
+        **shard_router.session_options(),
+        **kwargs
+    )
+
+
+def _make_async_sessionmaker(catalog: AsyncEngine, shards: Dict[str, AsyncEngine]) -> async_sessionmaker:
+    options: Dict[str, Any] = {"autoflush": False, "expire_on_commit": False}
+    if shard_router is None:
+        return async_sessionmaker(catalog, **options)
+    return async_sessionmaker(
+        sync_session_class=ShardedSession,
+        shards={name: shard.sync_engine for name, shard in {CATALOG: catalog, **shards}.items()},
+        **shard_router.session_options(),
+        **options
+    )
+
 
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = make_sessionmaker(autocommit=False, autoflush=False)
+
+# Used by the API: queries run on the driver's own thread, so a slow statement
+# no longer stalls every other request on the event loop. Objects stay loaded
+# after commit because lazy loads are not available on an AsyncSession.
+async_engine = create_db_engine(use_async=True)
+async_shard_engines = _engines(use_async=True) if shard_router is not None else {}
+AsyncSessionLocal = _make_async_sessionmaker(async_engine, async_shard_engines)
+
+# GET/HEAD requests read through a separate pool so they never queue behind
+# connections held by writers
+if settings.DB_READ_POOL_ENABLED:
+    async_read_engine = create_db_engine(read_only=True, use_async=True)
+    async_read_shard_engines = _engines(read_only=True, use_async=True) if shard_router is not None else {}
+    AsyncReadSessionLocal = _make_async_sessionmaker(async_read_engine, async_read_shard_engines)
+else:
+    async_read_engine = async_engine
+    async_read_shard_engines = async_shard_engines
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+
+def _schema_plan() -> List[Tuple[Engine, List[Table]]]:
+    """Return each database with the tables it holds, the schema version table included.
+
+    When sharded, the catalog gets the catalog tables, every shard the
+    per-group tables and the shard map the placement and ID sequence tables.
+    """
+    version_table = SchemaVersion.__table__
+    tables = [table for table in Base.metadata.sorted_tables
+              if table.name not in SHARD_MAP_TABLES and table is not version_table]
+    if shard_router is None:
+        return [(engine, tables + [version_table])]
+    shard_tables = [table for table in tables if table.name in SHARD_TABLES]
+    return [
+        (engine, [table for table in tables if table.name not in SHARD_TABLES] + [version_table]),
+        (shard_map_engine, [table for table in Base.metadata.sorted_tables if table.name in SHARD_MAP_TABLES]
+         + [version_table]),
+        *((shard_engine, shard_tables + [version_table]) for shard_engine in shard_engines.values()),
+    ]
+
+
+def _create_tables(bind: Engine, tables: List[Table]) -> None:
+    Base.metadata.create_all(bind=bind, tables=tables)
+    # create_all only emits indexes together with new tables
+    for table in tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
 
 
 def create_tables() -> None:
-    """Create all database tables."""
-    Base.metadata.create_all(bind=engine)
+    """Create all database tables and any indexes missing from existing tables."""
+    for bind, tables in _schema_plan():
+        _create_tables(bind, tables)
+
+
+def schema_fingerprint(bind: Engine, tables: List[Table]) -> str:
+    """Hash the DDL of the tables and their indexes as the engine's dialect would emit it."""
+    digest = hashlib.sha256()
+    for table in sorted(tables, key=lambda table: table.name):
+        digest.update(str(CreateTable(table).compile(dialect=bind.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=bind.dialect)).encode())
+    return digest.hexdigest()[:16]
+
+
+def _stored_version(bind: Engine) -> Optional[str]:
+    """Return the schema version stored in a database, or None before the first migration."""
+    try:
+        with bind.connect() as connection:
+            return connection.execute(
+                select(SchemaVersion.version).where(SchemaVersion.name == SCHEMA_VERSION_KEY)
+            ).scalar()
+    except OperationalError:
+        return None  # No schema_version table yet
+
+
+def _outdated(plan: List[Tuple[Engine, List[Table]]]) -> List[Tuple[Engine, List[Table], str]]:
+    outdated = []
+    for bind, tables in plan:
+        version = schema_fingerprint(bind, tables)
+        if _stored_version(bind) != version:
+            outdated.append((bind, tables, version))
+    return outdated
+
+
+def _lock_path() -> str:
+    if settings.SCHEMA_LOCK_PATH:
+        return settings.SCHEMA_LOCK_PATH
+    name = hashlib.sha1(settings.DATABASE_URL.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"spendly-schema-{name}.lock")
+
+
+@contextmanager
+def _schema_lock() -> Iterator[None]:
+    """Hold an exclusive lock on SCHEMA_LOCK_PATH, so only one process migrates at a time."""
+    if fcntl is None:
+        yield  # No flock on this platform; concurrent starts may race as before
+        return
+    with open(_lock_path(), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def ensure_schema(migrate_data: Optional[Callable[[], None]] = None) -> bool:
+    """Bring every database's schema up to date, skipping all work when it already is.
+
+    Each database stores the fingerprint of the schema last applied to it, so
+    a worker starting against an up-to-date schema runs one query per
+    database. Otherwise it takes the schema lock, checks again (another
+    worker may have migrated meanwhile), creates what is missing, runs
+    ``migrate_data`` (backfills of derived tables) and only then stores the
+    new fingerprints. Workers that find the schema outdated wait on the lock
+    until the migration is complete, and a migration interrupted by a crash
+    runs again on the next start. Returns whether this process migrated.
+    """
+    plan = _schema_plan()
+    if not _outdated(plan):
+        return False
+    with _schema_lock():
+        outdated = _outdated(plan)
+        if not outdated:
+            return False
+        for bind, tables, _ in outdated:
+            _create_tables(bind, tables)
+        if migrate_data is not None:
+            migrate_data()
+        for bind, _, version in outdated:
+            with bind.begin() as connection:
+                connection.execute(delete(SchemaVersion).where(SchemaVersion.name == SCHEMA_VERSION_KEY))
+                connection.execute(insert(SchemaVersion).values(
+                    name=SCHEMA_VERSION_KEY, version=version, applied_at=datetime.utcnow()
+                ))
+    return True
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections of every engine."""
+    for async_db_engine in [async_engine, *async_shard_engines.values()]:
+        await async_db_engine.dispose()
+    if async_read_engine is not async_engine:
+        for async_db_engine in [async_read_engine, *async_read_shard_engines.values()]:
+            await async_db_engine.dispose()
+    for sync_engine in [engine, *shard_engines.values()]:
+        sync_engine.dispose()
+    if shard_map_engine is not None:
+        shard_map_engine.dispose()
 
 
 def get_db() -> Generator:
@@ -23,3 +332,10 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session: read-only for GET/HEAD requests, read-write otherwise."""
+    factory = AsyncReadSessionLocal if request.method in READ_METHODS else AsyncSessionLocal
+    async with factory() as db:
+        yield db
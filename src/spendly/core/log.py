@@ -0,0 +1,152 @@
+"""Structured, leveled logging with request-id correlation."""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from .config import settings
+
+ROOT_LOGGER = "spendly"
+REQUEST_ID_HEADER = "x-request-id"
+
+# Correlation state of the request being served (defaults apply outside requests)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+_debug_sampled: ContextVar[bool] = ContextVar("debug_sampled", default=True)
+
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the logger for a module, named ``spendly.<module path>``.
+
+    Modules pass ``__name__``; the ``src.`` prefix the app is imported under
+    is dropped, so LOG_LEVELS entries read like ``services.gemini=DEBUG``.
+    """
+    _, _, module = name.partition("spendly.")
+    return logging.getLogger(f"{ROOT_LOGGER}.{module or name}")
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Parse "module=LEVEL,..." into logger names under ``spendly`` and levels."""
+    levels = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        module, _, level = entry.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not module.strip() or not isinstance(value, int):
+            raise ValueError(f"Invalid LOG_LEVELS entry '{entry}', expected e.g. 'services.gemini=DEBUG'")
+        levels[f"{ROOT_LOGGER}.{module.strip()}"] = value
+    return levels
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the request ID and drops debug records of unsampled requests."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return record.levelno > logging.DEBUG or _debug_sampled.get()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request ID and message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s"
+
+
+def configure_logging() -> None:
+    """Route ``spendly.*`` loggers to stderr through a background thread (idempotent).
+
+    Records are formatted only when their logger's level lets them through, so
+    a disabled ``debug`` call costs one level check. Enabled records are put on
+    a queue and written by a listener thread, so request handlers never block
+    on the stream.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JSONFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.addHandler(queue_handler)
+    root.propagate = False
+    for name, level in parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """ASGI middleware giving each request an ID and a debug-sampling decision.
+
+    The ID is taken from an incoming X-Request-ID header when it looks sane,
+    generated otherwise, attached to every record logged while serving the
+    request, and echoed in the response's X-Request-ID header. Debug records
+    are kept for a LOG_DEBUG_SAMPLE_RATE fraction of requests, all or nothing
+    per request, so a sampled request's debug trail stays complete.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = settings.LOG_DEBUG_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        id_token = request_id_var.set(request_id)
+        sample_token = _debug_sampled.set(self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER.encode(), request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(id_token)
+            _debug_sampled.reset(sample_token)
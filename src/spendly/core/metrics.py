@@ -0,0 +1,362 @@
+"""Lightweight latency metrics and the Prometheus /metrics exposition."""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import settings
+
+
+class LatencyRecorder:
+    """Running count/mean/max plus percentiles over a window of recent samples."""
+
+    def __init__(self, window: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        """Record one sample in milliseconds."""
+        with self._lock:
+            self._samples.append(elapsed_ms)
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return summary statistics; percentiles cover the recent window."""
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total_ms, max_ms = self.count, self.total_ms, self.max_ms
+
+        def percentile(fraction: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+        return {
+            "count": count,
+            "mean_ms": total_ms / count if count else 0.0,
+            "max_ms": max_ms,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
+
+
+class CallRecorder:
+    """Rolling window of recent external calls (e.g. LLM requests), with lifetime outcome counts.
+
+    Each call is a dict with at least ``outcome`` and ``latency_ms``; other
+    numeric fields (sizes, token counts, retries) are averaged or summed in
+    the summary, and string fields such as ``model`` get per-value counts.
+    """
+
+    def __init__(self, window: int = 500):
+        self._calls: Deque[Dict[str, Any]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.outcome_totals: Dict[str, int] = {}
+
+    def record(self, **call: Any) -> None:
+        """Record one finished call."""
+        call.setdefault("at", time.time())
+        with self._lock:
+            self._calls.append(call)
+            self.outcome_totals[call["outcome"]] = self.outcome_totals.get(call["outcome"], 0) + 1
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Return the most recent calls, newest first."""
+        with self._lock:
+            calls = list(self._calls)
+        return calls[::-1][:limit]
+
+    def summary(self, numeric_fields: Tuple[str, ...] = (), label_fields: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """Summarize the window: outcomes, latency percentiles, and means/sums of the given fields."""
+        with self._lock:
+            calls = list(self._calls)
+            totals = dict(self.outcome_totals)
+        latencies = sorted(call["latency_ms"] for call in calls)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        outcomes: Dict[str, int] = {}
+        for call in calls:
+            outcomes[call["outcome"]] = outcomes.get(call["outcome"], 0) + 1
+        summary: Dict[str, Any] = {
+            "window_calls": len(calls),
+            "window_outcomes": outcomes,
+            "lifetime_outcomes": totals,
+            "latency_ms": {
+                "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+        }
+        for field in numeric_fields:
+            values = [call[field] for call in calls if call.get(field) is not None]
+            summary[field] = {
+                "sum": sum(values),
+                "mean": sum(values) / len(values) if values else 0.0,
+            }
+        for field in label_fields:
+            counts: Dict[str, int] = {}
+            for call in calls:
+                counts[str(call.get(field))] = counts.get(str(call.get(field)), 0) + 1
+            summary[field] = counts
+        return summary
+
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """One worker's HTTP metrics: latency histograms, status counters and in-flight requests.
+
+    Only the worker's event loop thread updates them, so no locks are taken.
+    Histogram rows hold per-bucket (non-cumulative) counts, the +Inf overflow
+    count and the sum of observed seconds; rendering accumulates them.
+    ``startup`` holds the seconds each lifespan startup phase took.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], List[float]] = {}
+        self.statuses: Dict[Tuple[str, str, str], int] = {}
+        self.in_flight = 0
+        self.startup: Dict[str, float] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        """Record one finished request."""
+        row = self.histograms.get((method, route))
+        if row is None:
+            row = self.histograms[(method, route)] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect_left(self.buckets, seconds)] += 1
+        row[-1] += seconds
+        key = (method, route, str(status))
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def state(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of the metrics."""
+        return {
+            "buckets": list(self.buckets),
+            "histograms": [[method, route, list(row)] for (method, route), row in self.histograms.items()],
+            "statuses": [[*key, count] for key, count in self.statuses.items()],
+            "in_flight": self.in_flight,
+            "startup": dict(self.startup),
+        }
+
+
+class MetricsStore:
+    """Shares worker metrics through a directory when uvicorn runs several workers.
+
+    Each worker writes its state to its own file every ``flush_interval``
+    seconds from a task on its event loop (to a temporary name, then renamed,
+    so readers never see a partial file).
+    Whichever worker serves /metrics sums its live state with the other
+    files. Files of exited workers keep counting towards the counters and
+    histograms, as Prometheus expects of monotonic series, but not towards the
+    in-flight gauge. Clear the directory before starting the server.
+    """
+
+    def __init__(self, directory: str, flush_interval: float):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.pid: Optional[int] = None
+        self.path: Optional[str] = None
+        os.makedirs(directory, exist_ok=True)
+
+    async def run_flusher(self, metrics: RequestMetrics) -> None:
+        """Flush this worker's state every interval until cancelled (then once more)."""
+        # Named once the worker runs, in case the app was imported before forking
+        self.pid = os.getpid()
+        self.path = os.path.join(self.directory, f"worker_{self.pid}_{time.time_ns()}.json")
+        try:
+            while True:
+                self.flush(metrics)
+                await asyncio.sleep(self.flush_interval)
+        finally:
+            self.flush(metrics)
+
+    def flush(self, metrics: RequestMetrics) -> None:
+        """Write this worker's state now."""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump({"pid": self.pid, **metrics.state()}, handle)
+        os.replace(temporary, self.path)
+
+    def collect(self, metrics: RequestMetrics) -> List[Dict[str, Any]]:
+        """Return the states of every worker, this one's taken live."""
+        states = [metrics.state()]
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".json") or path == self.path:
+                continue
+            try:
+                with open(path) as handle:
+                    state = json.load(handle)
+            except (OSError, ValueError):
+                continue  # Removed or replaced while listing
+            if not _process_alive(state.get("pid")):
+                state["in_flight"] = 0
+            states.append(state)
+        return states
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _labels(**labels: Any) -> str:
+    """Format Prometheus labels, escaping backslashes, quotes and newlines."""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render_prometheus(states: List[Dict[str, Any]], prefix: str = "spendly") -> str:
+    """Sum worker states and render them in the Prometheus text exposition format.
+
+    Startup phase durations are not summed: the slowest worker's is reported.
+    """
+    histograms: Dict[Tuple[str, str], List[float]] = {}
+    statuses: Dict[Tuple[str, str, str], int] = {}
+    in_flight = 0
+    startup: Dict[str, float] = {}
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    for state in states:
+        buckets = tuple(state["buckets"])
+        for method, route, row in state["histograms"]:
+            total = histograms.setdefault((method, route), [0] * len(row))
+            for index, value in enumerate(row):
+                total[index] += value
+        for method, route, status, count in state["statuses"]:
+            statuses[(method, route, status)] = statuses.get((method, route, status), 0) + count
+        in_flight += state["in_flight"]
+        for phase, seconds in state.get("startup", {}).items():
+            startup[phase] = max(startup.get(phase, 0.0), seconds)
+
+    name = f"{prefix}_http_request_duration_seconds"
+    lines = [
+        f"# HELP {name} HTTP request latency by method and route.",
+        f"# TYPE {name} histogram",
+    ]
+    for (method, route), row in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip((*buckets, float("inf")), row[:-1]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=_format_bound(bound))} {int(cumulative)}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {row[-1]}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {int(cumulative)}")
+
+    name = f"{prefix}_http_requests_total"
+    lines += [f"# HELP {name} HTTP responses by method, route and status code.", f"# TYPE {name} counter"]
+    for (method, route, status), count in sorted(statuses.items()):
+        lines.append(f"{name}{_labels(method=method, route=route, status=status)} {count}")
+
+    name = f"{prefix}_http_requests_in_flight"
+    lines += [f"# HELP {name} HTTP requests being served.", f"# TYPE {name} gauge", f"{name} {in_flight}"]
+
+    name = f"{prefix}_metrics_workers"
+    lines += [f"# HELP {name} Worker processes whose metrics are included.", f"# TYPE {name} gauge",
+              f"{name} {len(states)}"]
+
+    name = f"{prefix}_startup_duration_seconds"
+    lines += [f"# HELP {name} Slowest worker's application startup time by phase.", f"# TYPE {name} gauge"]
+    for phase, seconds in sorted(startup.items()):
+        lines.append(f"{name}{_labels(phase=phase)} {seconds}")
+    return "\n".join(lines) + "\n"
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """Return the matched route's full path template, e.g. ``/api/groups/{group_id}``.
+
+    Routes of included routers may only know their own part of the path, so
+    the prefix is recovered from the request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    concrete = template
+    for name, value in scope.get("path_params", {}).items():
+        concrete = re.sub(r"\{%s(:[^}]*)?\}" % re.escape(name), lambda _: str(value), concrete)
+    path = scope["path"]
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request into a RequestMetrics.
+
+    Requests are labelled by route template (``/api/groups/{group_id}``), not
+    by raw path, so the number of series stays bounded; requests that match
+    no route share the label "unmatched".
+    """
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # Reported if the app fails before starting a response
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope["method"], route_template(scope), status_code, time.perf_counter() - started)
+
+
+request_metrics = RequestMetrics()
+metrics_store = (
+    MetricsStore(settings.METRICS_MULTIPROCESS_DIR, settings.METRICS_FLUSH_INTERVAL_SECONDS)
+    if settings.METRICS_MULTIPROCESS_DIR else None
+)
+
+
+def collect_metrics() -> str:
+    """Render this worker's metrics, summed with the other workers' when sharing a directory."""
+    states = metrics_store.collect(request_metrics) if metrics_store is not None else [request_metrics.state()]
+    return render_prometheus(states)
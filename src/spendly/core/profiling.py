@@ -0,0 +1,171 @@
+"""Opt-in per-request profiling."""
+
+import asyncio
+import cProfile
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from .config import settings
+from .log import get_logger, request_id_var
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # Optional: falls back to cProfile
+    SamplingProfiler = None
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+_VALID_NAME = re.compile(r"^[A-Za-z0-9_.-]+\.(prof|html)$")
+
+
+class ProfileStore:
+    """A directory of recent request profiles, pruned to the newest ``keep``.
+
+    cProfile profiles are saved as ``.prof`` (pstats; open with snakeviz or
+    ``python -m pstats``), sampling profiles as ``.html``. File names carry
+    the time, duration, method, path and request ID.
+    """
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+
+    def file_name(self, method: str, path: str, elapsed_ms: float, extension: str) -> str:
+        """Build a profile's file name from its request."""
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        return f"{stamp}_{elapsed_ms:.0f}ms_{method}_{slug}_{request_id_var.get()}.{extension}"
+
+    def save(self, name: str, write: Callable[[str], None]) -> str:
+        """Write a profile with ``write(path)``, then drop the oldest beyond ``keep``."""
+        os.makedirs(self.directory, exist_ok=True)
+        write(os.path.join(self.directory, name))
+        profiles = self.list()
+        for stale in profiles[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, stale["name"]))
+            except FileNotFoundError:
+                pass
+        return name
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Return the stored profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not _VALID_NAME.match(name):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            profiles.append({
+                "name": name,
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime),
+            })
+        return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+    def path(self, name: str) -> Optional[str]:
+        """Return the path of a stored profile, or None for unknown or unsafe names."""
+        if not _VALID_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_KEEP)
+
+
+def _profile_requested(scope: Dict[str, Any]) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.strip().lower() in (b"1", b"true", b"yes")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get(PROFILE_QUERY_PARAM, [""])[0].lower() in ("1", "true", "yes")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running selected requests under a profiler.
+
+    A request is profiled when it asks for it (an ``X-Profile: 1`` header or
+    ``?profile=1``) and ``authorize(scope)`` accepts it, or when it falls in
+    the PROFILE_SAMPLE_RATE sample. The profile's name is returned in the
+    X-Profile-Id header.
+
+    pyinstrument, if installed, samples the request's own task across
+    awaits. Otherwise cProfile traces the event loop thread while the request
+    runs, so work of other requests interleaved with it is included too.
+    Only one request per worker is profiled at a time; others run normally.
+    """
+
+    def __init__(self, app, authorize: Callable[[Dict[str, Any]], bool],
+                 store: ProfileStore = profile_store, sample_rate: Optional[float] = None):
+        self.app = app
+        self.authorize = authorize
+        self.store = store
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.sampling = SamplingProfiler is not None and settings.PROFILER != "cprofile"
+        self._busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        extension = "html" if self.sampling else "prof"
+        started = time.perf_counter()
+        name: Optional[str] = None
+
+        async def send_with_profile_id(message):
+            nonlocal name
+            if message["type"] == "http.response.start":
+                # Named when the response starts, so the client learns the name
+                name = self.store.file_name(scope["method"], scope["path"],
+                                            (time.perf_counter() - started) * 1000, extension)
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, name.encode())]
+            await send(message)
+
+        if self.sampling:
+            profiler = SamplingProfiler(async_mode="enabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if self.sampling:
+                profiler.stop()
+            else:
+                profiler.disable()
+            self._busy = False
+            name = name or self.store.file_name(scope["method"], scope["path"],
+                                                (time.perf_counter() - started) * 1000, extension)
+            await asyncio.to_thread(self.store.save, name, lambda path: _write_profile(profiler, path))
+            logger.info("Saved profile %s", name)
+
+    def _selected(self, scope: Dict[str, Any]) -> bool:
+        if _profile_requested(scope) and self.authorize(scope):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+def _write_profile(profiler: Any, path: str) -> None:
+    if isinstance(profiler, cProfile.Profile):
+        pstats.Stats(profiler).dump_stats(path)
+    else:
+        with open(path, "w") as handle:
+            handle.write(profiler.output_html())
@@ -0,0 +1,148 @@
+"""Per-request SQL statement counting and N+1 detection."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+_START_KEY = "query_stats_started"
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+_installed = False
+
+
+class QueryStats:
+    """Statements executed while tracking, their total time and per-statement repeats.
+
+    Statements are keyed by their SQL text with parameters left as
+    placeholders, so a query issued once per row of an earlier result (an
+    N+1 pattern) shows up as one statement with a high repeat count.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        """Count one executed statement."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def merge(self, other: "QueryStats") -> None:
+        """Add another tracker's statements to this one."""
+        self.count += other.count
+        self.total_ms += other.total_ms
+        for statement, repeats in other.statements.items():
+            self.statements[statement] = self.statements.get(statement, 0) + repeats
+
+    def reset(self) -> None:
+        """Forget what was counted so far, e.g. after warming caches in a test."""
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements.clear()
+
+    @property
+    def max_repeats(self) -> int:
+        """Executions of the most repeated statement."""
+        return max(self.statements.values(), default=0)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, most repeated first."""
+        return sorted(
+            ((statement, repeats) for statement, repeats in self.statements.items() if repeats >= threshold),
+            key=lambda item: -item[1]
+        )
+
+    def assert_at_most(self, budget: int) -> None:
+        """Fail with the executed statements if more than ``budget`` ran."""
+        if self.count > budget:
+            listing = "\n".join(f"  {repeats}x {statement}" for statement, repeats in self.repeated(1))
+            raise AssertionError(f"{self.count} SQL statements executed, budget is {budget}:\n{listing}")
+
+
+def install_query_hooks() -> None:
+    """Listen to statement execution on every engine (sync and async alike; idempotent)."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = conn.info.get(_START_KEY)
+    if stats is not None and started:
+        stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements executed in this context (and tasks or writes it starts).
+
+    Trackers nest: when an inner one ends, its counts are added to the outer
+    one, so a test tracking a whole request also sees the queries that the
+    request middleware tracked.
+    """
+    install_query_hooks()
+    stats = QueryStats()
+    outer = _current.get()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if outer is not None:
+            outer.merge(stats)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware reporting each request's SQL statements.
+
+    Adds X-DB-Query-Count, X-DB-Time-Ms and X-DB-Max-Repeats headers
+    (counted up to the start of the response) and logs a warning naming the
+    statement when one runs QUERY_N_PLUS_ONE_THRESHOLD times or more in a
+    single request, the usual sign of a lazy load inside a loop.
+    """
+
+    def __init__(self, app, threshold: Optional[int] = None):
+        self.app = app
+        self.threshold = settings.QUERY_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.total_ms:.2f}".encode()),
+                        (b"x-db-max-repeats", str(stats.max_repeats).encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        for statement, repeats in stats.repeated(self.threshold):
+            logger.warning("Possible N+1 in %s %s: statement ran %d times: %s",
+                           scope["method"], scope["path"], repeats, " ".join(statement.split())[:300])
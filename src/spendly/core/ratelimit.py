@@ -0,0 +1,150 @@
+"""In-memory token-bucket rate limiting."""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from .config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(spec: str) -> Tuple[float, int]:
+    """Parse "N/period" (e.g. "10/minute") into (tokens per second, burst size)."""
+    try:
+        count, period = spec.strip().split("/")
+        count = int(count)
+        seconds = PERIODS[period.strip().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit '{spec}', expected e.g. '10/minute'")
+    if count <= 0:
+        raise ValueError(f"Invalid rate limit '{spec}', count must be positive")
+    return count / seconds, count
+
+
+class RateLimiter:
+    """Token buckets keyed by client, user or account.
+
+    Each key gets a bucket of ``burst`` tokens refilled at ``rate`` tokens per
+    second. Buckets are kept in least-recently-used order, so idle ones are
+    evicted from the front in amortized O(1). A bucket idle for burst/rate
+    seconds is full again, so evicting it loses nothing.
+    """
+
+    def __init__(self, rate: float, burst: int, max_buckets: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self.idle_after = burst / rate
+        self._buckets: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens for key; return 0 if allowed, else seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(self.burst)
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                self._buckets.move_to_end(key)
+            if tokens >= cost:
+                self._buckets[key] = [tokens - cost, now]
+                return 0.0
+            self._buckets[key] = [tokens, now]
+            return (cost - tokens) / self.rate
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key, (_, updated) = next(iter(buckets.items()))
+            if now - updated < self.idle_after and len(buckets) < self.max_buckets:
+                break
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str, spec: str) -> RateLimiter:
+    """Return the process-wide limiter for a named rule, creating it on first use."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                rate, burst = parse_rate(spec)
+                limiter = _limiters[name] = RateLimiter(rate, burst)
+    return limiter
+
+
+def client_ip(request: Request) -> str:
+    """Return the caller's IP, honouring X-Forwarded-For only when configured."""
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_rate_limit(name: str, spec: str, key: Hashable) -> None:
+    """Raise 429 with Retry-After if key has exhausted the named limit."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    retry_after = get_limiter(name, spec).acquire(key)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def ip_rate_limit(name: str, spec: str) -> Callable:
+    """Dependency factory limiting a route per client IP."""
+    async def dependency(request: Request) -> None:
+        enforce_rate_limit(name, spec, client_ip(request))
+    return dependency
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying one per-IP limit to every request under a path prefix."""
+
+    def __init__(self, app, spec: str, path_prefix: str = "/api"):
+        self.app = app
+        self.spec = spec
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED
+                or not scope["path"].startswith(self.path_prefix)):
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = get_limiter("global", self.spec).acquire(client_ip(Request(scope)))
+        if retry_after <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "Too many requests, please slow down"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_429_TOO_MANY_REQUESTS,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
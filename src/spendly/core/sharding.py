@@ -0,0 +1,328 @@
+"""Optional horizontal sharding of group data across several databases."""
+
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapper, ORMExecuteState
+from sqlalchemy.schema import Table
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+
+from ..models import Expense, ExpenseSplit, GroupShard, GroupWriteFreeze, IdSequence
+from .cache import TTLCache
+
+CATALOG = "catalog"
+
+# Session.info key under which sharded sessions carry their router
+ROUTER_KEY = "shard_router"
+
+# Per-group data; every other table lives in the catalog database
+SHARD_TABLES: FrozenSet[str] = frozenset({
+    "expenses",
+    "expense_splits",
+    "chat_messages",
+    "daily_spending_rollups",
+    "monthly_spending_rollups",
+    "ledger_events",
+    "balance_snapshots",
+})
+
+# Routing state, kept in the shard map database (SHARD_MAP_URL)
+SHARD_MAP_TABLES: FrozenSet[str] = frozenset({"group_shards", "group_write_freezes", "id_sequences"})
+
+# Tables whose IDs are exposed by the API, so they are handed out from the
+# shard map and stay unique across shards (rollup IDs are shard-local)
+ALLOCATED_ID_TABLES: FrozenSet[str] = frozenset({"expenses", "expense_splits", "chat_messages"})
+
+
+class GroupMovingError(RuntimeError):
+    """Raised on a write to a group whose writes are frozen while it moves between shards."""
+
+    def __init__(self, group_id: int):
+        super().__init__(f"Group {group_id} is being moved to another shard; try again shortly")
+        self.group_id = group_id
+
+
+def shard_name(index: int) -> str:
+    """Return the shard identifier used in sessions for a shard number."""
+    return f"shard_{index}"
+
+
+def shard_index(name: str) -> int:
+    """Return the shard number of a shard identifier."""
+    return int(name.rsplit("_", 1)[1])
+
+
+def is_sharded(db: Any) -> bool:
+    """Tell whether a (sync) session routes across shards."""
+    return ROUTER_KEY in db.info
+
+
+def session_shards(db: Any, group_id: Optional[int] = None) -> List[Optional[str]]:
+    """Return the shards to run a per-shard statement on, for one group or all.
+
+    Unsharded sessions get ``[None]``: run once, without a shard_id.
+    """
+    router = db.info.get(ROUTER_KEY)
+    if router is None:
+        return [None]
+    if group_id is not None:
+        return [router.shard_for_group(group_id)]
+    return list(router.shard_ids)
+
+
+def inspect_statement(statement: Any) -> Tuple[Set[str], Set[int]]:
+    """Return the tables a statement touches and the groups it is restricted to, in one pass.
+
+    Groups are the literal values compared to a shard table's group_id with
+    ``==`` or ``IN``. The repo's queries only use these comparisons as
+    restrictions (never inside an OR), so they bound the rows a statement can
+    touch.
+    """
+    tables: Set[str] = set()
+    group_ids: Set[int] = set()
+    for element in visitors.iterate(statement):
+        if isinstance(element, Table):
+            tables.add(element.name)
+            continue
+        if not isinstance(element, BinaryExpression) or not isinstance(element.right, BindParameter):
+            continue
+        column = element.left
+        table = getattr(column, "table", None)
+        if getattr(column, "key", None) != "group_id" or getattr(table, "name", None) not in SHARD_TABLES:
+            continue
+        value = element.right.effective_value
+        if element.operator is operators.eq and value is not None:
+            group_ids.add(value)
+        elif element.operator is operators.in_op:
+            group_ids.update(value)
+    return tables, group_ids
+
+
+class ShardRouter:
+    """Decides which database each ORM statement and new row belongs to.
+
+    Users, groups and memberships stay in the catalog. Rows of the SHARD_TABLES
+    go to the shard their group is placed on: a group is pinned to
+    ``group_id % shard_count`` the first time it is routed, and the rebalance
+    tool can move it later. While it does, the group's writes are frozen:
+    new rows and write statements for it raise GroupMovingError. Placements
+    and freezes are cached together per process for ``placement_ttl``
+    seconds, so a worker never sees a group thawed at its old placement.
+
+    Placements and ID blocks live in their own small database and are written
+    on short transactions of the router's own. Were they in the catalog, a
+    session with an uncommitted catalog write (such as a writer batch adding a
+    member and an expense) would block the router while flushing.
+
+    Statements over shard tables are routed by their ``group_id`` criteria;
+    without one they run on every shard and the rows are concatenated, so
+    callers that sort, limit or aggregate across groups merge the results
+    themselves. A single statement cannot join catalog and shard tables.
+    """
+
+    def __init__(self, map_engine: Engine, catalog_engine: Engine, shard_engines: Dict[str, Engine],
+                 placement_ttl: float, id_block_size: int):
+        self.map_engine = map_engine
+        self.catalog_engine = catalog_engine
+        self.shard_engines = shard_engines
+        self.shard_ids: List[str] = list(shard_engines)
+        self.id_block_size = id_block_size
+        self._placements = TTLCache(maxsize=100000, ttl=placement_ttl)  # group_id -> (shard_id, frozen)
+        self._expense_groups = TTLCache(maxsize=10000, ttl=placement_ttl)
+        self._id_blocks: Dict[str, List[int]] = {}
+        self._id_lock = threading.Lock()
+
+    def session_options(self) -> Dict[str, Any]:
+        """Keyword arguments for a ShardedSession (or a sessionmaker of one)."""
+        return {
+            "shard_chooser": self.shard_chooser,
+            "identity_chooser": self.identity_chooser,
+            "execute_chooser": self.execute_chooser,
+            "info": {ROUTER_KEY: self},
+        }
+
+    # Placements
+    def shard_for_group(self, group_id: int) -> str:
+        """Return the shard holding a group, pinning new groups to their default shard."""
+        return self._placement(group_id)[0]
+
+    def writable_shard_for_group(self, group_id: int) -> str:
+        """Return the shard holding a group, or raise GroupMovingError while its writes are frozen."""
+        shard_id, frozen = self._placement(group_id)
+        if frozen:
+            raise GroupMovingError(group_id)
+        return shard_id
+
+    def _placement(self, group_id: int) -> Tuple[str, bool]:
+        placement = self._placements.get(group_id)
+        if placement is None:
+            index, frozen = self._load_placement(group_id)
+            placement = (shard_name(index), frozen)
+            self._placements.set(group_id, placement)
+        return placement
+
+    def _load_placement(self, group_id: int) -> Tuple[int, bool]:
+        query = select(GroupShard.shard_index, GroupWriteFreeze.group_id.isnot(None)).outerjoin(
+            GroupWriteFreeze, GroupWriteFreeze.group_id == GroupShard.group_id
+        ).where(GroupShard.group_id == group_id)
+        with self.map_engine.connect() as connection:
+            row = connection.execute(query).first()
+        if row is not None:
+            return row[0], bool(row[1])
+        try:
+            with self.map_engine.begin() as connection:
+                connection.execute(insert(GroupShard).values(
+                    group_id=group_id,
+                    shard_index=group_id % len(self.shard_ids)
+                ))
+        except IntegrityError:
+            pass  # Another worker pinned it first
+        with self.map_engine.connect() as connection:
+            index, frozen = connection.execute(query).one()
+        return index, bool(frozen)
+
+    def set_placement(self, group_id: int, shard_id: str) -> None:
+        """Point a group at another shard and thaw its writes (its rows must already be there)."""
+        with self.map_engine.begin() as connection:
+            updated = connection.execute(
+                update(GroupShard).where(GroupShard.group_id == group_id).values(shard_index=shard_index(shard_id))
+            )
+            if updated.rowcount == 0:
+                connection.execute(insert(GroupShard).values(group_id=group_id, shard_index=shard_index(shard_id)))
+            connection.execute(delete(GroupWriteFreeze).where(GroupWriteFreeze.group_id == group_id))
+        self._placements.set(group_id, (shard_id, False))
+
+    def freeze_group(self, group_id: int) -> None:
+        """Refuse a group's writes until ``thaw_group`` or ``set_placement``.
+
+        Other workers notice within ``placement_ttl``, once their cached
+        placement expires.
+        """
+        shard_id = self.shard_for_group(group_id)  # Pins the group, so the freeze has a placement to join
+        try:
+            with self.map_engine.begin() as connection:
+                connection.execute(insert(GroupWriteFreeze).values(group_id=group_id))
+        except IntegrityError:
+            pass  # Already frozen
+        self._placements.set(group_id, (shard_id, True))
+
+    def thaw_group(self, group_id: int) -> None:
+        """Accept a group's writes again, at its current placement."""
+        with self.map_engine.begin() as connection:
+            connection.execute(delete(GroupWriteFreeze).where(GroupWriteFreeze.group_id == group_id))
+        self._placements.pop(group_id)
+
+    def group_for_expense(self, expense_id: int) -> int:
+        """Return the group of an expense, looking for it on every shard."""
+        group_id = self._expense_groups.get(expense_id)
+        if group_id is None:
+            for engine in self.shard_engines.values():
+                with engine.connect() as connection:
+                    group_id = connection.execute(
+                        select(Expense.group_id).where(Expense.id == expense_id)
+                    ).scalar()
+                if group_id is not None:
+                    break
+            else:
+                raise ValueError(f"Expense {expense_id} not found on any shard")
+            self._expense_groups.set(expense_id, group_id)
+        return group_id
+
+    def shard_for_expense(self, expense_id: int) -> str:
+        """Return the shard holding an expense (its splits live next to it)."""
+        return self.shard_for_group(self.group_for_expense(expense_id))
+
+    # ID allocation
+    def next_id(self, table_name: str) -> int:
+        """Hand out the next ID of a sharded table from a block reserved in the shard map."""
+        with self._id_lock:
+            block = self._id_blocks.get(table_name)
+            if block is None or block[0] >= block[1]:
+                start = self._reserve_ids(table_name)
+                block = self._id_blocks[table_name] = [start, start + self.id_block_size]
+            block[0] += 1
+            return block[0] - 1
+
+    def _reserve_ids(self, table_name: str) -> int:
+        size = self.id_block_size
+        while True:
+            try:
+                with self.map_engine.begin() as connection:
+                    updated = connection.execute(
+                        update(IdSequence).where(IdSequence.name == table_name).values(
+                            next_id=IdSequence.next_id + size
+                        )
+                    )
+                    if updated.rowcount:
+                        return connection.execute(
+                            select(IdSequence.next_id).where(IdSequence.name == table_name)
+                        ).scalar_one() - size
+                    start = self._max_existing_id(table_name) + 1
+                    connection.execute(insert(IdSequence).values(name=table_name, next_id=start + size))
+                    return start
+            except IntegrityError:
+                continue  # Another worker created the sequence; reserve from it
+
+    def _max_existing_id(self, table_name: str) -> int:
+        # Also look at the catalog's own copy of the table, left over from
+        # before sharding was enabled, so imported rows keep their IDs
+        highest = 0
+        for engine in [self.catalog_engine, *self.shard_engines.values()]:
+            if not inspect(engine).has_table(table_name):
+                continue
+            table = Expense.metadata.tables[table_name]
+            with engine.connect() as connection:
+                highest = max(highest, connection.execute(select(func.max(table.c.id))).scalar() or 0)
+        return highest
+
+    # Session choosers
+    def shard_chooser(self, mapper: Optional[Mapper], instance: Any, clause: Any = None) -> str:
+        """Pick the database of a row being flushed; also assigns IDs of new sharded rows."""
+        table_name = mapper.local_table.name if mapper is not None else None
+        if table_name not in SHARD_TABLES:
+            return CATALOG
+        if instance is None:
+            raise ValueError(f"Cannot choose a shard for {table_name} without a row")
+
+        if isinstance(instance, ExpenseSplit):
+            group_id = self.group_for_expense(instance.expense_id)
+        elif instance.group_id is None:
+            raise ValueError(f"Cannot choose a shard for a {table_name} row without a group_id")
+        else:
+            group_id = instance.group_id
+        shard_id = self.writable_shard_for_group(group_id)
+
+        if table_name in ALLOCATED_ID_TABLES and instance.id is None:
+            instance.id = self.next_id(table_name)
+        if isinstance(instance, Expense):
+            self._expense_groups.set(instance.id, group_id)
+        return shard_id
+
+    def identity_chooser(self, mapper: Mapper, primary_key: Any, *, lazy_loaded_from: Any, **kw: Any) -> List[str]:
+        """Pick the databases that may hold a row looked up by primary key."""
+        if mapper.local_table.name not in SHARD_TABLES:
+            return [CATALOG]
+        if lazy_loaded_from is not None and lazy_loaded_from.identity_token in self.shard_engines:
+            return [lazy_loaded_from.identity_token]
+        return self.shard_ids
+
+    def execute_chooser(self, context: ORMExecuteState) -> List[str]:
+        """Pick the databases an ORM statement runs on."""
+        tables, group_ids = inspect_statement(context.statement)
+        sharded = tables & SHARD_TABLES
+        if not sharded:
+            return [CATALOG]
+        if sharded != tables:
+            raise ValueError(f"Statement joins catalog tables {sorted(tables - sharded)} with shard tables")
+
+        lazy_loaded_from = context.lazy_loaded_from if context.is_select else None
+        if lazy_loaded_from is not None and lazy_loaded_from.identity_token in self.shard_engines:
+            return [lazy_loaded_from.identity_token]
+        if not group_ids:
+            return self.shard_ids
+        choose = self.shard_for_group if context.is_select else self.writable_shard_for_group
+        return sorted({choose(group_id) for group_id in group_ids})
@@ -0,0 +1,149 @@
+"""Single-writer queue with group commit."""
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import make_sessionmaker
+
+_STOP = object()
+
+
+class _WriteOperation:
+    __slots__ = ("func", "args", "kwargs", "future", "context")
+
+    def __init__(self, func: Callable[..., Any], args: tuple, kwargs: dict):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        # The submitter's context vars (e.g. its request ID for logging)
+        self.context = contextvars.copy_context()
+
+    def run(self, db: Session) -> Any:
+        return self.context.run(self.func, db, *self.args, **self.kwargs)
+
+
+class SingleWriter:
+    """Runs database writes on one thread, committing them in small groups.
+
+    SQLite has a single write lock, so concurrent writers mostly wait on each
+    other. Here every write is a function ``func(session, *args)`` that stages
+    rows without committing. The writer thread collects whatever arrives
+    within ``window_ms`` of the first queued write (at most ``max_batch``), runs
+    the batch in one transaction and commits once. If any write in a batch
+    fails, the batch is rolled back and each write is retried in its own
+    transaction, so only the failing caller sees the error.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], window_ms: float, max_batch: int):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.operations = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    async def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Queue a staging function and await its result once its batch commits."""
+        self._ensure_started()
+        operation = _WriteOperation(func, args, kwargs)
+        self._queue.put(operation)
+        return await asyncio.wrap_future(operation.future)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Commit what is queued, then stop the writer thread (a later submit restarts it)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, float]:
+        """Return batch and operation counters."""
+        return {
+            "batches": self.batches,
+            "operations": self.operations,
+            "mean_batch_size": self.operations / self.batches if self.batches else 0.0,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    operation = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if operation is _STOP:
+                    stopping = True
+                    break
+                batch.append(operation)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: List[_WriteOperation]) -> None:
+        # Skip writes whose callers were cancelled while queued
+        batch = [operation for operation in batch if operation.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self.batches += 1
+        self.operations += len(batch)
+
+        db = self.session_factory()
+        try:
+            results = [operation.run(db) for operation in batch]
+            db.commit()
+        except Exception:
+            db.rollback()
+            db.close()
+            for operation in batch:
+                self._commit_alone(operation)
+            return
+        db.close()
+        for operation, result in zip(batch, results):
+            operation.future.set_result(result)
+
+    def _commit_alone(self, operation: _WriteOperation) -> None:
+        db = self.session_factory()
+        try:
+            result = operation.run(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            operation.future.set_exception(e)
+        else:
+            operation.future.set_result(result)
+        finally:
+            db.close()
+
+
+# Staged objects are returned to callers, so they must stay loaded after commit
+WriterSessionLocal = make_sessionmaker(expire_on_commit=False)
+
+db_writer = SingleWriter(
+    session_factory=WriterSessionLocal,
+    window_ms=settings.DB_WRITER_BATCH_WINDOW_MS,
+    max_batch=settings.DB_WRITER_MAX_BATCH
+)
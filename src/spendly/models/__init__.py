@@ -5,6 +5,10 @@ from .user import User
 from .group import Group, GroupMember
 from .expense import Expense, ExpenseSplit
 from .chat import ChatMessage
+from .rollup import DailySpendingRollup, MonthlySpendingRollup
+from .ledger import LedgerEvent, BalanceSnapshot
+from .shard import GroupShard, GroupWriteFreeze, IdSequence
+from .schema import SchemaVersion
 
 __all__ = [
     "Base",
@@ -13,5 +17,13 @@ __all__ = [
     "GroupMember",
     "Expense",
     "ExpenseSplit", 
-    "ChatMessage"
+    "ChatMessage",
+    "DailySpendingRollup",
+    "MonthlySpendingRollup",
+    "LedgerEvent",
+    "BalanceSnapshot",
+    "GroupShard",
+    "GroupWriteFreeze",
+    "IdSequence",
+    "SchemaVersion"
 ]
@@ -1,6 +1,6 @@
 """Expense and ExpenseSplit model definitions."""
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -11,6 +11,13 @@ class Expense(Base):
     """Expense model for tracking shared expenses."""
     
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Composite indexes backing the filtered/aggregated expense queries
+        Index("ix_expenses_group_created", "group_id", "created_at"),
+        Index("ix_expenses_group_payer_created", "group_id", "paid_by", "created_at"),
+        Index("ix_expenses_group_amount", "group_id", "amount"),
+        Index("ix_expenses_group_description", "group_id", "description"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     description = Column(String, index=True)
@@ -33,6 +40,10 @@ class ExpenseSplit(Base):
     """Model for tracking how expenses are split among users."""
     
     __tablename__ = "expense_splits"
+    __table_args__ = (
+        Index("ix_expense_splits_expense_user", "expense_id", "user_id"),
+        Index("ix_expense_splits_user_expense", "user_id", "expense_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     expense_id = Column(Integer, ForeignKey("expenses.id"))
@@ -0,0 +1,45 @@
+"""Ledger journal and balance snapshot model definitions."""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+from datetime import datetime
+
+from .base import Base
+
+
+class LedgerEvent(Base):
+    """Append-only journal entry of a group's ledger; never updated or deleted."""
+    
+    __tablename__ = "ledger_events"
+    __table_args__ = (
+        UniqueConstraint("group_id", "seq", name="uq_ledger_event_group_seq"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    seq = Column(Integer, nullable=False)  # 1, 2, 3, ... within the group
+    event_type = Column(String, nullable=False)  # "expense_added", "splits_changed", "settlement_recorded"
+    expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Who recorded it, if known
+    payload = Column(Text, nullable=False)  # JSON, self-contained so replay never reads expenses
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<LedgerEvent(group_id={self.group_id}, seq={self.seq}, event_type='{self.event_type}')>"
+
+
+class BalanceSnapshot(Base):
+    """Balances of a group's members after replaying its journal up to ``seq``."""
+    
+    __tablename__ = "balance_snapshots"
+    __table_args__ = (
+        UniqueConstraint("group_id", "seq", name="uq_balance_snapshot_group_seq"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    balances = Column(Text, nullable=False)  # JSON {user_id: paid - owed}
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<BalanceSnapshot(group_id={self.group_id}, seq={self.seq})>"
@@ -0,0 +1,47 @@
+"""Spending rollup model definitions."""
+
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, UniqueConstraint, Index
+
+from .base import Base
+
+
+class DailySpendingRollup(Base):
+    """Per group, user and day totals of what the user paid and owes."""
+    
+    __tablename__ = "daily_spending_rollups"
+    __table_args__ = (
+        UniqueConstraint("group_id", "user_id", "period_start", name="uq_daily_rollup_group_user_period"),
+        Index("ix_daily_rollup_user_period", "user_id", "period_start"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    period_start = Column(Date, nullable=False)  # The day itself
+    paid = Column(Float, default=0.0)
+    owed = Column(Float, default=0.0)
+    expense_count = Column(Integer, default=0)  # Expenses the user paid for or takes part in
+
+    def __repr__(self) -> str:
+        return f"<DailySpendingRollup(group_id={self.group_id}, user_id={self.user_id}, period_start={self.period_start})>"
+
+
+class MonthlySpendingRollup(Base):
+    """Per group, user and month totals of what the user paid and owes."""
+    
+    __tablename__ = "monthly_spending_rollups"
+    __table_args__ = (
+        UniqueConstraint("group_id", "user_id", "period_start", name="uq_monthly_rollup_group_user_period"),
+        Index("ix_monthly_rollup_user_period", "user_id", "period_start"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    period_start = Column(Date, nullable=False)  # First day of the month
+    paid = Column(Float, default=0.0)
+    owed = Column(Float, default=0.0)
+    expense_count = Column(Integer, default=0)  # Expenses the user paid for or takes part in
+
+    def __repr__(self) -> str:
+        return f"<MonthlySpendingRollup(group_id={self.group_id}, user_id={self.user_id}, period_start={self.period_start})>"
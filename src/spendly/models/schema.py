@@ -0,0 +1,19 @@
+"""Schema version model definition."""
+
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from .base import Base
+
+
+class SchemaVersion(Base):
+    """Fingerprint of the schema last applied to this database, checked at startup."""
+    
+    __tablename__ = "schema_version"
+    
+    name = Column(String, primary_key=True)  # "schema"
+    version = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<SchemaVersion(name='{self.name}', version='{self.version}')>"
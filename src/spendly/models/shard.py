@@ -0,0 +1,43 @@
+"""Shard placement and ID allocation model definitions."""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from .base import Base
+
+
+class GroupShard(Base):
+    """Which shard holds a group's expenses, splits, chat messages and rollups."""
+    
+    __tablename__ = "group_shards"
+    
+    group_id = Column(Integer, primary_key=True)
+    shard_index = Column(Integer, nullable=False)
+    placed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<GroupShard(group_id={self.group_id}, shard_index={self.shard_index})>"
+
+
+class GroupWriteFreeze(Base):
+    """A group whose writes are refused while it moves to another shard."""
+    
+    __tablename__ = "group_write_freezes"
+    
+    group_id = Column(Integer, primary_key=True)
+    frozen_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<GroupWriteFreeze(group_id={self.group_id})>"
+
+
+class IdSequence(Base):
+    """Next free ID of a sharded table, so IDs stay unique across shards."""
+    
+    __tablename__ = "id_sequences"
+    
+    name = Column(String, primary_key=True)  # Table name
+    next_id = Column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<IdSequence(name='{self.name}', next_id={self.next_id})>"
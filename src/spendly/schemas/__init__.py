@@ -1,17 +1,29 @@
 """Pydantic schemas for request/response validation."""
 
 from .user import UserBase, UserCreate, UserLogin, User, UserAuth
-from .group import GroupBase, GroupCreate, Group, GroupMemberAdd, GroupBreakdown
-from .expense import ExpenseBase, ExpenseCreate, Expense, ExpenseRequest, ExpenseBreakdown
+from .group import GroupBase, GroupCreate, Group, GroupMemberAdd, GroupBreakdown, GroupSummary
+from .expense import ExpenseBase, ExpenseCreate, Expense, ExpenseRequest, ExpenseBreakdown, ExpenseFilter, ExpenseAggregate
+from .analytics import SpendingPoint, SpendingSeries, RollupRebuildResult
+from .ledger import (
+    LedgerEventResponse, LedgerFeed, MemberBalance, BalanceProjection, SnapshotRebuildResult, ExpenseSplitsUpdate
+)
+from .profile import ProfileInfo
 from .chat import ChatMessage, ChatMessageCreate, ChatMessageResponse, ChatMessageDb, ChatHistoryResponse, ChatResponse
 
 __all__ = [
     # User schemas
     "UserBase", "UserCreate", "UserLogin", "User", "UserAuth",
     # Group schemas
-    "GroupBase", "GroupCreate", "Group", "GroupMemberAdd", "GroupBreakdown",
+    "GroupBase", "GroupCreate", "Group", "GroupMemberAdd", "GroupBreakdown", "GroupSummary",
     # Expense schemas
-    "ExpenseBase", "ExpenseCreate", "Expense", "ExpenseRequest", "ExpenseBreakdown",
+    "ExpenseBase", "ExpenseCreate", "Expense", "ExpenseRequest", "ExpenseBreakdown", "ExpenseFilter", "ExpenseAggregate",
+    # Analytics schemas
+    "SpendingPoint", "SpendingSeries", "RollupRebuildResult",
+    # Ledger schemas
+    "LedgerEventResponse", "LedgerFeed", "MemberBalance", "BalanceProjection", "SnapshotRebuildResult",
+    "ExpenseSplitsUpdate",
+    # Profiling schemas
+    "ProfileInfo",
     # Chat schemas
     "ChatMessage", "ChatMessageCreate", "ChatMessageResponse", "ChatMessageDb", "ChatHistoryResponse", "ChatResponse"
 ]
@@ -0,0 +1,32 @@
+"""Analytics-related Pydantic schemas."""
+
+from __future__ import annotations
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+
+class SpendingPoint(BaseModel):
+    """Schema for one user's spending in one period."""
+    period_start: date
+    user_id: int
+    paid: float
+    owed: float
+    balance: float  # paid - owed for the period
+    expense_count: int
+
+
+class SpendingSeries(BaseModel):
+    """Schema for a spending time series read from the rollup tables."""
+    granularity: str  # "day" or "month"
+    group_id: Optional[int] = None  # None means summed across all of the user's groups
+    start: date
+    end: date
+    points: List[SpendingPoint]
+
+
+class RollupRebuildResult(BaseModel):
+    """Schema for a bulk rollup rebuild response."""
+    group_id: Optional[int] = None
+    daily_rows: int
+    monthly_rows: int
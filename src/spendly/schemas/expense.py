@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -37,6 +37,27 @@ class Expense(ExpenseBase):
         from_attributes = True
 
 
+class ExpenseFilter(BaseModel):
+    """Schema for server-side expense filters; unset fields are ignored."""
+    group_id: Optional[int] = None
+    group_ids: Optional[List[int]] = None  # Restrict to these groups (e.g. the caller's)
+    start_date: Optional[datetime] = None  # Inclusive
+    end_date: Optional[datetime] = None  # Exclusive
+    paid_by: Optional[int] = None
+    participant_id: Optional[int] = None  # User with a split in the expense
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    description_prefix: Optional[str] = None  # Case-sensitive, unlike a LIKE match
+
+
+class ExpenseAggregate(BaseModel):
+    """Schema for one bucket of an expense aggregation."""
+    key: str  # User ID, "YYYY-MM-DD" or "YYYY-MM" depending on the grouping
+    label: Optional[str] = None  # User name for payer/participant groupings
+    count: int
+    total: float
+
+
 class ExpenseBreakdown(BaseModel):
     """Schema for user expense breakdown."""
     user_id: int
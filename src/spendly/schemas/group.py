@@ -53,6 +53,17 @@ class GroupBreakdown(BaseModel):
     user_breakdowns: List[ExpenseBreakdown]
 
 
+class GroupSummary(BaseModel):
+    """Schema for a per-group dashboard summary of the current user."""
+    group_id: int
+    group_name: str
+    member_count: int
+    expense_count: int
+    total_amount: float
+    last_activity: Optional[datetime] = None
+    my_balance: float  # Positive means the user should receive money
+
+
 class SettleDebt(BaseModel):
     """Schema for settling debt between group members."""
     group_id: int
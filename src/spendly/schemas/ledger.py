@@ -0,0 +1,49 @@
+"""Ledger journal Pydantic schemas."""
+
+from __future__ import annotations
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class LedgerEventResponse(BaseModel):
+    """Schema for one journal entry."""
+    seq: int
+    event_type: str  # "expense_added", "splits_changed" or "settlement_recorded"
+    expense_id: Optional[int] = None
+    user_id: Optional[int] = None
+    payload: Dict[str, Any]
+    created_at: datetime
+
+
+class LedgerFeed(BaseModel):
+    """Schema for a page of a group's change feed."""
+    group_id: int
+    events: List[LedgerEventResponse]
+    last_seq: int  # Pass as after_seq to resume; unchanged when there is nothing new
+
+
+class MemberBalance(BaseModel):
+    """Schema for one member's balance in a projection."""
+    user_id: int
+    balance: float  # Positive means they should receive money, negative means they owe money
+
+
+class BalanceProjection(BaseModel):
+    """Schema for balances replayed from the journal."""
+    group_id: int
+    seq: int  # Last event included
+    snapshot_seq: int  # Snapshot the replay started from (0 = none)
+    balances: List[MemberBalance]
+
+
+class SnapshotRebuildResult(BaseModel):
+    """Schema for a snapshot rebuild response."""
+    group_id: int
+    events: int
+    snapshots: int
+
+
+class ExpenseSplitsUpdate(BaseModel):
+    """Schema for replacing an expense's splits: user ID -> amount owed."""
+    splits: Dict[int, float]
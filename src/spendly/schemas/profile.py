@@ -0,0 +1,11 @@
+"""Request profile Pydantic schemas."""
+
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ProfileInfo(BaseModel):
+    """Schema for a stored request profile."""
+    name: str  # Also returned in the profiled response's X-Profile-Id header
+    size: int  # Bytes
+    created_at: datetime
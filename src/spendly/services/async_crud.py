@@ -0,0 +1,246 @@
+"""Async CRUD operations service."""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Dict, List, Optional
+
+from ..models import User, Group, GroupMember, Expense, ExpenseSplit, ChatMessage
+from ..schemas import (
+    UserCreate, GroupCreate, ExpenseFilter, ExpenseAggregate, GroupBreakdown, GroupSummary
+)
+from ..core.config import settings
+from ..core.writer import db_writer
+from .auth import AuthService
+from .crud import CRUDService
+from .membership import membership_index
+from .query_cache import query_cache, detached_copy, detached_group
+
+
+class AsyncCRUDService:
+    """CRUDService for an AsyncSession.
+
+    Simple reads and writes are native async statements. Multi-step operations
+    (expense creation, breakdowns, filtered queries, aggregates) run the
+    CRUDService implementation through ``AsyncSession.run_sync``: the ORM code is
+    shared, but every query it issues is awaited on the async driver instead of
+    blocking the event loop.
+
+    With DB_SINGLE_WRITER, expense, chat-message and membership writes are
+    handed to the group-committing writer thread instead; the returned objects
+    are detached from ``db`` but fully loaded.
+    """
+
+    # User operations
+    @staticmethod
+    async def create_user(db: AsyncSession, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create a new user, hashing the password on the password-hash pool if needed."""
+        if hashed_password is None:
+            hashed_password = await AuthService.get_password_hash_async(user.password)
+        db_user = User(
+            name=user.name,
+            email=user.email,
+            hashed_password=hashed_password
+        )
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+
+    @staticmethod
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """Get user by email."""
+        result = await db.execute(select(User).where(User.email == email).limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+        """Get user by ID (cached; the result is a read-only copy)."""
+        async def load() -> Optional[User]:
+            user = await db.get(User, user_id)
+            return detached_copy(user) if user is not None else None
+        return await query_cache.get_async(db, "user", user_id, load)
+
+    @staticmethod
+    async def get_user_names(db: AsyncSession, user_ids: List[int]) -> Dict[int, str]:
+        """Get a user ID -> name map for several users in one query."""
+        unique_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not unique_ids:
+            return {}
+        result = await db.execute(select(User.id, User.name).where(User.id.in_(unique_ids)))
+        return dict(result.all())
+
+    @staticmethod
+    async def get_user_by_name(db: AsyncSession, name: str) -> Optional[User]:
+        """Get user by name (case-insensitive)."""
+        result = await db.execute(select(User).where(User.name.ilike(f"%{name}%")).limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
+        """Get all users."""
+        result = await db.execute(select(User).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    # Group operations
+    @staticmethod
+    async def create_group(db: AsyncSession, group: GroupCreate, creator_id: int) -> Group:
+        """Create a new group with members, returned as a read-only copy with members."""
+        db_group = await db.run_sync(CRUDService.create_group, group, creator_id)
+        return await AsyncCRUDService.get_group(db, db_group.id)
+
+    @staticmethod
+    async def get_groups(db: AsyncSession, skip: int = 0, limit: int = 100,
+                         user_id: Optional[int] = None) -> List[Group]:
+        """Get all groups, or only those a user belongs to, with members loaded."""
+        query = select(Group).options(selectinload(Group.members).selectinload(GroupMember.user))
+        if user_id is not None:
+            query = query.where(Group.id.in_(
+                select(GroupMember.group_id).where(GroupMember.user_id == user_id)
+            ))
+        result = await db.execute(query.order_by(Group.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_group(db: AsyncSession, group_id: int) -> Optional[Group]:
+        """Get a specific group by ID with its members (cached; the result is a read-only copy)."""
+        async def load() -> Optional[Group]:
+            result = await db.execute(
+                select(Group).options(
+                    selectinload(Group.members).selectinload(GroupMember.user)
+                ).where(Group.id == group_id).execution_options(populate_existing=True)
+            )
+            group = result.scalars().first()
+            return detached_group(group) if group is not None else None
+        return await query_cache.get_async(db, "group", group_id, load)
+
+    @staticmethod
+    async def get_group_members(db: AsyncSession, group_id: int) -> List[User]:
+        """Get all members of a group (cached; the results are read-only copies)."""
+        async def load() -> List[User]:
+            result = await db.execute(
+                select(User).join(GroupMember).where(GroupMember.group_id == group_id)
+            )
+            return [detached_copy(member) for member in result.scalars().all()]
+        return await query_cache.get_async(db, "group_members", group_id, load)
+
+    @staticmethod
+    async def get_user_groups(db: AsyncSession, user_id: int) -> List[Group]:
+        """Get all groups that a user is a member of."""
+        result = await db.execute(
+            select(Group).join(GroupMember).where(GroupMember.user_id == user_id)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def add_user_to_group(db: AsyncSession, group_id: int, user_email: str) -> bool:
+        """Add a user to a group by email."""
+        if not settings.DB_SINGLE_WRITER:
+            return await db.run_sync(CRUDService.add_user_to_group, group_id, user_email)
+        user_id = await db_writer.submit(CRUDService.stage_group_member, group_id, user_email)
+        if user_id is None:
+            return False
+        membership_index.invalidate(user_id)
+        return True
+
+    # Expense operations
+    @staticmethod
+    async def create_expense(db: AsyncSession, expense_data: dict, original_message: str = None) -> Expense:
+        """Create a new expense, its splits and rollup updates in one unit of work."""
+        if settings.DB_SINGLE_WRITER:
+            return await db_writer.submit(CRUDService.stage_expense, expense_data, original_message)
+        return await db.run_sync(CRUDService.create_expense, expense_data, original_message)
+
+    @staticmethod
+    async def update_expense_splits(db: AsyncSession, expense_id: int, split_amounts: Dict[int, float],
+                                    user_id: Optional[int] = None) -> None:
+        """Replace an expense's splits; reload it with ``get_expense`` afterwards."""
+        if settings.DB_SINGLE_WRITER:
+            await db_writer.submit(CRUDService.stage_expense_splits, expense_id, split_amounts, user_id)
+        else:
+            await db.run_sync(CRUDService.update_expense_splits, expense_id, split_amounts, user_id)
+
+    @staticmethod
+    async def get_expense(db: AsyncSession, expense_id: int) -> Optional[Expense]:
+        """Get an expense with payer and splits loaded (fresh, even if already in the session)."""
+        result = await db.execute(
+            select(Expense).options(
+                selectinload(Expense.payer),
+                selectinload(Expense.splits).selectinload(ExpenseSplit.user)
+            ).where(Expense.id == expense_id).execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_expenses(db: AsyncSession, group_id: Optional[int] = None,
+                           skip: int = 0, limit: int = 100) -> List[Expense]:
+        """Get expenses, optionally filtered by group."""
+        query = select(Expense)
+        if group_id:
+            query = query.where(Expense.group_id == group_id)
+        result = await db.execute(query.offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_group_expenses(db: AsyncSession, group_id: int) -> List[Expense]:
+        """Get all expenses for a specific group."""
+        result = await db.execute(select(Expense).where(Expense.group_id == group_id))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def query_expenses(db: AsyncSession, filters: ExpenseFilter,
+                             skip: int = 0, limit: int = 100) -> List[Expense]:
+        """Get expenses matching the filters, newest first, with payer and splits preloaded."""
+        return await db.run_sync(CRUDService.query_expenses, filters, skip, limit)
+
+    @staticmethod
+    async def aggregate_expenses(db: AsyncSession, filters: ExpenseFilter, group_by: str) -> List[ExpenseAggregate]:
+        """Count and sum the expenses matching the filters, grouped by payer, participant, day or month."""
+        return await db.run_sync(CRUDService.aggregate_expenses, filters, group_by)
+
+    # Chat operations
+    @staticmethod
+    async def create_chat_message(db: AsyncSession, group_id: int, user_id: int, message: str,
+                                  message_type: str = "text", expense_id: Optional[int] = None) -> ChatMessage:
+        """Create a new chat message."""
+        if settings.DB_SINGLE_WRITER:
+            return await db_writer.submit(
+                CRUDService.stage_chat_message, group_id, user_id, message, message_type, expense_id
+            )
+        db_message = ChatMessage(
+            group_id=group_id,
+            user_id=user_id,
+            message=message,
+            message_type=message_type,
+            expense_id=expense_id
+        )
+        db.add(db_message)
+        await db.commit()
+        await db.refresh(db_message)
+        return db_message
+
+    @staticmethod
+    async def get_chat_messages(db: AsyncSession, group_id: int, limit: int = 50) -> List[ChatMessage]:
+        """Get chat messages for a group, newest first."""
+        result = await db.execute(
+            select(ChatMessage).where(
+                ChatMessage.group_id == group_id
+            ).order_by(ChatMessage.created_at.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    # Breakdown calculations
+    @staticmethod
+    async def get_group_breakdown(db: AsyncSession, group_id: int) -> GroupBreakdown:
+        """Calculate expense breakdown for a group."""
+        return await db.run_sync(CRUDService.get_group_breakdown, group_id)
+
+    @staticmethod
+    async def get_user_overall_breakdown(db: AsyncSession, user_id: int) -> List[GroupBreakdown]:
+        """Get overall expense breakdown for a user across all groups."""
+        return await db.run_sync(CRUDService.get_user_overall_breakdown, user_id)
+
+    @staticmethod
+    async def get_user_group_summaries(db: AsyncSession, user_id: int) -> List[GroupSummary]:
+        """Get member/expense counts, totals, last activity and balance for each of a user's groups."""
+        return await db.run_sync(CRUDService.get_user_group_summaries, user_id)
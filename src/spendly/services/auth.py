@@ -1,15 +1,138 @@
 """Authentication service."""
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Set, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..models.user import User
+from ..core.cache import TTLCache
 from ..core.config import settings
+from ..core.metrics import LatencyRecorder
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs bcrypt work on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so hashing on these threads keeps the event loop
+    free. At most ``max_pending`` calls are queued or running; further callers
+    wait asynchronously for a slot instead of growing the queue.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a blocking hashing function on the pool and await its result."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (a later call re-creates them)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
+class PrincipalCache:
+    """Token -> resolved principal cache, invalidated per user.
+
+    Entries live for at most PRINCIPAL_CACHE_TTL_SECONDS and never beyond the
+    token's own expiry. A user index lets every cached token of a user be dropped
+    when that user changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._forget_token)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Any]:
+        """Return the cached principal for a token, if any."""
+        return self._cache.get(token)
+
+    def put(self, token: str, principal: Any, expires_at: Optional[float] = None) -> None:
+        """Cache a principal (anything with an ``id``) for a token."""
+        ttl = self._cache.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+            if ttl <= 0:
+                return
+        with self._lock:
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+        self._cache.set(token, principal, ttl=ttl)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of a user."""
+        with self._lock:
+            tokens = self._tokens_by_user.pop(user_id, set())
+        for token in tokens:
+            self._cache.pop(token)
+
+    def clear(self) -> None:
+        """Drop everything."""
+        with self._lock:
+            self._tokens_by_user.clear()
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        return {"size": len(self._cache), "hits": self._cache.hits, "misses": self._cache.misses}
+
+    def _forget_token(self, token: str, principal: Any) -> None:
+        with self._lock:
+            tokens = self._tokens_by_user.get(principal.id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_user[principal.id]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+auth_latency = LatencyRecorder()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    """Drop cached principals whenever a user row is updated or deleted."""
+    principal_cache.invalidate_user(target.id)
 
 
 class AuthService:
@@ -25,6 +148,37 @@ class AuthService:
         """Hash a password."""
         return pwd_context.hash(password)
 
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Hash a password on the password-hash pool."""
+        return await password_hasher.run(pwd_context.hash, password)
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the password-hash pool."""
+        return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+    @staticmethod
+    async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """Authenticate a user without blocking the event loop.
+
+        If the stored hash uses a different bcrypt cost than BCRYPT_ROUNDS, it is
+        transparently replaced with a fresh hash at the current cost.
+        """
+        result = await db.execute(select(User).where(User.email == email).limit(1))
+        user = result.scalars().first()
+        if not user:
+            return None
+        valid, new_hash = await password_hasher.run(
+            pwd_context.verify_and_update, password, user.hashed_password
+        )
+        if not valid:
+            return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+        return user
+
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         """Authenticate a user by email and password."""
@@ -48,22 +202,63 @@ class AuthService:
         return encoded_jwt
 
     @staticmethod
-    def verify_token(token: str) -> Optional[str]:
-        """Verify a JWT token and return the user email."""
+    def create_user_token(user: User, expires_delta: Optional[timedelta] = None) -> str:
+        """Create an access token carrying the user's email (sub) and ID (uid)."""
+        return AuthService.create_access_token(
+            data={"sub": user.email, "uid": user.id}, expires_delta=expires_delta
+        )
+
+    @staticmethod
+    def decode_token(token: str) -> Optional[Dict[str, Any]]:
+        """Verify a JWT token and return its payload."""
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            email: str = payload.get("sub")
-            if email is None:
-                return None
-            return email
         except JWTError:
             return None
+        if payload.get("sub") is None:
+            return None
+        return payload
+
+    @staticmethod
+    def verify_token(token: str) -> Optional[str]:
+        """Verify a JWT token and return the user email."""
+        payload = AuthService.decode_token(token)
+        return payload["sub"] if payload else None
+
+    @staticmethod
+    def get_user_for_payload(payload: Dict[str, Any], db: Session) -> Optional[User]:
+        """Load the user a verified token payload refers to.
+
+        Tokens with a ``uid`` claim use a primary-key lookup; older tokens that only
+        carry the email fall back to the email index.
+        """
+        email = payload["sub"]
+        user_id = payload.get("uid")
+        if user_id is not None:
+            user = db.get(User, user_id)
+            return user if user is not None and user.email == email else None
+        return db.query(User).filter(User.email == email).first()
+
+    @staticmethod
+    async def get_user_for_payload_async(payload: Dict[str, Any], db: AsyncSession) -> Optional[User]:
+        """Async form of ``get_user_for_payload``."""
+        email = payload["sub"]
+        user_id = payload.get("uid")
+        if user_id is not None:
+            user = await db.get(User, user_id)
+            return user if user is not None and user.email == email else None
+        result = await db.execute(select(User).where(User.email == email).limit(1))
+        return result.scalars().first()
 
     @staticmethod
     def get_current_user(token: str, db: Session) -> Optional[User]:
         """Get the current user from a JWT token."""
-        email = AuthService.verify_token(token)
-        if email is None:
+        payload = AuthService.decode_token(token)
+        if payload is None:
             return None
-        user = db.query(User).filter(User.email == email).first()
-        return user
+        return AuthService.get_user_for_payload(payload, db)
+
+    @staticmethod
+    def invalidate_user(user_id: int) -> None:
+        """Forget cached principals of a user whose record changed."""
+        principal_cache.invalidate_user(user_id)
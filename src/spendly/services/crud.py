@@ -1,13 +1,26 @@
 """CRUD operations service."""
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+import sys
+
+from sqlalchemy.orm import Session, Query, selectinload
+from sqlalchemy import func, exists
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from ..core.log import get_logger
+from ..core.sharding import is_sharded
 from ..models import User, Group, GroupMember, Expense, ExpenseSplit, ChatMessage
-from ..schemas import UserCreate, GroupCreate, ExpenseBreakdown, GroupBreakdown, ChatMessageResponse
+from ..schemas import (
+    UserCreate, GroupCreate, ExpenseBreakdown, ExpenseFilter, ExpenseAggregate,
+    GroupBreakdown, GroupSummary, ChatMessageResponse
+)
 from .auth import AuthService
+from .ledger import LedgerService, EXPENSE_ADDED, SPLITS_CHANGED, SETTLEMENT_RECORDED, expense_payload
+from .membership import membership_index
+from .query_cache import query_cache, detached_copy, detached_group
+from .rollups import RollupService
+
+logger = get_logger(__name__)
 
 
 class CRUDService:
@@ -15,9 +28,14 @@ class CRUDService:
 
     # User operations
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
-        """Create a new user with hashed password."""
-        hashed_password = AuthService.get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create a new user with hashed password.
+
+        Pass ``hashed_password`` when the hash was computed elsewhere (e.g. with
+        AuthService.get_password_hash_async); otherwise it is computed inline.
+        """
+        if hashed_password is None:
+            hashed_password = AuthService.get_password_hash(user.password)
         db_user = User(
             name=user.name, 
             email=user.email,
@@ -35,8 +53,19 @@ class CRUDService:
 
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
-        """Get user by ID."""
-        return db.query(User).filter(User.id == user_id).first()
+        """Get user by ID (cached; the result is a read-only copy)."""
+        def load() -> Optional[User]:
+            user = db.query(User).filter(User.id == user_id).first()
+            return detached_copy(user) if user is not None else None
+        return query_cache.get(db, "user", user_id, load)
+
+    @staticmethod
+    def get_user_names(db: Session, user_ids: List[int]) -> Dict[int, str]:
+        """Get a user ID -> name map for several users in one query."""
+        unique_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not unique_ids:
+            return {}
+        return dict(db.query(User.id, User.name).filter(User.id.in_(unique_ids)).all())
 
     @staticmethod
     def get_user_by_name(db: Session, name: str) -> Optional[User]:
@@ -62,33 +91,51 @@ class CRUDService:
         db.add(creator_membership)
         
         # Add other members to the group
+        member_ids = [creator_id]
         for email in group.member_emails:
             user = CRUDService.get_user_by_email(db, email)
             if user and user.id != creator_id:  # Don't add creator twice
                 membership = GroupMember(group_id=db_group.id, user_id=user.id)
                 db.add(membership)
+                member_ids.append(user.id)
         
+        query_cache.invalidate_on_commit(db, "group", db_group.id)
+        query_cache.invalidate_on_commit(db, "group_members", db_group.id)
         db.commit()
+        membership_index.invalidate(*member_ids)
         return db_group
 
     @staticmethod
-    def get_groups(db: Session, skip: int = 0, limit: int = 100) -> List[Group]:
-        """Get all groups."""
+    def get_groups(db: Session, skip: int = 0, limit: int = 100, user_id: Optional[int] = None) -> List[Group]:
+        """Get all groups, or only those a user belongs to."""
         from sqlalchemy.orm import joinedload
         from ..models.group import GroupMember
-        return db.query(Group).options(joinedload(Group.members).joinedload(GroupMember.user)).offset(skip).limit(limit).all()
+        query = db.query(Group).options(joinedload(Group.members).joinedload(GroupMember.user))
+        if user_id is not None:
+            query = query.filter(Group.id.in_(
+                db.query(GroupMember.group_id).filter(GroupMember.user_id == user_id)
+            ))
+        return query.order_by(Group.id).offset(skip).limit(limit).all()
 
     @staticmethod
     def get_group(db: Session, group_id: int) -> Group:
-        """Get a specific group by ID."""
+        """Get a specific group by ID with its members (cached; the result is a read-only copy)."""
         from sqlalchemy.orm import joinedload
         from ..models.group import GroupMember
-        return db.query(Group).options(joinedload(Group.members).joinedload(GroupMember.user)).filter(Group.id == group_id).first()
+        def load() -> Optional[Group]:
+            group = db.query(Group).options(
+                joinedload(Group.members).joinedload(GroupMember.user)
+            ).filter(Group.id == group_id).first()
+            return detached_group(group) if group is not None else None
+        return query_cache.get(db, "group", group_id, load)
 
     @staticmethod
     def get_group_members(db: Session, group_id: int) -> List[User]:
-        """Get all members of a group."""
-        return db.query(User).join(GroupMember).filter(GroupMember.group_id == group_id).all()
+        """Get all members of a group (cached; the results are read-only copies)."""
+        def load() -> List[User]:
+            members = db.query(User).join(GroupMember).filter(GroupMember.group_id == group_id).all()
+            return [detached_copy(member) for member in members]
+        return query_cache.get(db, "group_members", group_id, load)
 
     @staticmethod
     def get_user_groups(db: Session, user_id: int) -> List[Group]:
@@ -98,9 +145,19 @@ class CRUDService:
     @staticmethod
     def add_user_to_group(db: Session, group_id: int, user_email: str) -> bool:
         """Add a user to a group by email."""
+        user_id = CRUDService.stage_group_member(db, group_id, user_email)
+        if user_id is None:
+            return False
+        db.commit()
+        membership_index.invalidate(user_id)
+        return True
+
+    @staticmethod
+    def stage_group_member(db: Session, group_id: int, user_email: str) -> Optional[int]:
+        """Add a membership to the session without committing; return the user's ID, or None if not added."""
         user = CRUDService.get_user_by_email(db, user_email)
         if not user:
-            return False
+            return None
         
         # Check if user is already a member
         existing_membership = db.query(GroupMember).filter(
@@ -109,110 +166,175 @@ class CRUDService:
         ).first()
         
         if existing_membership:
-            return False
+            return None
         
         membership = GroupMember(group_id=group_id, user_id=user.id)
         db.add(membership)
-        db.commit()
-        return True
+        db.flush()
+        query_cache.invalidate_on_commit(db, "group", group_id)
+        query_cache.invalidate_on_commit(db, "group_members", group_id)
+        return user.id
 
     # Expense operations
     @staticmethod
     def create_expense(db: Session, expense_data: dict, original_message: str = None) -> Expense:
         """Create a new expense from parsed data with advanced splitting support."""
-        print(f"🔍 DEBUG: Creating expense with data: {expense_data}")
-        
         try:
-            db_expense = Expense(
-                description=expense_data["description"],
-                amount=expense_data["amount"],
-                paid_by=expense_data["paid_by"],
-                group_id=expense_data["group_id"],
-                original_message=original_message
-            )
-            print(f"✅ DEBUG: Created expense object: {db_expense}")
-            
-            db.add(db_expense)
-            print(f"✅ DEBUG: Added expense to session")
-            
-            db.commit()
-            print(f"✅ DEBUG: Committed expense to database")
-            
-            db.refresh(db_expense)
-            print(f"✅ DEBUG: Refreshed expense, ID: {db_expense.id}")
-            
-            # Create expense splits based on split_among data
-            split_users = expense_data.get("split_among", "all")
-            split_details = expense_data.get("split_details", {})  # Custom amounts per user
-            expense_type = expense_data.get("expense_type", "split")
-            
-            print(f"🔍 DEBUG: Creating splits for: {split_users}")
-            print(f"🔍 DEBUG: Expense type: {expense_type}")
-            print(f"🔍 DEBUG: Split details: {split_details}")
-            
-            if split_details:
-                # Use custom split amounts
-                print(f"🔍 DEBUG: Using custom split amounts")
-                for user_id, amount in split_details.items():
-                    split = ExpenseSplit(
-                        expense_id=db_expense.id,
-                        user_id=user_id,
-                        amount=amount
-                    )
-                    db.add(split)
-                    print(f"✅ DEBUG: Added custom split for user {user_id}: ${amount}")
-                    
-            elif split_users == "all":
-                # Split equally among all group members
-                members = CRUDService.get_group_members(db, expense_data["group_id"])
-                print(f"🔍 DEBUG: Found {len(members)} group members for equal split")
-                split_amount = expense_data["amount"] / len(members)
-                for member in members:
-                    split = ExpenseSplit(
-                        expense_id=db_expense.id,
-                        user_id=member.id,
-                        amount=split_amount
-                    )
-                    db.add(split)
-                    print(f"✅ DEBUG: Added equal split for user {member.id}: ${split_amount}")
-                    
-            elif isinstance(split_users, list):
-                # Split equally among specified user IDs
-                print(f"🔍 DEBUG: Splitting equally among specific users: {split_users}")
-                split_amount = expense_data["amount"] / len(split_users)
-                for user_id in split_users:
-                    split = ExpenseSplit(
-                        expense_id=db_expense.id,
-                        user_id=user_id,
-                        amount=split_amount
-                    )
-                    db.add(split)
-                    print(f"✅ DEBUG: Added equal split for user {user_id}: ${split_amount}")
-            else:
-                # Fallback: split equally among all group members
-                print(f"🔍 DEBUG: Fallback - splitting equally among all group members")
-                members = CRUDService.get_group_members(db, expense_data["group_id"])
-                split_amount = expense_data["amount"] / len(members)
-                for member in members:
-                    split = ExpenseSplit(
-                        expense_id=db_expense.id,
-                        user_id=member.id,
-                        amount=split_amount
-                    )
-                    db.add(split)
-                    print(f"✅ DEBUG: Added fallback split for user {member.id}: ${split_amount}")
-            
+            db_expense = CRUDService.stage_expense(db, expense_data, original_message)
             db.commit()
-            print(f"✅ DEBUG: Committed splits to database")
             return db_expense
             
-        except Exception as e:
-            print(f"❌ DEBUG: Error in create_expense: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error creating expense in group %s", expense_data.get("group_id"))
             db.rollback()
             raise
 
+    @staticmethod
+    def stage_expense(db: Session, expense_data: dict, original_message: str = None) -> Expense:
+        """Add an expense, its splits and rollup updates to the session without committing."""
+        db_expense = Expense(
+            description=expense_data["description"],
+            amount=expense_data["amount"],
+            paid_by=expense_data["paid_by"],
+            group_id=expense_data["group_id"],
+            original_message=original_message
+        )
+        db.add(db_expense)
+        db.flush()
+        
+        # Create expense splits based on split_among data
+        split_users = expense_data.get("split_among", "all")
+        split_details = expense_data.get("split_details", {})  # Custom amounts per user
+        expense_type = expense_data.get("expense_type", "split")
+        
+        split_amounts = {}  # user_id -> total owed, for the spending rollups
+        if split_details:
+            # Use custom split amounts
+            for user_id, amount in split_details.items():
+                split = ExpenseSplit(
+                    expense_id=db_expense.id,
+                    user_id=user_id,
+                    amount=amount
+                )
+                db.add(split)
+                split_amounts[user_id] = split_amounts.get(user_id, 0) + amount
+                
+        elif split_users == "all":
+            # Split equally among all group members
+            members = CRUDService.get_group_members(db, expense_data["group_id"])
+            split_amount = expense_data["amount"] / len(members)
+            for member in members:
+                split = ExpenseSplit(
+                    expense_id=db_expense.id,
+                    user_id=member.id,
+                    amount=split_amount
+                )
+                db.add(split)
+                split_amounts[member.id] = split_amounts.get(member.id, 0) + split_amount
+                
+        elif isinstance(split_users, list):
+            # Split equally among specified user IDs
+            split_amount = expense_data["amount"] / len(split_users)
+            for user_id in split_users:
+                split = ExpenseSplit(
+                    expense_id=db_expense.id,
+                    user_id=user_id,
+                    amount=split_amount
+                )
+                db.add(split)
+                split_amounts[user_id] = split_amounts.get(user_id, 0) + split_amount
+        else:
+            # Fallback: split equally among all group members
+            members = CRUDService.get_group_members(db, expense_data["group_id"])
+            split_amount = expense_data["amount"] / len(members)
+            for member in members:
+                split = ExpenseSplit(
+                    expense_id=db_expense.id,
+                    user_id=member.id,
+                    amount=split_amount
+                )
+                db.add(split)
+                split_amounts[member.id] = split_amounts.get(member.id, 0) + split_amount
+        
+        logger.debug("Staged %s expense %s in group %s: %.2f paid by %s, splits %s",
+                     expense_type, db_expense.id, db_expense.group_id, db_expense.amount,
+                     db_expense.paid_by, split_amounts)
+        
+        # Keep the spending rollups in step; committed together with the splits
+        RollupService.record_expense(
+            db,
+            group_id=db_expense.group_id,
+            paid_by=db_expense.paid_by,
+            amount=db_expense.amount,
+            created_at=db_expense.created_at,
+            split_amounts=split_amounts
+        )
+        # ...and journal it, so balance projections and change feeds see it
+        LedgerService.append(
+            db,
+            db_expense.group_id,
+            SETTLEMENT_RECORDED if expense_type == "settlement" else EXPENSE_ADDED,
+            expense_payload(db_expense, split_amounts),
+            expense_id=db_expense.id,
+            user_id=expense_data.get("recorded_by")
+        )
+        
+        db.flush()
+        return db_expense
+
+    @staticmethod
+    def update_expense_splits(db: Session, expense_id: int, split_amounts: Dict[int, float],
+                              user_id: Optional[int] = None) -> Expense:
+        """Replace an expense's splits and commit."""
+        try:
+            expense = CRUDService.stage_expense_splits(db, expense_id, split_amounts, user_id)
+            db.commit()
+            return expense
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def stage_expense_splits(db: Session, expense_id: int, split_amounts: Dict[int, float],
+                             user_id: Optional[int] = None) -> Expense:
+        """Replace an expense's splits, journal the change and adjust the rollups, without committing.
+
+        The new amounts must add up to the expense amount and name group
+        members only; otherwise ValueError is raised and nothing changes.
+        """
+        expense = db.query(Expense).options(selectinload(Expense.splits)).filter(Expense.id == expense_id).first()
+        if expense is None:
+            raise ValueError(f"Expense {expense_id} not found")
+        if not split_amounts:
+            raise ValueError("At least one split is required")
+        if abs(sum(split_amounts.values()) - expense.amount) > 0.01:
+            raise ValueError(f"Splits add up to {sum(split_amounts.values()):.2f}, not {expense.amount:.2f}")
+        member_ids = {member.id for member in CRUDService.get_group_members(db, expense.group_id)}
+        strangers = sorted(set(split_amounts) - member_ids)
+        if strangers:
+            raise ValueError(f"Users {strangers} are not members of the group")
+
+        old_splits: Dict[int, float] = {}
+        for split in expense.splits:
+            old_splits[split.user_id] = old_splits.get(split.user_id, 0.0) + split.amount
+            db.delete(split)
+        for split_user_id, amount in split_amounts.items():
+            db.add(ExpenseSplit(expense_id=expense.id, user_id=split_user_id, amount=amount))
+
+        RollupService.record_split_change(
+            db, expense.group_id, expense.paid_by, expense.created_at, old_splits, split_amounts
+        )
+        LedgerService.append(
+            db,
+            expense.group_id,
+            SPLITS_CHANGED,
+            {"old_splits": old_splits, "new_splits": split_amounts},
+            expense_id=expense.id,
+            user_id=user_id
+        )
+        db.flush()
+        return expense
+
     @staticmethod
     def get_expenses(db: Session, group_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Expense]:
         """Get expenses, optionally filtered by group."""
@@ -226,11 +348,149 @@ class CRUDService:
         """Get all expenses for a specific group."""
         return db.query(Expense).filter(Expense.group_id == group_id).all()
 
+    # Expense filters are applied in SQL so the composite indexes on
+    # (group_id, created_at | paid_by | amount | description) and
+    # (user_id, expense_id) on splits can be used.
+    EXPENSE_AGGREGATIONS = ("payer", "participant", "day", "month")
+
+    @staticmethod
+    def _prefix_upper_bound(prefix: str) -> Optional[str]:
+        """Return the smallest string above every string starting with ``prefix``.
+
+        Trailing U+10FFFF characters cannot be incremented and are dropped;
+        None means no upper bound is needed. Surrogates are skipped, since
+        they cannot be encoded as UTF-8 for the database.
+        """
+        stem = prefix.rstrip(chr(sys.maxunicode))
+        if not stem:
+            return None
+        code_point = ord(stem[-1]) + 1
+        if 0xD800 <= code_point <= 0xDFFF:
+            code_point = 0xE000
+        return stem[:-1] + chr(code_point)
+
+    @staticmethod
+    def _apply_expense_filters(query: Query, filters: ExpenseFilter) -> Query:
+        """Apply the set fields of an ExpenseFilter to a query over Expense."""
+        if filters.group_id is not None:
+            query = query.filter(Expense.group_id == filters.group_id)
+        if filters.group_ids is not None:
+            query = query.filter(Expense.group_id.in_(filters.group_ids))
+        if filters.paid_by is not None:
+            query = query.filter(Expense.paid_by == filters.paid_by)
+        if filters.start_date is not None:
+            query = query.filter(Expense.created_at >= filters.start_date)
+        if filters.end_date is not None:
+            query = query.filter(Expense.created_at < filters.end_date)
+        if filters.min_amount is not None:
+            query = query.filter(Expense.amount >= filters.min_amount)
+        if filters.max_amount is not None:
+            query = query.filter(Expense.amount <= filters.max_amount)
+        if filters.description_prefix:
+            # A half-open range instead of LIKE keeps the description index usable;
+            # unlike LIKE it compares case-sensitively
+            prefix = filters.description_prefix
+            query = query.filter(Expense.description >= prefix)
+            upper_bound = CRUDService._prefix_upper_bound(prefix)
+            if upper_bound is not None:
+                query = query.filter(Expense.description < upper_bound)
+        if filters.participant_id is not None:
+            query = query.filter(exists().where(
+                ExpenseSplit.expense_id == Expense.id,
+                ExpenseSplit.user_id == filters.participant_id
+            ))
+        return query
+
+    @staticmethod
+    def query_expenses(db: Session, filters: ExpenseFilter, skip: int = 0, limit: int = 100) -> List[Expense]:
+        """Get expenses matching the filters, newest first, with payer and splits preloaded."""
+        query = db.query(Expense).options(
+            selectinload(Expense.payer),
+            selectinload(Expense.splits).selectinload(ExpenseSplit.user)
+        )
+        query = CRUDService._apply_expense_filters(query, filters).order_by(
+            Expense.created_at.desc(), Expense.id.desc()
+        )
+        if not is_sharded(db):
+            return query.offset(skip).limit(limit).all()
+        # Each shard returns its own newest rows; merge them and page here
+        expenses = query.limit(skip + limit).all()
+        expenses.sort(key=lambda expense: (expense.created_at, expense.id), reverse=True)
+        return expenses[skip:skip + limit]
+
+    @staticmethod
+    def aggregate_expenses(db: Session, filters: ExpenseFilter, group_by: str) -> List[ExpenseAggregate]:
+        """Count and sum the expenses matching the filters, grouped by payer, participant, day or month.
+
+        Payer/day/month buckets sum expense amounts; participant buckets sum each
+        user's split amounts and count the expenses they take part in.
+        """
+        if group_by not in CRUDService.EXPENSE_AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation '{group_by}'")
+
+        if group_by == "participant":
+            query = db.query(
+                ExpenseSplit.user_id.label("key"),
+                func.count(func.distinct(ExpenseSplit.expense_id)).label("count"),
+                func.sum(ExpenseSplit.amount).label("total")
+            ).select_from(ExpenseSplit).join(Expense, Expense.id == ExpenseSplit.expense_id)
+            group_column = ExpenseSplit.user_id
+        elif group_by == "payer":
+            query = db.query(
+                Expense.paid_by.label("key"),
+                func.count(Expense.id).label("count"),
+                func.sum(Expense.amount).label("total")
+            )
+            group_column = Expense.paid_by
+        else:
+            period_format = "%Y-%m-%d" if group_by == "day" else "%Y-%m"
+            group_column = func.strftime(period_format, Expense.created_at)
+            query = db.query(
+                group_column.label("key"),
+                func.count(Expense.id).label("count"),
+                func.sum(Expense.amount).label("total")
+            )
+
+        query = CRUDService._apply_expense_filters(query, filters)
+        rows = query.group_by(group_column).order_by(group_column).all()
+
+        # A bucket can come back once per shard when sharded; add them up
+        buckets: Dict = {}
+        for row in rows:
+            count, total = buckets.get(row.key, (0, 0.0))
+            buckets[row.key] = (count + row.count, total + float(row.total or 0))
+
+        # User names come from a second query, since users and expenses may
+        # live in different databases; unknown users are left out
+        labels: Dict = {}
+        if group_by in ("payer", "participant"):
+            labels = CRUDService.get_user_names(db, list(buckets))
+            buckets = {key: value for key, value in buckets.items() if key in labels}
+
+        return [
+            ExpenseAggregate(
+                key=str(key),
+                label=labels.get(key),
+                count=count,
+                total=total
+            )
+            for key, (count, total) in sorted(buckets.items(), key=lambda item: (item[0] is None, item[0] or 0))
+        ]
+
     # Chat operations
     @staticmethod
     def create_chat_message(db: Session, group_id: int, user_id: int, message: str, 
                           message_type: str = "text", expense_id: Optional[int] = None) -> ChatMessage:
         """Create a new chat message."""
+        db_message = CRUDService.stage_chat_message(db, group_id, user_id, message, message_type, expense_id)
+        db.commit()
+        db.refresh(db_message)
+        return db_message
+
+    @staticmethod
+    def stage_chat_message(db: Session, group_id: int, user_id: int, message: str,
+                           message_type: str = "text", expense_id: Optional[int] = None) -> ChatMessage:
+        """Add a chat message to the session without committing."""
         db_message = ChatMessage(
             group_id=group_id,
             user_id=user_id,
@@ -239,8 +499,7 @@ class CRUDService:
             expense_id=expense_id
         )
         db.add(db_message)
-        db.commit()
-        db.refresh(db_message)
+        db.flush()
         return db_message
 
     @staticmethod
@@ -311,3 +570,149 @@ class CRUDService:
             breakdowns.append(breakdown)
         
         return breakdowns
+
+    @staticmethod
+    def get_user_group_summaries(db: Session, user_id: int) -> List[GroupSummary]:
+        """Get member/expense counts, totals, last activity and balance for each of a user's groups.
+
+        Everything is computed in a single statement: each figure comes from a grouped
+        subquery restricted to the user's groups and outer-joined onto the membership row.
+        Sharded sessions cannot join across databases and use a few queries instead.
+        """
+        if is_sharded(db):
+            return CRUDService._get_user_group_summaries_sharded(db, user_id)
+
+        my_group_ids = db.query(GroupMember.group_id).filter(GroupMember.user_id == user_id)
+
+        member_counts = db.query(
+            GroupMember.group_id.label("group_id"),
+            func.count(GroupMember.id).label("member_count")
+        ).filter(GroupMember.group_id.in_(my_group_ids)).group_by(GroupMember.group_id).subquery()
+
+        expense_totals = db.query(
+            Expense.group_id.label("group_id"),
+            func.count(Expense.id).label("expense_count"),
+            func.sum(Expense.amount).label("total_amount"),
+            func.max(Expense.created_at).label("last_expense_at")
+        ).filter(Expense.group_id.in_(my_group_ids)).group_by(Expense.group_id).subquery()
+
+        my_paid = db.query(
+            Expense.group_id.label("group_id"),
+            func.sum(Expense.amount).label("paid")
+        ).filter(
+            Expense.group_id.in_(my_group_ids),
+            Expense.paid_by == user_id
+        ).group_by(Expense.group_id).subquery()
+
+        my_owed = db.query(
+            Expense.group_id.label("group_id"),
+            func.sum(ExpenseSplit.amount).label("owed")
+        ).join(ExpenseSplit, ExpenseSplit.expense_id == Expense.id).filter(
+            Expense.group_id.in_(my_group_ids),
+            ExpenseSplit.user_id == user_id
+        ).group_by(Expense.group_id).subquery()
+
+        last_messages = db.query(
+            ChatMessage.group_id.label("group_id"),
+            func.max(ChatMessage.created_at).label("last_message_at")
+        ).filter(ChatMessage.group_id.in_(my_group_ids)).group_by(ChatMessage.group_id).subquery()
+
+        rows = db.query(
+            Group.id,
+            Group.name,
+            Group.created_at,
+            member_counts.c.member_count,
+            expense_totals.c.expense_count,
+            expense_totals.c.total_amount,
+            expense_totals.c.last_expense_at,
+            last_messages.c.last_message_at,
+            my_paid.c.paid,
+            my_owed.c.owed
+        ).join(
+            GroupMember, GroupMember.group_id == Group.id
+        ).outerjoin(
+            member_counts, member_counts.c.group_id == Group.id
+        ).outerjoin(
+            expense_totals, expense_totals.c.group_id == Group.id
+        ).outerjoin(
+            last_messages, last_messages.c.group_id == Group.id
+        ).outerjoin(
+            my_paid, my_paid.c.group_id == Group.id
+        ).outerjoin(
+            my_owed, my_owed.c.group_id == Group.id
+        ).filter(GroupMember.user_id == user_id).order_by(Group.id).all()
+
+        summaries = []
+        for row in rows:
+            activity = [ts for ts in (row.last_expense_at, row.last_message_at, row.created_at) if ts]
+            summaries.append(GroupSummary(
+                group_id=row.id,
+                group_name=row.name,
+                member_count=row.member_count or 0,
+                expense_count=row.expense_count or 0,
+                total_amount=float(row.total_amount or 0),
+                last_activity=max(activity) if activity else None,
+                my_balance=float((row.paid or 0) - (row.owed or 0))
+            ))
+
+        return summaries
+
+    @staticmethod
+    def _get_user_group_summaries_sharded(db: Session, user_id: int) -> List[GroupSummary]:
+        """get_user_group_summaries for a sharded session.
+
+        Groups and member counts come from the catalog, then each activity figure
+        from one grouped query per figure, run on the shards holding the groups.
+        """
+        groups = db.query(
+            Group.id,
+            Group.name,
+            Group.created_at,
+            func.count(GroupMember.id).label("member_count")
+        ).join(
+            GroupMember, GroupMember.group_id == Group.id
+        ).filter(
+            Group.id.in_(db.query(GroupMember.group_id).filter(GroupMember.user_id == user_id))
+        ).group_by(Group.id).order_by(Group.id).all()
+        group_ids = [group.id for group in groups]
+        if not group_ids:
+            return []
+
+        expense_totals = {
+            row.group_id: row for row in db.query(
+                Expense.group_id,
+                func.count(Expense.id).label("expense_count"),
+                func.sum(Expense.amount).label("total_amount"),
+                func.max(Expense.created_at).label("last_expense_at")
+            ).filter(Expense.group_id.in_(group_ids)).group_by(Expense.group_id)
+        }
+        my_paid = dict(db.query(Expense.group_id, func.sum(Expense.amount)).filter(
+            Expense.group_id.in_(group_ids),
+            Expense.paid_by == user_id
+        ).group_by(Expense.group_id).all())
+        my_owed = dict(db.query(Expense.group_id, func.sum(ExpenseSplit.amount)).join(
+            ExpenseSplit, ExpenseSplit.expense_id == Expense.id
+        ).filter(
+            Expense.group_id.in_(group_ids),
+            ExpenseSplit.user_id == user_id
+        ).group_by(Expense.group_id).all())
+        last_messages = dict(db.query(ChatMessage.group_id, func.max(ChatMessage.created_at)).filter(
+            ChatMessage.group_id.in_(group_ids)
+        ).group_by(ChatMessage.group_id).all())
+
+        summaries = []
+        for group in groups:
+            totals = expense_totals.get(group.id)
+            last_expense_at = totals.last_expense_at if totals else None
+            activity = [ts for ts in (last_expense_at, last_messages.get(group.id), group.created_at) if ts]
+            summaries.append(GroupSummary(
+                group_id=group.id,
+                group_name=group.name,
+                member_count=group.member_count,
+                expense_count=totals.expense_count if totals else 0,
+                total_amount=float(totals.total_amount or 0) if totals else 0.0,
+                last_activity=max(activity) if activity else None,
+                my_balance=float((my_paid.get(group.id) or 0) - (my_owed.get(group.id) or 0))
+            ))
+
+        return summaries
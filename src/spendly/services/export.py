@@ -0,0 +1,147 @@
+"""Ledger export service."""
+
+import csv
+import io
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models import User, GroupMember, Expense, ExpenseSplit
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+CSV_COLUMNS = [
+    "expense_id", "created_at", "description", "amount", "paid_by", "payer_name",
+    "split_id", "split_user_id", "split_user_name", "split_amount", "original_message",
+]
+
+
+class LedgerExportService:
+    """Service for streaming a group's expenses and splits as CSV or JSONL."""
+
+    # Rows fetched per cursor round trip, and rows (or expenses) emitted per chunk
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def iter_ledger_rows(db: Session, group_id: int) -> Iterator[Tuple]:
+        """Yield one flat row per (expense, split), ordered by expense.
+
+        Expenses without splits yield a single row with empty split columns. Rows are
+        streamed with yield_per so memory stays flat regardless of ledger size.
+        User names are filled in from a separate lookup rather than a join, since
+        users and expenses live in different databases when sharded.
+        """
+        query = db.query(
+            Expense.id,
+            Expense.created_at,
+            Expense.description,
+            Expense.amount,
+            Expense.paid_by,
+            ExpenseSplit.id,
+            ExpenseSplit.user_id,
+            ExpenseSplit.amount,
+            Expense.original_message
+        ).outerjoin(
+            ExpenseSplit, ExpenseSplit.expense_id == Expense.id
+        ).filter(
+            Expense.group_id == group_id
+        ).order_by(Expense.id, ExpenseSplit.id)
+
+        names: Dict[int, Optional[str]] = dict(
+            db.query(User.id, User.name).join(GroupMember, GroupMember.user_id == User.id).filter(
+                GroupMember.group_id == group_id
+            ).all()
+        )
+
+        def name_of(user_id: Optional[int]) -> Optional[str]:
+            if user_id is None:
+                return None
+            if user_id not in names:
+                # Payers or split users who are not (or no longer) members
+                names[user_id] = db.query(User.name).filter(User.id == user_id).scalar()
+            return names[user_id]
+
+        for (expense_id, created_at, description, amount, paid_by,
+             split_id, split_user_id, split_amount, original_message) in \
+                query.execution_options(stream_results=True).yield_per(LedgerExportService.BATCH_SIZE):
+            yield (expense_id, created_at, description, amount, paid_by, name_of(paid_by),
+                   split_id, split_user_id, name_of(split_user_id), split_amount, original_message)
+
+    @staticmethod
+    def iter_csv(db: Session, group_id: int) -> Iterator[str]:
+        """Yield the ledger as CSV text, header first, one line per split."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        # Send the header straight away so the download starts before the first batch
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        pending = 0
+        for row in LedgerExportService.iter_ledger_rows(db, group_id):
+            values = list(row)
+            values[1] = values[1].isoformat() if values[1] else ""
+            writer.writerow(["" if value is None else value for value in values])
+            pending += 1
+            if pending >= LedgerExportService.BATCH_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if pending:
+            yield buffer.getvalue()
+
+    @staticmethod
+    def iter_jsonl(db: Session, group_id: int) -> Iterator[str]:
+        """Yield the ledger as JSON Lines, one expense per line with its splits nested."""
+        lines: List[str] = []
+        current: Optional[Dict] = None
+        for (expense_id, created_at, description, amount, paid_by, payer_name,
+             split_id, split_user_id, split_user_name, split_amount, original_message) in \
+                LedgerExportService.iter_ledger_rows(db, group_id):
+            if current is None or current["id"] != expense_id:
+                if current is not None:
+                    lines.append(json.dumps(current))
+                    if len(lines) >= LedgerExportService.BATCH_SIZE:
+                        yield "\n".join(lines) + "\n"
+                        lines = []
+                current = {
+                    "id": expense_id,
+                    "created_at": created_at.isoformat() if created_at else None,
+                    "description": description,
+                    "amount": amount,
+                    "paid_by": paid_by,
+                    "payer_name": payer_name,
+                    "original_message": original_message,
+                    "splits": [],
+                }
+            if split_id is not None:
+                current["splits"].append({
+                    "id": split_id,
+                    "user_id": split_user_id,
+                    "member_name": split_user_name,
+                    "amount": split_amount,
+                })
+        if current is not None:
+            lines.append(json.dumps(current))
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    @staticmethod
+    def stream_export(group_id: int, export_format: str) -> Iterator[str]:
+        """Stream an export using its own session.
+
+        The request's session is closed before a streaming body is sent, so the
+        generator owns a session for as long as the client keeps reading.
+        """
+        db = SessionLocal()
+        try:
+            if export_format == "csv":
+                yield from LedgerExportService.iter_csv(db, group_id)
+            else:
+                yield from LedgerExportService.iter_jsonl(db, group_id)
+        finally:
+            db.close()
@@ -1,11 +1,62 @@
 """Gemini AI service for expense parsing."""
 
-import google.generativeai as genai
+import asyncio
 import json
 import re
-from typing import Dict, Optional
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
 
 from ..core.config import settings
+from ..core.log import get_logger
+from ..core.metrics import CallRecorder
+
+logger = get_logger(__name__)
+
+# Outcome of a parse call, as recorded in llm_calls
+OUTCOME_OK = "ok"
+OUTCOME_UNAVAILABLE = "unavailable"        # No model configured
+OUTCOME_TIMEOUT = "timeout"                # Every attempt exceeded GEMINI_TIMEOUT_SECONDS
+OUTCOME_API_ERROR = "api_error"            # The API call raised
+OUTCOME_EMPTY = "empty_response"           # No text (e.g. blocked by safety filters)
+OUTCOME_NO_JSON = "no_json"                # No JSON object in the text
+OUTCOME_INVALID_JSON = "invalid_json"      # Something like JSON that does not parse
+OUTCOME_DECLINED = "declined"              # The model answered {"error": ...}
+OUTCOME_SPLIT_MISMATCH = "split_mismatch"  # Parsed, but the splits do not add up to the amount
+
+# Recent parse calls, for GET /api/expenses/llm-metrics
+llm_calls = CallRecorder(window=settings.LLM_METRICS_WINDOW)
+
+
+def transient_errors() -> Tuple[type, ...]:
+    """Exceptions worth retrying: timeouts and the API's overload/internal errors.
+
+    Anything else (bad key, invalid argument, a bug) fails the call at once.
+    """
+    # Imported here because the SDK is only loaded when a key is configured
+    from google.api_core import exceptions
+
+    return (
+        asyncio.TimeoutError,
+        exceptions.ServiceUnavailable,
+        exceptions.ResourceExhausted,
+        exceptions.DeadlineExceeded,
+        exceptions.InternalServerError,
+    )
+
+
+_service: Optional["GeminiService"] = None
+_service_lock = threading.Lock()
+
+
+def get_gemini_service() -> "GeminiService":
+    """Return the process-wide Gemini service, creating it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GeminiService()
+    return _service
 
 
 class GeminiService:
@@ -14,11 +65,14 @@ class GeminiService:
     def __init__(self):
         """Initialize the Gemini service."""
         if not settings.GEMINI_API_KEY:
-            print("Warning: GEMINI_API_KEY not found. Gemini service disabled.")
+            logger.warning("GEMINI_API_KEY not found. Gemini service disabled.")
             self.model = None
+            self.model_name = None
             return
         
         try:
+            # The SDK takes most of a second to import, so only when a key is set
+            import google.generativeai as genai
             genai.configure(api_key=settings.GEMINI_API_KEY)
             
             # Try different model names in order of preference
@@ -31,34 +85,36 @@ class GeminiService:
             ]
             
             self.model = None
+            self.model_name = None
             for model_name in model_names:
                 try:
-                    print(f"Trying to initialize Gemini model: {model_name}")
+                    logger.debug("Trying to initialize Gemini model %s", model_name)
                     self.model = genai.GenerativeModel(model_name)
-                    print(f"✅ Successfully initialized Gemini model: {model_name}")
+                    self.model_name = model_name
+                    logger.info("Initialized Gemini model %s", model_name)
                     break
                 except Exception as e:
-                    print(f"❌ Failed to initialize {model_name}: {e}")
+                    logger.warning("Failed to initialize Gemini model %s: %s", model_name, e)
                     continue
             
             if not self.model:
-                print("❌ Error: Could not initialize any Gemini model")
+                logger.error("Could not initialize any Gemini model")
                 
-        except Exception as e:
-            print(f"❌ Error initializing Gemini service: {e}")
+        except Exception:
+            logger.exception("Error initializing Gemini service")
             self.model = None
+            self.model_name = None
     
     def list_available_models(self):
         """List all available Gemini models for debugging."""
         try:
+            import google.generativeai as genai
             models = genai.list_models()
-            print("Available Gemini models:")
             for model in models:
-                print(f"  - {model.name}")
-                if hasattr(model, 'supported_generation_methods'):
-                    print(f"    Supports: {model.supported_generation_methods}")
+                logger.info("Available Gemini model %s (supports %s)",
+                            model.name, getattr(model, 'supported_generation_methods', "?"))
         except Exception as e:
-            print(f"Error listing models: {e}")
+            logger.warning("Error listing Gemini models: %s", e)
     
     async def parse_expense_message(self, message: str, user_names: list = None) -> Optional[Dict]:
         """
@@ -73,7 +129,8 @@ class GeminiService:
         """
         
         if not self.model:
-            print("❌ Gemini model not available")
+            logger.warning("Gemini model not available")
+            llm_calls.record(outcome=OUTCOME_UNAVAILABLE, latency_ms=0.0, model=None)
             return None
         
         user_names_str = ", ".join(user_names) if user_names else "any user names mentioned"
@@ -178,23 +235,79 @@ class GeminiService:
         {{"error": "Could not parse expense from message"}}
         """
         
+        call: Dict[str, Any] = {
+            "model": self.model_name,
+            "prompt_chars": len(prompt),
+            "response_chars": 0,
+            "retries": 0,
+            "prompt_tokens": None,
+            "response_tokens": None,
+        }
+        started = time.perf_counter()
+        parsed_data = None
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            print(result_text)
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                parsed_data = json.loads(json_str)
-                
-                if "error" in parsed_data:
-                    return None
-                print(parsed_data)
-                return parsed_data
-            
-            return None
-            
+            result_text = await self._generate(prompt, call)
+            call["response_chars"] = len(result_text)
+            logger.debug("Gemini response: %s", result_text)
+            parsed_data, outcome = self._extract(result_text)
+        except asyncio.TimeoutError:
+            outcome = OUTCOME_TIMEOUT
+        except ValueError:
+            # response.text raises when the candidate has no text parts
+            outcome = OUTCOME_EMPTY
         except Exception as e:
-            print(f"Error parsing expense message: {e}")
-            return None
+            logger.warning("Gemini call failed: %s", e)
+            outcome = OUTCOME_API_ERROR
+
+        call.update(outcome=outcome, latency_ms=(time.perf_counter() - started) * 1000)
+        llm_calls.record(**call)
+        logger.info(
+            "Gemini parse model=%s outcome=%s latency_ms=%.0f retries=%d prompt_chars=%d response_chars=%d",
+            call["model"], outcome, call["latency_ms"], call["retries"], call["prompt_chars"], call["response_chars"]
+        )
+        return parsed_data
+
+    async def _generate(self, prompt: str, call: Dict[str, Any]) -> str:
+        """Call the model with a timeout, retrying timeouts and transient API errors with exponential backoff."""
+        retryable = transient_errors()
+        attempt = 0
+        while True:
+            try:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(prompt),
+                    timeout=settings.GEMINI_TIMEOUT_SECONDS
+                )
+                break
+            except retryable:
+                if attempt >= settings.GEMINI_MAX_RETRIES:
+                    raise
+                attempt += 1
+                call["retries"] = attempt
+                await asyncio.sleep(settings.GEMINI_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+        usage = getattr(response, "usage_metadata", None)
+        call["prompt_tokens"] = getattr(usage, "prompt_token_count", None)
+        call["response_tokens"] = getattr(usage, "candidates_token_count", None)
+        return response.text.strip()
+
+    @staticmethod
+    def _extract(result_text: str) -> Tuple[Optional[Dict], str]:
+        """Pull the expense JSON out of the model's text; return (data or None, outcome)."""
+        json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
+        if not json_match:
+            return None, OUTCOME_NO_JSON
+        try:
+            parsed_data = json.loads(json_match.group())
+        except ValueError:
+            return None, OUTCOME_INVALID_JSON
+        if not isinstance(parsed_data, dict) or "error" in parsed_data:
+            return None, OUTCOME_DECLINED
+
+        # Returned anyway: the caller reports the mismatch to the user
+        try:
+            split_total = sum(float(split["amount"]) for split in parsed_data.get("splits", []))
+            if abs(split_total - float(parsed_data["amount"])) > 0.01:
+                return parsed_data, OUTCOME_SPLIT_MISMATCH
+        except (KeyError, TypeError, ValueError):
+            pass
+        return parsed_data, OUTCOME_OK
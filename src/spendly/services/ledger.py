@@ -0,0 +1,224 @@
+"""Append-only ledger journal, balance snapshots and replay."""
+
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from ..core.config import settings
+from ..models import Expense, LedgerEvent, BalanceSnapshot
+from ..schemas.ledger import (
+    LedgerEventResponse, LedgerFeed, MemberBalance, BalanceProjection, SnapshotRebuildResult
+)
+
+EXPENSE_ADDED = "expense_added"
+SPLITS_CHANGED = "splits_changed"
+SETTLEMENT_RECORDED = "settlement_recorded"
+EVENT_TYPES = (EXPENSE_ADDED, SPLITS_CHANGED, SETTLEMENT_RECORDED)
+
+Balances = Dict[int, float]  # user ID -> paid - owed
+
+
+def expense_payload(expense: Expense, split_amounts: Dict[int, float]) -> dict:
+    """Payload of an expense_added or settlement_recorded event."""
+    return {
+        "description": expense.description,
+        "amount": expense.amount,
+        "paid_by": expense.paid_by,
+        "splits": {int(user_id): amount for user_id, amount in split_amounts.items()},
+    }
+
+
+def apply_event(balances: Balances, event_type: str, payload: dict) -> None:
+    """Apply one journal entry to a balance map in place.
+
+    A settlement is journaled like an expense: the payer paid ``amount`` and
+    the payee's split owes it.
+    """
+    if event_type in (EXPENSE_ADDED, SETTLEMENT_RECORDED):
+        if payload["paid_by"] is not None:
+            balances[payload["paid_by"]] = balances.get(payload["paid_by"], 0.0) + payload["amount"]
+        credits, debits = {}, payload["splits"]
+    elif event_type == SPLITS_CHANGED:
+        credits, debits = payload["old_splits"], payload["new_splits"]
+    else:
+        raise ValueError(f"Unknown ledger event type '{event_type}'")
+    # JSON object keys come back as strings
+    for user_id, amount in credits.items():
+        balances[int(user_id)] = balances.get(int(user_id), 0.0) + amount
+    for user_id, amount in debits.items():
+        balances[int(user_id)] = balances.get(int(user_id), 0.0) - amount
+
+
+class LedgerService:
+    """Service for the per-group ledger journal and the balances projected from it.
+
+    Every change to a group's balances is appended as an event with the group's
+    next sequence number, in the same transaction as the change itself. Events
+    are never updated or deleted. Balances are a projection: the latest
+    snapshot plus a replay of the events after it. A snapshot is stored every
+    LEDGER_SNAPSHOT_INTERVAL events, so a projection replays at most that many.
+
+    Sequence numbers are taken under SQLite's write lock and committed in
+    order, so a change feed read by ``seq`` never skips an event that commits
+    later.
+    """
+
+    @staticmethod
+    def append(db: Session, group_id: int, event_type: str, payload: dict,
+               expense_id: Optional[int] = None, user_id: Optional[int] = None,
+               created_at: Optional[datetime] = None) -> int:
+        """Add the group's next event to the transaction without committing; return its seq."""
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown ledger event type '{event_type}'")
+        next_seq = select(func.coalesce(func.max(LedgerEvent.seq), 0) + 1).where(
+            LedgerEvent.group_id == group_id
+        ).scalar_subquery()
+        values = {
+            "group_id": group_id,
+            "seq": next_seq,
+            "event_type": event_type,
+            "expense_id": expense_id,
+            "user_id": user_id,
+            "payload": json.dumps(payload),
+        }
+        if created_at is not None:
+            values["created_at"] = created_at
+        # The INSERT computes its own seq, so concurrent writers cannot pick the same one
+        seq = db.execute(insert(LedgerEvent).values(**values).returning(LedgerEvent.seq)).scalar_one()
+
+        if seq % settings.LEDGER_SNAPSHOT_INTERVAL == 0:
+            balances, _, _ = LedgerService._replay(db, group_id)
+            db.add(BalanceSnapshot(group_id=group_id, seq=seq, balances=json.dumps(balances)))
+        return seq
+
+    @staticmethod
+    def _replay(db: Session, group_id: int, up_to_seq: Optional[int] = None) -> Tuple[Balances, int, int]:
+        """Return (balances, last seq replayed, snapshot seq) from the latest snapshot onwards."""
+        snapshot_query = db.query(BalanceSnapshot.seq, BalanceSnapshot.balances).filter(
+            BalanceSnapshot.group_id == group_id
+        )
+        if up_to_seq is not None:
+            snapshot_query = snapshot_query.filter(BalanceSnapshot.seq <= up_to_seq)
+        snapshot = snapshot_query.order_by(BalanceSnapshot.seq.desc()).first()
+
+        balances: Balances = {}
+        snapshot_seq = 0
+        if snapshot is not None:
+            snapshot_seq = snapshot.seq
+            balances = {int(user_id): balance for user_id, balance in json.loads(snapshot.balances).items()}
+
+        events = db.query(LedgerEvent.seq, LedgerEvent.event_type, LedgerEvent.payload).filter(
+            LedgerEvent.group_id == group_id,
+            LedgerEvent.seq > snapshot_seq
+        )
+        if up_to_seq is not None:
+            events = events.filter(LedgerEvent.seq <= up_to_seq)
+
+        last_seq = snapshot_seq
+        for seq, event_type, payload in events.order_by(LedgerEvent.seq):
+            apply_event(balances, event_type, json.loads(payload))
+            last_seq = seq
+        return balances, last_seq, snapshot_seq
+
+    @staticmethod
+    def get_balances(db: Session, group_id: int, at_seq: Optional[int] = None) -> BalanceProjection:
+        """Project the group's balances as of ``at_seq`` (default: the latest event)."""
+        balances, last_seq, snapshot_seq = LedgerService._replay(db, group_id, at_seq)
+        return BalanceProjection(
+            group_id=group_id,
+            seq=last_seq,
+            snapshot_seq=snapshot_seq,
+            balances=[
+                MemberBalance(user_id=user_id, balance=round(balance, 2))
+                for user_id, balance in sorted(balances.items())
+            ]
+        )
+
+    @staticmethod
+    def get_events(db: Session, group_id: int, after_seq: int = 0, limit: int = 100) -> LedgerFeed:
+        """Read the change feed: up to ``limit`` events with seq > ``after_seq``, oldest first."""
+        rows = db.query(LedgerEvent).filter(
+            LedgerEvent.group_id == group_id,
+            LedgerEvent.seq > after_seq
+        ).order_by(LedgerEvent.seq).limit(limit).all()
+        events = [
+            LedgerEventResponse(
+                seq=row.seq,
+                event_type=row.event_type,
+                expense_id=row.expense_id,
+                user_id=row.user_id,
+                payload=json.loads(row.payload),
+                created_at=row.created_at
+            )
+            for row in rows
+        ]
+        return LedgerFeed(
+            group_id=group_id,
+            events=events,
+            last_seq=events[-1].seq if events else after_seq
+        )
+
+    @staticmethod
+    def rebuild_snapshots(db: Session, group_id: int) -> SnapshotRebuildResult:
+        """Replace a group's snapshots by replaying its whole journal; commits."""
+        db.execute(
+            delete(BalanceSnapshot).where(BalanceSnapshot.group_id == group_id),
+            execution_options={"synchronize_session": False}
+        )
+        balances: Balances = {}
+        events = snapshots = 0
+        rows = db.query(LedgerEvent.seq, LedgerEvent.event_type, LedgerEvent.payload).filter(
+            LedgerEvent.group_id == group_id
+        ).order_by(LedgerEvent.seq)
+        for seq, event_type, payload in rows.yield_per(1000):
+            apply_event(balances, event_type, json.loads(payload))
+            events += 1
+            if seq % settings.LEDGER_SNAPSHOT_INTERVAL == 0:
+                db.add(BalanceSnapshot(group_id=group_id, seq=seq, balances=json.dumps(balances)))
+                snapshots += 1
+        db.commit()
+        return SnapshotRebuildResult(group_id=group_id, events=events, snapshots=snapshots)
+
+    @staticmethod
+    def backfill_missing(db: Session) -> int:
+        """Journal the expenses of groups that have expenses but no events yet.
+
+        For databases that predate the journal. Returns the number of groups
+        backfilled. Each group's expenses become expense_added events in ID
+        order, committed per group, so an interrupted backfill resumes with
+        the groups it had not reached. Must finish before the app serves
+        writes: a group's first live event would otherwise take seq 1 and
+        the group would then count as journaled.
+        """
+        with_expenses = {
+            group_id for (group_id,) in
+            db.query(Expense.group_id).filter(Expense.group_id.isnot(None)).distinct()
+        }
+        journaled = {group_id for (group_id,) in db.query(LedgerEvent.group_id).distinct()}
+        group_ids = sorted(with_expenses - journaled)
+        for group_id in group_ids:
+            expenses = db.query(Expense).options(selectinload(Expense.splits)).filter(
+                Expense.group_id == group_id
+            ).order_by(Expense.id)
+            balances: Balances = {}
+            for seq, expense in enumerate(expenses.yield_per(1000), start=1):
+                split_amounts: Dict[int, float] = {}
+                for split in expense.splits:
+                    split_amounts[split.user_id] = split_amounts.get(split.user_id, 0.0) + split.amount
+                payload = expense_payload(expense, split_amounts)
+                db.add(LedgerEvent(
+                    group_id=group_id,
+                    seq=seq,
+                    event_type=EXPENSE_ADDED,
+                    expense_id=expense.id,
+                    payload=json.dumps(payload),
+                    created_at=expense.created_at
+                ))
+                apply_event(balances, EXPENSE_ADDED, payload)
+                if seq % settings.LEDGER_SNAPSHOT_INTERVAL == 0:
+                    db.add(BalanceSnapshot(group_id=group_id, seq=seq, balances=json.dumps(balances)))
+            db.commit()
+        return len(group_ids)
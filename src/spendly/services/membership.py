@@ -0,0 +1,83 @@
+"""Cached index of which groups each user belongs to."""
+
+from typing import FrozenSet
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.group import GroupMember
+
+
+class MembershipIndex:
+    """Per-user set of group IDs, cached with the same bounds as the principal cache.
+
+    A cache hit answers "is this user in this group?" with no database round
+    trip. Writes that change memberships invalidate the affected users.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, db: Session, user_id: int) -> FrozenSet[int]:
+        """Return the user's group IDs, loading them on a cache miss."""
+        group_ids = self._cache.get(user_id)
+        if group_ids is None:
+            group_ids = self.refresh(db, user_id)
+        return group_ids
+
+    def refresh(self, db: Session, user_id: int) -> FrozenSet[int]:
+        """Reload a user's group IDs from the database and cache them."""
+        group_ids = frozenset(
+            group_id for (group_id,) in
+            db.query(GroupMember.group_id).filter(GroupMember.user_id == user_id).all()
+        )
+        self._cache.set(user_id, group_ids)
+        return group_ids
+
+    def is_member(self, db: Session, user_id: int, group_id: int) -> bool:
+        """Check membership, re-reading once before saying no.
+
+        The re-read covers memberships added by another worker process since
+        this worker cached the user's set.
+        """
+        if group_id in self.get(db, user_id):
+            return True
+        return group_id in self.refresh(db, user_id)
+
+    async def get_async(self, db: AsyncSession, user_id: int) -> FrozenSet[int]:
+        """Async form of ``get``."""
+        group_ids = self._cache.get(user_id)
+        if group_ids is None:
+            group_ids = await self.refresh_async(db, user_id)
+        return group_ids
+
+    async def refresh_async(self, db: AsyncSession, user_id: int) -> FrozenSet[int]:
+        """Async form of ``refresh``."""
+        result = await db.execute(select(GroupMember.group_id).where(GroupMember.user_id == user_id))
+        group_ids = frozenset(result.scalars().all())
+        self._cache.set(user_id, group_ids)
+        return group_ids
+
+    async def is_member_async(self, db: AsyncSession, user_id: int, group_id: int) -> bool:
+        """Async form of ``is_member``."""
+        if group_id in await self.get_async(db, user_id):
+            return True
+        return group_id in await self.refresh_async(db, user_id)
+
+    def invalidate(self, *user_ids: int) -> None:
+        """Forget cached memberships of the given users."""
+        for user_id in user_ids:
+            self._cache.pop(user_id)
+
+    def clear(self) -> None:
+        """Forget everything."""
+        self._cache.clear()
+
+
+membership_index = MembershipIndex(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,152 @@
+"""Read-through cache for hot CRUD lookups."""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models import User, Group
+
+# Entity -> process-wide TTL in seconds
+ENTITY_TTLS: Dict[str, float] = {
+    "user": settings.QUERY_CACHE_USER_TTL_SECONDS,
+    "group": settings.QUERY_CACHE_GROUP_TTL_SECONDS,
+    "group_members": settings.QUERY_CACHE_GROUP_TTL_SECONDS,
+}
+
+_MEMO_KEY = "query_cache"
+_PENDING_KEY = "query_cache_pending"
+_MISSING = object()
+
+CacheKey = Tuple[str, Hashable]
+
+
+def detached_copy(instance: Any) -> Any:
+    """Copy an ORM row's column values into a new transient instance bound to no session."""
+    mapper = inspect(instance).mapper
+    return mapper.class_(**{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+
+
+def detached_group(group: Group) -> Group:
+    """Copy a Group with its members and their users (the shape serialize_group reads)."""
+    copy = detached_copy(group)
+    members = []
+    for member in group.members:
+        member_copy = detached_copy(member)
+        member_copy.user = detached_copy(member.user) if member.user is not None else None
+        members.append(member_copy)
+    copy.members = members
+    return copy
+
+
+class QueryCache:
+    """Two-level cache for user, group and group-member lookups.
+
+    The first level is a memo in ``Session.info``. Sessions are per request, so
+    a repeated lookup within one request never reaches the database. The second
+    level is a TTL-bounded LRU per entity, shared by the worker process.
+
+    Cached values are transient copies that belong to no session. That makes
+    them safe to share between requests and threads, but callers must treat
+    them as read-only. Writes call ``invalidate_on_commit``, and the affected
+    keys are dropped once the transaction commits. Other worker processes
+    only see a change after the TTL expires.
+    """
+
+    def __init__(self, ttls: Dict[str, float], maxsize: int, enabled: bool = True):
+        self.enabled = enabled
+        self._caches = {entity: TTLCache(maxsize=maxsize, ttl=ttl) for entity, ttl in ttls.items()}
+
+    def _lookup(self, db: Session, cache_key: CacheKey) -> Tuple[Dict[CacheKey, Any], Any]:
+        memo = db.info.setdefault(_MEMO_KEY, {})
+        value = memo.get(cache_key, _MISSING)
+        if value is _MISSING:
+            entity, key = cache_key
+            value = self._caches[entity].get(key, _MISSING)
+            if value is not _MISSING:
+                memo[cache_key] = value
+        return memo, value
+
+    def _store(self, memo: Dict[CacheKey, Any], cache_key: CacheKey, value: Any) -> None:
+        # Misses are not cached, so a newly created row is visible immediately
+        if value is not None:
+            entity, key = cache_key
+            self._caches[entity].set(key, value)
+            memo[cache_key] = value
+
+    def get(self, db: Session, entity: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value, or call ``loader`` and cache what it returns."""
+        if not self.enabled:
+            return loader()
+        memo, value = self._lookup(db, (entity, key))
+        if value is _MISSING:
+            value = loader()
+            self._store(memo, (entity, key), value)
+        return value
+
+    async def get_async(self, db: Any, entity: str, key: Hashable,
+                        loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Async form of ``get`` for an AsyncSession and a coroutine loader."""
+        if not self.enabled:
+            return await loader()
+        memo, value = self._lookup(db, (entity, key))
+        if value is _MISSING:
+            value = await loader()
+            self._store(memo, (entity, key), value)
+        return value
+
+    def invalidate_on_commit(self, db: Session, entity: str, *keys: Hashable) -> None:
+        """Forget keys in this session now, and process-wide once it commits."""
+        memo = db.info.get(_MEMO_KEY, {})
+        pending = db.info.setdefault(_PENDING_KEY, set())
+        for key in keys:
+            memo.pop((entity, key), None)
+            pending.add((entity, key))
+
+    def invalidate(self, entity: str, *keys: Hashable) -> None:
+        """Forget keys process-wide immediately."""
+        for key in keys:
+            self._caches[entity].pop(key)
+
+    def clear(self, *entities: str) -> None:
+        """Forget everything cached for the given entities (all if none given)."""
+        for entity in entities or self._caches:
+            self._caches[entity].clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss counters and sizes per entity."""
+        return {
+            entity: {"size": len(cache), "hits": cache.hits, "misses": cache.misses}
+            for entity, cache in self._caches.items()
+        }
+
+
+query_cache = QueryCache(
+    ttls=ENTITY_TTLS,
+    maxsize=settings.QUERY_CACHE_SIZE,
+    enabled=settings.QUERY_CACHE_ENABLED
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session: Session) -> None:
+    """Drop keys marked by writes once their transaction has committed."""
+    for entity, key in session.info.pop(_PENDING_KEY, ()):
+        query_cache.invalidate(entity, key)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_invalidations(session: Session, previous_transaction) -> None:
+    """Forget the marks and memoized reads of a rolled-back transaction."""
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_MEMO_KEY, None)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    """Users are copied into cached groups and member lists, so drop those as well."""
+    query_cache.invalidate("user", target.id)
+    query_cache.clear("group", "group_members")
@@ -0,0 +1,248 @@
+"""Spending rollup maintenance and time-series queries."""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, literal, select, union_all, Select
+from typing import Dict, List, Optional, Tuple, Type, Union
+from datetime import date, datetime
+
+from ..core.sharding import session_shards
+from ..models import Expense, ExpenseSplit, DailySpendingRollup, MonthlySpendingRollup
+from ..schemas.analytics import SpendingPoint, SpendingSeries, RollupRebuildResult
+
+RollupModel = Type[Union[DailySpendingRollup, MonthlySpendingRollup]]
+
+# Granularity -> (rollup table, SQLite strftime format of the period start)
+ROLLUP_TABLES: Dict[str, Tuple[RollupModel, str]] = {
+    "day": (DailySpendingRollup, "%Y-%m-%d"),
+    "month": (MonthlySpendingRollup, "%Y-%m-01"),
+}
+
+
+def day_start(moment: Union[date, datetime]) -> date:
+    """Return the daily rollup period containing a timestamp."""
+    return moment.date() if isinstance(moment, datetime) else moment
+
+
+def month_start(moment: Union[date, datetime]) -> date:
+    """Return the monthly rollup period containing a timestamp."""
+    return date(moment.year, moment.month, 1)
+
+
+class RollupService:
+    """Service for the pre-aggregated daily and monthly spending rollups."""
+
+    @staticmethod
+    def record_expense(db: Session, group_id: int, paid_by: int, amount: float,
+                       created_at: datetime, split_amounts: Dict[int, float]) -> None:
+        """Add a new expense to the daily and monthly rollups.
+
+        Runs inside the caller's transaction; the caller commits.
+        """
+        deltas: Dict[int, List[float]] = {}
+        deltas.setdefault(paid_by, [0.0, 0.0, 1])[0] += amount
+        for user_id, split_amount in split_amounts.items():
+            deltas.setdefault(int(user_id), [0.0, 0.0, 1])[1] += split_amount
+        RollupService._apply_deltas(db, group_id, created_at, deltas)
+
+    @staticmethod
+    def record_split_change(db: Session, group_id: int, paid_by: int, created_at: datetime,
+                            old_splits: Dict[int, float], new_splits: Dict[int, float]) -> None:
+        """Move an existing expense's owed amounts from its old splits to its new ones.
+
+        Users who join or leave the expense (other than the payer) gain or lose
+        one from their expense count. Runs inside the caller's transaction.
+        """
+        old_splits = {int(user_id): amount for user_id, amount in old_splits.items()}
+        new_splits = {int(user_id): amount for user_id, amount in new_splits.items()}
+        deltas: Dict[int, List[float]] = {}
+        for user_id in set(old_splits) | set(new_splits):
+            owed = new_splits.get(user_id, 0.0) - old_splits.get(user_id, 0.0)
+            count = 0
+            if user_id != paid_by:
+                count = int(user_id in new_splits) - int(user_id in old_splits)
+            if owed or count:
+                deltas[user_id] = [0.0, owed, count]
+        RollupService._apply_deltas(db, group_id, created_at, deltas)
+
+    @staticmethod
+    def _apply_deltas(db: Session, group_id: int, created_at: datetime,
+                      deltas: Dict[int, List[float]]) -> None:
+        """Add per-user [paid, owed, expense count] deltas to the periods containing ``created_at``."""
+        if not deltas:
+            return
+        periods = [
+            (DailySpendingRollup, day_start(created_at)),
+            (MonthlySpendingRollup, month_start(created_at)),
+        ]
+        for model, period_start in periods:
+            existing = {
+                row.user_id: row
+                for row in db.query(model).filter(
+                    model.group_id == group_id,
+                    model.period_start == period_start,
+                    model.user_id.in_(list(deltas))
+                ).all()
+            }
+            for user_id, (paid, owed, count) in deltas.items():
+                row = existing.get(user_id)
+                if row is None:
+                    db.add(model(
+                        group_id=group_id,
+                        user_id=user_id,
+                        period_start=period_start,
+                        paid=paid,
+                        owed=owed,
+                        expense_count=count
+                    ))
+                else:
+                    row.paid = (row.paid or 0) + paid
+                    row.owed = (row.owed or 0) + owed
+                    row.expense_count = (row.expense_count or 0) + count
+
+    @staticmethod
+    def _rollup_select(period_format: str, group_id: Optional[int]) -> Select:
+        """Build the grouped SELECT that computes one granularity's rollup rows."""
+        period = func.strftime(period_format, Expense.created_at)
+
+        # One row per (expense, involved user): the payer's amount and each split
+        paid_rows = select(
+            Expense.group_id.label("group_id"),
+            Expense.paid_by.label("user_id"),
+            period.label("period_start"),
+            Expense.id.label("expense_id"),
+            Expense.amount.label("paid"),
+            literal(0.0).label("owed")
+        ).where(Expense.paid_by.isnot(None))
+        owed_rows = select(
+            Expense.group_id.label("group_id"),
+            ExpenseSplit.user_id.label("user_id"),
+            period.label("period_start"),
+            Expense.id.label("expense_id"),
+            literal(0.0).label("paid"),
+            ExpenseSplit.amount.label("owed")
+        ).join(ExpenseSplit, ExpenseSplit.expense_id == Expense.id).where(ExpenseSplit.user_id.isnot(None))
+        if group_id is not None:
+            paid_rows = paid_rows.where(Expense.group_id == group_id)
+            owed_rows = owed_rows.where(Expense.group_id == group_id)
+        involvement = union_all(paid_rows, owed_rows).subquery()
+
+        return select(
+            involvement.c.group_id,
+            involvement.c.user_id,
+            involvement.c.period_start,
+            func.coalesce(func.sum(involvement.c.paid), 0.0),
+            func.coalesce(func.sum(involvement.c.owed), 0.0),
+            func.count(func.distinct(involvement.c.expense_id))
+        ).where(
+            involvement.c.group_id.isnot(None),
+            involvement.c.period_start.isnot(None)
+        ).group_by(
+            involvement.c.group_id,
+            involvement.c.user_id,
+            involvement.c.period_start
+        )
+
+    @staticmethod
+    def rebuild_rollups(db: Session, group_id: Optional[int] = None) -> RollupRebuildResult:
+        """Recompute the rollups from scratch, for one group or for everything.
+
+        Each table is rebuilt with a DELETE and a single INSERT ... SELECT, so the
+        expenses never pass through Python.
+        """
+        counts = {}
+        for granularity, (model, period_format) in ROLLUP_TABLES.items():
+            counts[granularity] = 0
+            delete_rows = delete(model)
+            if group_id is not None:
+                delete_rows = delete_rows.where(model.group_id == group_id)
+
+            # Run on each shard in turn when sharded, so the row counts add up
+            for shard_id in session_shards(db, group_id):
+                bind_arguments = {"shard_id": shard_id} if shard_id else None
+                db.execute(
+                    delete_rows,
+                    execution_options={"synchronize_session": False},
+                    bind_arguments=bind_arguments
+                )
+                result = db.execute(insert(model).from_select(
+                    ["group_id", "user_id", "period_start", "paid", "owed", "expense_count"],
+                    RollupService._rollup_select(period_format, group_id)
+                ), bind_arguments=bind_arguments)
+                counts[granularity] += result.rowcount
+
+        db.commit()
+        return RollupRebuildResult(
+            group_id=group_id,
+            daily_rows=counts["day"],
+            monthly_rows=counts["month"]
+        )
+
+    @staticmethod
+    def backfill_if_empty(db: Session) -> bool:
+        """Build the rollups once for databases that predate them."""
+        if db.query(MonthlySpendingRollup.id).first() is not None:
+            return False
+        if db.query(Expense.id).first() is None:
+            return False
+        RollupService.rebuild_rollups(db)
+        return True
+
+    @staticmethod
+    def get_spending_series(db: Session, start: date, end: date, granularity: str = "month",
+                            group_id: Optional[int] = None,
+                            user_ids: Optional[List[int]] = None) -> SpendingSeries:
+        """Read a spending series for [start, end] from the rollup tables.
+
+        With a group, rows are returned as stored; without one, each user's rows
+        are summed across groups per period.
+        """
+        if granularity not in ROLLUP_TABLES:
+            raise ValueError(f"Unsupported granularity '{granularity}'")
+        model, _ = ROLLUP_TABLES[granularity]
+        start = day_start(start) if granularity == "day" else month_start(start)
+
+        query = db.query(
+            model.period_start,
+            model.user_id,
+            func.sum(model.paid).label("paid"),
+            func.sum(model.owed).label("owed"),
+            func.sum(model.expense_count).label("expense_count")
+        ).filter(
+            model.period_start >= start,
+            model.period_start <= end
+        )
+        if group_id is not None:
+            query = query.filter(model.group_id == group_id)
+        if user_ids:
+            query = query.filter(model.user_id.in_(user_ids))
+
+        rows = query.group_by(model.period_start, model.user_id).order_by(
+            model.period_start, model.user_id
+        ).all()
+
+        # When sharded, each shard sums its own groups; add up the partial rows
+        totals: Dict[Tuple[date, int], List[float]] = {}
+        for row in rows:
+            total = totals.setdefault((row.period_start, row.user_id), [0.0, 0.0, 0])
+            total[0] += row.paid or 0
+            total[1] += row.owed or 0
+            total[2] += row.expense_count or 0
+
+        points = [
+            SpendingPoint(
+                period_start=period_start,
+                user_id=user_id,
+                paid=float(paid),
+                owed=float(owed),
+                balance=float(paid - owed),
+                expense_count=int(expense_count)
+            )
+            for (period_start, user_id), (paid, owed, expense_count) in sorted(totals.items())
+        ]
+        return SpendingSeries(
+            granularity=granularity,
+            group_id=group_id,
+            start=start,
+            end=end,
+            points=points
+        )
@@ -0,0 +1,166 @@
+"""Moving groups between shards."""
+
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.schema import Table
+
+from ..core.database import engine, shard_router
+from ..core.sharding import ALLOCATED_ID_TABLES, ShardRouter, shard_name
+from ..models import (
+    Expense, ExpenseSplit, ChatMessage, DailySpendingRollup, MonthlySpendingRollup, LedgerEvent, BalanceSnapshot
+)
+from .rollups import RollupService
+
+
+def _router() -> ShardRouter:
+    if shard_router is None:
+        raise ValueError("Sharding is not enabled (set SHARD_COUNT to 2 or more)")
+    return shard_router
+
+
+def _group_rows(group_id: int) -> List[Tuple[Table, ColumnElement]]:
+    """(table, criteria) for a group's copied rows, parents before children."""
+    group_expense_ids = select(Expense.id).where(Expense.group_id == group_id)
+    return [
+        (Expense.__table__, Expense.group_id == group_id),
+        (ExpenseSplit.__table__, ExpenseSplit.expense_id.in_(group_expense_ids)),
+        (ChatMessage.__table__, ChatMessage.group_id == group_id),
+        (LedgerEvent.__table__, LedgerEvent.group_id == group_id),
+        (BalanceSnapshot.__table__, BalanceSnapshot.group_id == group_id),
+    ]
+
+
+class ShardRebalanceService:
+    """Service for moving a group's expenses, splits, chat and rollups to another shard.
+
+    Expense, split and chat IDs are unique across shards, so rows are copied
+    with their IDs and copying is idempotent. Ledger events and snapshots are
+    copied without their shard-local IDs and deduplicated by (group_id, seq).
+    Rollups are not copied: they are rebuilt on the target from the moved
+    expenses. Moves freeze the group's writes, so the source does not change
+    while it is copied.
+    """
+
+    # Rows read and inserted per round trip
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def copy_group(source: Engine, target: Engine, group_id: int) -> Dict[str, int]:
+        """Copy a group's rows that the target does not have yet; return rows copied per table."""
+        counts = {}
+        with source.connect() as reader, target.begin() as writer:
+            for table, criteria in _group_rows(group_id):
+                counts[table.name] = 0
+                if not inspect(reader).has_table(table.name):
+                    continue
+                if table.name in ALLOCATED_ID_TABLES:
+                    columns = list(table.c)
+                    statement = sqlite_insert(table).on_conflict_do_nothing(index_elements=["id"])
+                else:
+                    columns = [column for column in table.c if column.key != "id"]
+                    statement = sqlite_insert(table).on_conflict_do_nothing()
+                result = reader.execution_options(stream_results=True).execute(select(*columns).where(criteria))
+                for batch in result.partitions(ShardRebalanceService.BATCH_SIZE):
+                    inserted = writer.execute(statement, [dict(row._mapping) for row in batch])
+                    counts[table.name] += inserted.rowcount
+        return counts
+
+    @staticmethod
+    def delete_group(source: Engine, group_id: int) -> None:
+        """Delete a group's rows (and rollups) from one database in a single transaction."""
+        with source.begin() as connection:
+            for table, criteria in reversed(_group_rows(group_id)):
+                if inspect(connection).has_table(table.name):
+                    connection.execute(delete(table).where(criteria))
+            for model in (DailySpendingRollup, MonthlySpendingRollup):
+                if inspect(connection).has_table(model.__tablename__):
+                    connection.execute(delete(model.__table__).where(model.group_id == group_id))
+
+    @staticmethod
+    def move_group(group_id: int, target_index: int, settle_seconds: float) -> Dict[str, int]:
+        """Move a group onto shard ``target_index`` while the app keeps serving its reads.
+
+        1. Freeze the group's writes and wait ``settle_seconds`` (at least
+           SHARD_PLACEMENT_TTL_SECONDS), so every worker's cached placement
+           has expired and all of them refuse the group's writes.
+        2. Clear what an interrupted earlier move left on the target, copy
+           the group's rows there and rebuild its rollups.
+        3. Point the group's placement at the target, which thaws its writes.
+        4. Wait ``settle_seconds`` again, so no worker reads the group from
+           the source any more, then delete it there.
+
+        Writes to the group fail with GroupMovingError from step 1 to step 3.
+        If copying fails, the group is thawed on the source.
+        """
+        router = _router()
+        target = shard_name(target_index)
+        if target not in router.shard_engines:
+            raise ValueError(f"Shard {target_index} does not exist (SHARD_COUNT is {len(router.shard_ids)})")
+        source = router.shard_for_group(group_id)
+        if source == target:
+            return {}
+
+        source_engine, target_engine = router.shard_engines[source], router.shard_engines[target]
+        router.freeze_group(group_id)
+        try:
+            time.sleep(settle_seconds)
+            ShardRebalanceService.delete_group(target_engine, group_id)
+            counts = ShardRebalanceService.copy_group(source_engine, target_engine, group_id)
+            ShardRebalanceService._rebuild_rollups(target_engine, group_id)
+        except BaseException:
+            router.thaw_group(group_id)
+            raise
+        router.set_placement(group_id, target)
+        time.sleep(settle_seconds)
+        ShardRebalanceService.delete_group(source_engine, group_id)
+        return counts
+
+    @staticmethod
+    def import_legacy_group(group_id: int) -> Dict[str, int]:
+        """Move a group's rows from the catalog's pre-sharding tables onto its shard."""
+        router = _router()
+        target = router.shard_engines[router.shard_for_group(group_id)]
+        counts = ShardRebalanceService.copy_group(engine, target, group_id)
+        ShardRebalanceService.delete_group(engine, group_id)
+        ShardRebalanceService._rebuild_rollups(target, group_id)
+        return counts
+
+    @staticmethod
+    def legacy_group_ids() -> List[int]:
+        """Groups that still have expenses or chat messages in the catalog database."""
+        group_ids = set()
+        with engine.connect() as connection:
+            for model in (Expense, ChatMessage):
+                if inspect(connection).has_table(model.__tablename__):
+                    group_ids.update(connection.execute(
+                        select(model.group_id).where(model.group_id.isnot(None)).distinct()
+                    ).scalars())
+        return sorted(group_ids)
+
+    @staticmethod
+    def shard_stats() -> Dict[str, Dict[str, int]]:
+        """Groups, expenses and chat messages per shard."""
+        stats = {}
+        for name, shard_engine in _router().shard_engines.items():
+            with shard_engine.connect() as connection:
+                stats[name] = {
+                    "groups": connection.execute(select(func.count(func.distinct(Expense.group_id)))).scalar(),
+                    "expenses": connection.execute(select(func.count(Expense.id))).scalar(),
+                    "chat_messages": connection.execute(select(func.count(ChatMessage.id))).scalar(),
+                }
+        return stats
+
+    @staticmethod
+    def _rebuild_rollups(shard_engine: Engine, group_id: int) -> None:
+        # A plain session on the shard, so the rebuild bypasses routing (and write freezes)
+        db = Session(bind=shard_engine)
+        try:
+            RollupService.rebuild_rollups(db, group_id)
+        finally:
+            db.close()
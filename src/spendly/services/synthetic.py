@@ -0,0 +1,312 @@
+"""Synthetic data generation for scale testing."""
+
+import itertools
+import json
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import Table
+
+from ..core.config import settings
+from ..core.database import SessionLocal, create_tables
+from ..models import (
+    User, Group, GroupMember, Expense, ExpenseSplit, ChatMessage, LedgerEvent, BalanceSnapshot
+)
+from .ledger import EXPENSE_ADDED, Balances, apply_event, expense_payload
+from .rollups import RollupService
+
+SPLIT_TYPES = ("equal", "ratio", "lend")
+
+FIRST_NAMES = ["Ana", "Ben", "Chen", "Dara", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo", "Kofi", "Lena",
+               "Mo", "Nia", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tariq", "Uma", "Vik", "Wen", "Yara"]
+DESCRIPTIONS = ["dinner", "groceries", "taxi", "rent", "coffee", "tickets", "fuel", "hotel", "lunch",
+                "drinks", "electricity", "internet", "movie", "snacks", "train", "pizza"]
+CHAT_LINES = ["on my way", "who's in for friday?", "thanks!", "I'll settle up tomorrow", "sounds good",
+              "can someone check the receipt?", "lol", "see you there", "paid you back", "where are we meeting?"]
+
+# Tables written by the generator, in insertion (foreign key) order
+GENERATED_TABLES: List[Table] = [
+    User.__table__, Group.__table__, GroupMember.__table__, Expense.__table__, ExpenseSplit.__table__,
+    ChatMessage.__table__, LedgerEvent.__table__, BalanceSnapshot.__table__,
+]
+
+Progress = Callable[[str, Dict[str, int]], None]
+
+
+def parse_split_mix(spec: str) -> Dict[str, float]:
+    """Parse "equal=70,ratio=20,lend=10" into split type weights."""
+    mix = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = entry.partition("=")
+        if name.strip() not in SPLIT_TYPES:
+            raise ValueError(f"Unknown split type '{name.strip()}', expected one of {SPLIT_TYPES}")
+        mix[name.strip()] = float(weight)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"Invalid split mix '{spec}', expected e.g. 'equal=70,ratio=20,lend=10'")
+    return mix
+
+
+def split_cents(amount: float, weights: List[float]) -> List[float]:
+    """Divide an amount by weights into cents that add up exactly (remainder to the first share)."""
+    cents = round(amount * 100)
+    total = sum(weights)
+    shares = [int(cents * weight / total) for weight in weights]
+    shares[0] += cents - sum(shares)
+    return [share / 100 for share in shares]
+
+
+class _BatchWriter:
+    """Buffers rows per table and inserts them in executemany batches, committing each batch."""
+
+    def __init__(self, connection: Connection, batch_size: int, progress: Optional[Progress]):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.progress = progress
+        self.rows: Dict[str, List[Dict[str, Any]]] = {}
+        self.counts: Dict[str, int] = {table.name: 0 for table in GENERATED_TABLES}
+
+    def add(self, table: Table, row: Dict[str, Any]) -> None:
+        rows = self.rows.setdefault(table.name, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        # Parents first, so foreign keys hold at every commit
+        for table in GENERATED_TABLES:
+            rows = self.rows.pop(table.name, None)
+            if rows:
+                self.connection.execute(table.insert(), rows)
+                self.counts[table.name] += len(rows)
+        self.connection.commit()
+        if self.progress is not None:
+            self.progress("rows", self.counts)
+
+
+class SyntheticDataGenerator:
+    """Bulk-generates a realistic dataset straight into the schema.
+
+    Group sizes are skewed (most groups are small, a few large) and group
+    activity is heavy-tailed, so a few groups hold most expenses and messages.
+    Expenses are split equally (among everyone or a subset), by ratio, or lent
+    (the payer covers one other member), per ``split_mix``. Every expense
+    comes with the chat message that created it and the system reply, and is
+    journaled like the app journals it; free chat messages are interleaved.
+    Rows are timestamped in ID order across ``days`` ending at ``end``.
+
+    IDs are assigned here, so the database must be empty; the same seed and
+    parameters always produce the same rows. Indexes are dropped for the load
+    and rebuilt at the end, and rollups are rebuilt with one INSERT ... SELECT.
+    """
+
+    def __init__(self, users: int, groups: int, expenses: int, messages: int, mean_group_size: float = 4.0,
+                 max_group_size: int = 20, split_mix: Optional[Dict[str, float]] = None, days: int = 365,
+                 end: Optional[datetime] = None, seed: int = 42, batch_size: int = 20000,
+                 password_hash: str = ""):
+        if users < 2:
+            raise ValueError("At least 2 users are needed to form a group")
+        if not 2 <= mean_group_size <= max_group_size:
+            raise ValueError("mean_group_size must be between 2 and max_group_size")
+        self.users = users
+        self.groups = groups
+        self.expenses = expenses if groups else 0
+        self.messages = messages if groups else 0
+        self.mean_group_size = mean_group_size
+        self.max_group_size = min(max_group_size, users)
+        self.split_mix = split_mix or {"equal": 70, "ratio": 20, "lend": 10}
+        self.end = end or datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        self.start = self.end - timedelta(days=days)
+        self.batch_size = batch_size
+        self.password_hash = password_hash
+        self.rng = random.Random(seed)
+
+    # Distributions
+    def _group_size(self) -> int:
+        extra = self.mean_group_size - 2
+        size = 2 + (int(self.rng.expovariate(1 / extra)) if extra > 0 else 0)
+        return min(size, self.max_group_size)
+
+    def _amount(self) -> float:
+        return max(0.5, round(self.rng.lognormvariate(3.2, 0.9), 2))
+
+    def _splits(self, amount: float, payer: int, members: List[int]) -> Tuple[str, Dict[int, float]]:
+        """Pick a split type and return it with each participant's share."""
+        kind = self.rng.choices(list(self.split_mix), list(self.split_mix.values()))[0]
+        others = [member for member in members if member != payer]
+        if kind == "lend" and others:
+            return kind, {self.rng.choice(others): amount}
+        if kind == "ratio" and len(members) > 1:
+            participants = self.rng.sample(members, self.rng.randint(2, len(members)))
+            weights = [self.rng.choice((1, 1, 2, 3)) for _ in participants]
+            return kind, dict(zip(participants, split_cents(amount, weights)))
+        # Equal: usually the whole group, sometimes a subset
+        if self.rng.random() < 0.7 or len(members) < 3:
+            participants = members
+        else:
+            participants = self.rng.sample(members, self.rng.randint(2, len(members) - 1))
+        return "equal", dict(zip(participants, split_cents(amount, [1] * len(participants))))
+
+    # Generation
+    def run(self, engine: Engine, progress: Optional[Progress] = None) -> Dict[str, int]:
+        """Generate the dataset into an empty database; return rows written per table."""
+        create_tables()
+        with engine.connect() as connection:
+            if connection.execute(select(func.count()).select_from(User.__table__)).scalar():
+                raise ValueError("The database already has users; generate into an empty database")
+            # Durability is pointless for a throwaway build; the load is redone if interrupted
+            connection.exec_driver_sql("PRAGMA synchronous=OFF")
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            dropped = self._drop_indexes(connection)
+            connection.commit()
+
+            writer = _BatchWriter(connection, self.batch_size, progress)
+            members_by_group = self._write_people(writer)
+            self._write_activity(writer, members_by_group)
+            writer.flush()
+
+        if progress is not None:
+            progress(f"rebuilding {dropped} indexes", writer.counts)
+        create_tables()  # Recreates the dropped indexes
+        if progress is not None:
+            progress("rebuilding rollups", writer.counts)
+        db = SessionLocal()
+        try:
+            rollups = RollupService.rebuild_rollups(db)
+        finally:
+            db.close()
+        counts = dict(writer.counts)
+        counts["daily_spending_rollups"] = rollups.daily_rows
+        counts["monthly_spending_rollups"] = rollups.monthly_rows
+        return counts
+
+    @staticmethod
+    def _drop_indexes(connection: Connection) -> int:
+        dropped = 0
+        for table in GENERATED_TABLES:
+            for index in table.indexes:
+                index.drop(bind=connection, checkfirst=True)
+                dropped += 1
+        return dropped
+
+    def _write_people(self, writer: _BatchWriter) -> List[List[int]]:
+        """Write users, groups and memberships; return each group's member IDs."""
+        for user_id in range(1, self.users + 1):
+            writer.add(User.__table__, {
+                "id": user_id,
+                "name": f"{FIRST_NAMES[user_id % len(FIRST_NAMES)]} {user_id}",
+                "email": f"user{user_id}@example.com",
+                "hashed_password": self.password_hash,
+                "created_at": self.start,
+            })
+
+        members_by_group = []
+        membership_id = itertools.count(1)
+        for group_id in range(1, self.groups + 1):
+            members = self.rng.sample(range(1, self.users + 1), self._group_size())
+            members_by_group.append(members)
+            writer.add(Group.__table__, {
+                "id": group_id,
+                "name": f"Group {group_id}",
+                "description": None,
+                "created_at": self.start,
+            })
+            for member in members:
+                writer.add(GroupMember.__table__, {
+                    "id": next(membership_id),
+                    "group_id": group_id,
+                    "user_id": member,
+                    "joined_at": self.start,
+                })
+        return members_by_group
+
+    def _write_activity(self, writer: _BatchWriter, members_by_group: List[List[int]]) -> None:
+        """Write expenses with splits, chat and journal, interleaved with free chat messages."""
+        if not self.expenses and not self.messages:
+            return
+        rng = self.rng
+        # Heavy-tailed activity: a few groups are far busier than the rest
+        cum_weights = list(itertools.accumulate(rng.paretovariate(1.16) for _ in members_by_group))
+        group_indexes = range(len(members_by_group))
+        span = (self.end - self.start).total_seconds()
+        total = self.expenses + self.messages
+        split_id, message_id, event_id, snapshot_id = (itertools.count(1) for _ in range(4))
+        seqs: Dict[int, int] = {}
+        balances: Dict[int, Balances] = {}
+        expense_id = 0
+
+        for position in range(total):
+            created_at = self.start + timedelta(seconds=span * position / total)
+            group_index = rng.choices(group_indexes, cum_weights=cum_weights)[0]
+            group_id, members = group_index + 1, members_by_group[group_index]
+            # Spread free messages evenly between the expenses
+            if expense_id >= self.expenses or (
+                    self.messages and (position - expense_id) * self.expenses < expense_id * self.messages):
+                writer.add(ChatMessage.__table__, {
+                    "id": next(message_id),
+                    "group_id": group_id,
+                    "user_id": rng.choice(members),
+                    "message": rng.choice(CHAT_LINES),
+                    "message_type": "text",
+                    "expense_id": None,
+                    "created_at": created_at,
+                })
+                continue
+
+            expense_id += 1
+            payer = rng.choice(members)
+            amount = self._amount()
+            kind, shares = self._splits(amount, payer, members)
+            expense = {
+                "id": expense_id,
+                "description": rng.choice(DESCRIPTIONS),
+                "amount": amount,
+                "paid_by": payer,
+                "group_id": group_id,
+                "original_message": f"I paid ${amount:.2f} ({kind})",
+                "created_at": created_at,
+            }
+            writer.add(Expense.__table__, expense)
+            for user_id, share in shares.items():
+                writer.add(ExpenseSplit.__table__, {
+                    "id": next(split_id), "expense_id": expense_id, "user_id": user_id, "amount": share,
+                })
+            for message_type, text in (("expense", expense["original_message"]),
+                                       ("system", f"💰 Expense added: {expense['description']} - ${amount:.2f}")):
+                writer.add(ChatMessage.__table__, {
+                    "id": next(message_id),
+                    "group_id": group_id,
+                    "user_id": payer,
+                    "message": text,
+                    "message_type": message_type,
+                    "expense_id": expense_id,
+                    "created_at": created_at,
+                })
+
+            # Journal it as the app does, snapshotting every LEDGER_SNAPSHOT_INTERVAL events
+            # A plain namespace stands in for the ORM row (much cheaper to build)
+            payload = expense_payload(SimpleNamespace(**expense), shares)
+            seq = seqs[group_id] = seqs.get(group_id, 0) + 1
+            group_balances = balances.setdefault(group_id, {})
+            apply_event(group_balances, EXPENSE_ADDED, payload)
+            writer.add(LedgerEvent.__table__, {
+                "id": next(event_id),
+                "group_id": group_id,
+                "seq": seq,
+                "event_type": EXPENSE_ADDED,
+                "expense_id": expense_id,
+                "user_id": payer,
+                "payload": json.dumps(payload),
+                "created_at": created_at,
+            })
+            if seq % settings.LEDGER_SNAPSHOT_INTERVAL == 0:
+                writer.add(BalanceSnapshot.__table__, {
+                    "id": next(snapshot_id),
+                    "group_id": group_id,
+                    "seq": seq,
+                    "balances": json.dumps(group_balances),
+                    "created_at": created_at,
+                })
@@ -0,0 +1,45 @@
+"""Pytest fixtures and helpers for asserting SQL query and startup budgets.
+
+Enable them with ``pytest_plugins = ["src.spendly.testing"]`` in a
+conftest.py, then for example::
+
+    async def test_expense_list_budget(client, query_stats):
+        await client.get("/api/expenses/?limit=50", headers=auth)
+        query_stats.assert_at_most(6)
+
+    def test_startup_budget():
+        assert_startup_within(1500)
+
+Requests must run in the test's context (e.g. httpx.AsyncClient with
+ASGITransport) for their statements to be counted.
+"""
+
+import subprocess
+import sys
+from typing import Iterator, Optional
+
+import pytest
+
+from .core.querystats import QueryStats, track_queries
+
+
+@pytest.fixture
+def query_stats() -> Iterator[QueryStats]:
+    """Count the SQL statements executed during the test, through any engine."""
+    with track_queries() as stats:
+        yield stats
+
+
+def assert_startup_within(budget_ms: Optional[float] = None, runs: int = 3) -> None:
+    """Fail unless importing and creating the app fits the budget and lazy modules stay unloaded.
+
+    Runs ``benchmarks.bench_startup`` in fresh interpreters (from the
+    repository root, like the other benchmarks); ``budget_ms`` defaults to
+    the benchmark's own budget.
+    """
+    command = [sys.executable, "-m", "benchmarks.bench_startup", "--runs", str(runs), "--top", "5"]
+    if budget_ms is not None:
+        command += ["--budget-ms", str(budget_ms)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise AssertionError(f"Startup budget exceeded:\n{completed.stdout}{completed.stderr[-2000:]}")
@@ -122,35 +122,34 @@ class DashboardManager {
     }
 
     async loadGroupExpenseCounts() {
-        console.log('📊 Loading expense counts for groups...');
+        console.log('📊 Loading group summaries...');
         const token = localStorage.getItem('access_token');
         
-        // Load expenses count for each group in parallel
-        const promises = this.groups.map(async (group) => {
-            try {
-                const response = await fetch(`/api/expenses/?group_id=${group.id}&limit=1000`, {
-                    headers: {
-                        'Authorization': `Bearer ${token}`,
-                        'Content-Type': 'application/json'
-                    }
-                });
-                
-                if (response.ok) {
-                    const expenses = await response.json();
-                    group.expenses = expenses; // Add expenses to group object
-                    console.log(`✅ Loaded ${expenses.length} expenses for group ${group.name}`);
-                } else {
-                    console.warn(`⚠️ Failed to load expenses for group ${group.name}`);
-                    group.expenses = []; // Default to empty array
+        // One request returns counts, totals and my balance for every group
+        try {
+            const response = await fetch('/api/groups/summary', {
+                headers: {
+                    'Authorization': `Bearer ${token}`,
+                    'Content-Type': 'application/json'
                 }
-            } catch (error) {
-                console.error(`❌ Error loading expenses for group ${group.name}:`, error);
-                group.expenses = []; // Default to empty array
+            });
+            
+            if (response.ok) {
+                const summaries = await response.json();
+                const summaryByGroup = {};
+                summaries.forEach(summary => {
+                    summaryByGroup[summary.group_id] = summary;
+                });
+                this.groups.forEach(group => {
+                    group.summary = summaryByGroup[group.id] || null;
+                });
+                console.log(`✅ Loaded summaries for ${summaries.length} groups`);
+            } else {
+                console.warn('⚠️ Failed to load group summaries');
             }
-        });
-        
-        await Promise.all(promises);
-        console.log('✅ All expense counts loaded');
+        } catch (error) {
+            console.error('❌ Error loading group summaries:', error);
+        }
     }
 
     showLoadingState() {
@@ -200,7 +199,7 @@ class DashboardManager {
                     </div>
                     <div class="group-summary">
                         <span><i class="fas fa-users"></i> ${group.members?.length || 0} members</span>
-                        <span><i class="fas fa-receipt"></i> ${group.expenses?.length || 0} expenses</span>
+                        <span><i class="fas fa-receipt"></i> ${group.summary?.expense_count ?? group.expenses?.length ?? 0} expenses</span>
                     </div>
                 </div>
             `;
@@ -208,6 +207,11 @@ class DashboardManager {
     }
 
     calculateGroupBalance(group) {
+        // Prefer the server-side summary balance when available
+        if (group.summary) {
+            return Number(group.summary.my_balance || 0);
+        }
+
         // Calculate the current user's balance in the group
         if (!group.expenses || group.expenses.length === 0) {
             return 0;
@@ -210,7 +210,18 @@ async function loadTransactions(groupId) {
         const token = localStorage.getItem('access_token');
         console.log(`📡 Loading transactions for group ${groupId}...`);
         
-        const response = await fetch(`/api/expenses/?group_id=${groupId}&limit=100`, {
+        // Date range and member are filtered server-side; search/sort stay client-side
+        const params = new URLSearchParams({ group_id: groupId, limit: 100 });
+        const startDate = getDateFilterStart();
+        if (startDate) {
+            params.set('start_date', startDate.toISOString());
+        }
+        const memberFilterEl = document.getElementById('memberFilter');
+        if (memberFilterEl && memberFilterEl.value) {
+            params.set('paid_by', memberFilterEl.value);
+        }
+        
+        const response = await fetch(`/api/expenses/?${params.toString()}`, {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
@@ -297,6 +308,33 @@ function getCurrentUserId() {
     return parseInt(localStorage.getItem('userId')) || 0;
 }
 
+// Get the start of the selected date range, or null for all time
+function getDateFilterStart() {
+    const dateFilterEl = document.getElementById('dateFilter');
+    const dateFilter = dateFilterEl ? dateFilterEl.value : 'all';
+    const now = new Date();
+    
+    switch (dateFilter) {
+        case 'today':
+            return new Date(now.getFullYear(), now.getMonth(), now.getDate());
+        case 'week':
+            return new Date(now.getFullYear(), now.getMonth(), now.getDate() - 7);
+        case 'month':
+            return new Date(now.getFullYear(), now.getMonth() - 1, now.getDate());
+        case 'quarter':
+            return new Date(now.getFullYear(), now.getMonth() - 3, now.getDate());
+        default:
+            return null;
+    }
+}
+
+// Reload from the server when a server-side filter changes
+function reloadTransactions() {
+    if (currentGroupId) {
+        loadTransactions(currentGroupId);
+    }
+}
+
 // Apply filters and display transactions
 function applyFilters() {
     let filtered = [...allTransactions];
@@ -320,30 +358,9 @@ function applyFilters() {
     }
     
     // Date filter
-    const dateFilterEl = document.getElementById('dateFilter');
-    const dateFilter = dateFilterEl ? dateFilterEl.value : 'all';
-    if (dateFilter !== 'all') {
-        const now = new Date();
-        let filterDate;
-        
-        switch (dateFilter) {
-            case 'today':
-                filterDate = new Date(now.getFullYear(), now.getMonth(), now.getDate());
-                break;
-            case 'week':
-                filterDate = new Date(now.getFullYear(), now.getMonth(), now.getDate() - 7);
-                break;
-            case 'month':
-                filterDate = new Date(now.getFullYear(), now.getMonth() - 1, now.getDate());
-                break;
-            case 'quarter':
-                filterDate = new Date(now.getFullYear(), now.getMonth() - 3, now.getDate());
-                break;
-        }
-        
-        if (filterDate) {
-            filtered = filtered.filter(tx => new Date(tx.date || tx.created_at) >= filterDate);
-        }
+    const filterDate = getDateFilterStart();
+    if (filterDate) {
+        filtered = filtered.filter(tx => new Date(tx.date || tx.created_at) >= filterDate);
     }
     
     // Member filter
@@ -623,8 +640,8 @@ function initializeFilters() {
 
     if (searchInput) searchInput.addEventListener('input', applyFilters);
     if (categoryFilter) categoryFilter.addEventListener('change', applyFilters);
-    if (dateFilter) dateFilter.addEventListener('change', applyFilters);
-    if (memberFilter) memberFilter.addEventListener('change', applyFilters);
+    if (dateFilter) dateFilter.addEventListener('change', reloadTransactions);
+    if (memberFilter) memberFilter.addEventListener('change', reloadTransactions);
     if (sortBy) sortBy.addEventListener('change', applyFilters);
 }
 
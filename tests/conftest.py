@@ -0,0 +1,79 @@
+"""Shared test setup.
+
+Settings are read from the environment when ``src.spendly`` is first
+imported, so the test environment is set here, before anything imports the
+app: a scratch SQLite database, no Gemini key (the SDK must stay unloaded)
+and no rate limits. Run from the repository root with ``python -m pytest``.
+"""
+
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="spendly-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["RATE_LIMIT_ENABLED"] = "False"
+os.environ["LOG_LEVEL"] = "WARNING"
+os.environ.pop("SHARD_COUNT", None)
+os.environ.pop("METRICS_MULTIPROCESS_DIR", None)
+
+from typing import Any, AsyncIterator, Dict
+
+import httpx
+import pytest
+import pytest_asyncio
+
+pytest_plugins = ["src.spendly.testing"]
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The application, on a freshly created schema."""
+    from src.spendly.app import create_app
+    from src.spendly.core.database import ensure_schema
+
+    ensure_schema()
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+def seeded(app) -> Dict[str, Any]:
+    """Three users sharing one group with a few expenses; returns their IDs and tokens."""
+    from src.spendly.core.database import SessionLocal
+    from src.spendly.models import Group, GroupMember, User
+    from src.spendly.services.auth import AuthService
+    from src.spendly.services.crud import CRUDService
+
+    db = SessionLocal()
+    try:
+        users = [User(name=name, email=f"{name.lower()}@example.com", hashed_password="x")
+                 for name in ("Alice", "Bob", "Carol")]
+        group = Group(name="Trip")
+        db.add_all([*users, group])
+        db.flush()
+        db.add_all(GroupMember(group_id=group.id, user_id=user.id) for user in users)
+        db.commit()
+        for index, amount in enumerate((30.0, 45.0, 12.0, 60.0)):
+            CRUDService.create_expense(db, {
+                "description": f"expense {index}",
+                "amount": amount,
+                "paid_by": users[index % len(users)].id,
+                "group_id": group.id,
+                "split_among": "all",
+                "recorded_by": users[index % len(users)].id,
+            }, f"seed {index}")
+        return {
+            "group_id": group.id,
+            "user_ids": [user.id for user in users],
+            "headers": {"Authorization": f"Bearer {AuthService.create_user_token(users[0])}"},
+        }
+    finally:
+        db.close()
+
+
+@pytest_asyncio.fixture
+async def client(app, seeded) -> AsyncIterator[httpx.AsyncClient]:
+    """An HTTP client calling the app in the test's own context, so query_stats sees its statements."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+        yield http_client
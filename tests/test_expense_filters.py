@@ -0,0 +1,31 @@
+"""Description prefix filtering of the expense list."""
+
+import pytest
+
+from src.spendly.services.crud import CRUDService
+
+
+@pytest.mark.parametrize("prefix, bound", [
+    ("expense", "expensf"),
+    ("a\U0010FFFF\U0010FFFF", "b"),
+    ("\U0010FFFF", None),
+    ("\uD7FF", "\uE000"),  # Surrogates are skipped
+])
+def test_prefix_upper_bound(prefix, bound):
+    assert CRUDService._prefix_upper_bound(prefix) == bound
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prefix, matches", [
+    ("expense ", True),
+    ("Expense ", False),  # Case-sensitive
+    ("expense \U0010FFFF", False),
+    ("\U0010FFFF", False),
+])
+async def test_expense_list_description_prefix(client, seeded, prefix, matches):
+    response = await client.get("/api/expenses/", headers=seeded["headers"],
+                                params={"group_id": seeded["group_id"], "description_prefix": prefix})
+    assert response.status_code == 200, response.text
+    descriptions = [expense["description"] for expense in response.json()]
+    assert all(description.startswith(prefix) for description in descriptions)
+    assert bool(descriptions) == matches
@@ -0,0 +1,49 @@
+"""Retries of Gemini parse calls."""
+
+import pytest
+from google.api_core import exceptions
+
+from src.spendly.core.config import settings
+from src.spendly.services.gemini import GeminiService
+
+pytestmark = pytest.mark.asyncio
+
+
+class FailingModel:
+    """Raises the given error on every call, counting the calls."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    async def generate_content_async(self, prompt: str):
+        self.calls += 1
+        raise self.error
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "GEMINI_RETRY_BACKOFF_SECONDS", 0)
+    return GeminiService()
+
+
+@pytest.mark.parametrize("error", [exceptions.ServiceUnavailable("down"), exceptions.ResourceExhausted("quota")])
+async def test_transient_errors_are_retried(service, error):
+    service.model = FailingModel(error)
+    call = {"retries": 0}
+    with pytest.raises(type(error)):
+        await service._generate("prompt", call)
+    assert service.model.calls == 3
+    assert call["retries"] == 2
+
+
+@pytest.mark.parametrize("error", [exceptions.InvalidArgument("bad request"), exceptions.PermissionDenied("bad key"),
+                                   RuntimeError("bug")])
+async def test_permanent_errors_are_not_retried(service, error):
+    service.model = FailingModel(error)
+    call = {"retries": 0}
+    with pytest.raises(type(error)):
+        await service._generate("prompt", call)
+    assert service.model.calls == 1
+    assert call["retries"] == 0
@@ -0,0 +1,77 @@
+"""Ledger journal entries written by the API."""
+
+import json
+
+import pytest
+
+from src.spendly.core.database import SessionLocal
+from src.spendly.models import Expense, ExpenseSplit, Group, LedgerEvent
+from src.spendly.services.gemini import get_gemini_service
+from src.spendly.services.ledger import LedgerService
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class StubModel:
+    """Answers every prompt with the same parsed expense."""
+
+    def __init__(self, parsed: dict):
+        self.parsed = parsed
+
+    async def generate_content_async(self, prompt: str) -> StubResponse:
+        return StubResponse(json.dumps(self.parsed))
+
+
+@pytest.mark.asyncio
+async def test_chat_expense_journal_records_the_sender(client, seeded, monkeypatch):
+    monkeypatch.setattr(get_gemini_service(), "model", StubModel({
+        "description": "lunch",
+        "amount": 30.0,
+        "paid_by": "me",
+        "expense_type": "split",
+        "splits": [{"user": "me", "amount": 30.0}],
+    }))
+    response = await client.post("/api/expenses/", headers=seeded["headers"],
+                                 json={"message": "I paid $30 for lunch", "group_id": seeded["group_id"]})
+    assert response.status_code == 200
+    assert response.json()["success"], response.json()["message"]
+
+    db = SessionLocal()
+    try:
+        event = db.query(LedgerEvent).filter(LedgerEvent.expense_id == response.json()["expense"]["id"]).one()
+    finally:
+        db.close()
+    assert event.event_type == "expense_added"
+    assert event.user_id == seeded["user_ids"][0]
+
+
+def test_backfill_journals_only_groups_without_events(seeded):
+    db = SessionLocal()
+    try:
+        # A group whose expenses predate the journal, next to the seeded, journaled one
+        group = Group(name="Before the journal")
+        db.add(group)
+        db.flush()
+        for amount in (10.0, 20.0):
+            expense = Expense(description="old", amount=amount, paid_by=seeded["user_ids"][0], group_id=group.id)
+            db.add(expense)
+            db.flush()
+            db.add(ExpenseSplit(expense_id=expense.id, user_id=seeded["user_ids"][1], amount=amount))
+        db.commit()
+        journaled_before = db.query(LedgerEvent).filter(LedgerEvent.group_id == seeded["group_id"]).count()
+
+        assert LedgerService.backfill_missing(db) == 1
+        assert LedgerService.backfill_missing(db) == 0
+
+        seqs = [seq for (seq,) in db.query(LedgerEvent.seq).filter(LedgerEvent.group_id == group.id)
+                .order_by(LedgerEvent.seq)]
+        assert seqs == [1, 2]
+        assert db.query(LedgerEvent).filter(LedgerEvent.group_id == seeded["group_id"]).count() == journaled_before
+        balances = {row.user_id: row.balance for row in LedgerService.get_balances(db, group.id).balances}
+        assert balances == {seeded["user_ids"][0]: 30.0, seeded["user_ids"][1]: -30.0}
+    finally:
+        db.close()
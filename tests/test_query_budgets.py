@@ -0,0 +1,59 @@
+"""SQL statement budgets of hot endpoints.
+
+Each endpoint is requested twice: the first request warms the per-process
+caches (principals, users, groups, memberships) and the statements of the
+second, the steady state, are held to the budget.
+"""
+
+import httpx
+import pytest
+
+from src.spendly.app import create_app
+from src.spendly.core.config import Settings
+
+pytestmark = pytest.mark.asyncio
+
+EXPENSE_LIST_BUDGET = 4
+GROUP_SUMMARY_BUDGET = 1
+BALANCES_BUDGET = 2
+
+
+async def get_warm(client, query_stats, url, headers, **params):
+    """GET ``url`` once to warm caches, then again with the statement count reset."""
+    for _ in range(2):
+        query_stats.reset()
+        response = await client.get(url, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+    return response
+
+
+async def test_expense_list_budget(client, seeded, query_stats):
+    response = await get_warm(client, query_stats, "/api/expenses/", seeded["headers"],
+                              group_id=seeded["group_id"], limit=50)
+    assert len(response.json()) >= 4  # Other tests may add expenses to the shared group
+    query_stats.assert_at_most(EXPENSE_LIST_BUDGET)
+
+
+async def test_group_summaries_budget(client, seeded, query_stats):
+    response = await get_warm(client, query_stats, "/api/groups/summary", seeded["headers"])
+    assert [summary["group_id"] for summary in response.json()] == [seeded["group_id"]]
+    query_stats.assert_at_most(GROUP_SUMMARY_BUDGET)
+
+
+async def test_balances_budget(client, seeded, query_stats):
+    response = await get_warm(client, query_stats, f"/api/groups/{seeded['group_id']}/balances",
+                              seeded["headers"])
+    assert abs(sum(balance["balance"] for balance in response.json()["balances"])) < 0.01
+    query_stats.assert_at_most(BALANCES_BUDGET)
+
+
+async def test_query_count_header(seeded):
+    debug_settings = Settings()
+    debug_settings.QUERY_STATS_ENABLED = True
+    transport = httpx.ASGITransport(app=create_app(debug_settings))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/expenses/", headers=seeded["headers"],
+                                    params={"group_id": seeded["group_id"]})
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) >= 1
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
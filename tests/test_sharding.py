@@ -0,0 +1,186 @@
+"""Statement routing, cross-shard queries and group moves over two temporary shards.
+
+The test session itself is unsharded, so these tests build their own router
+and sessions over temporary databases. Their users and groups get IDs from
+900 up, clear of the seeded ones, because the query caches are per process.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import sessionmaker
+
+from src.spendly.core.sharding import (
+    CATALOG, SHARD_MAP_TABLES, SHARD_TABLES, GroupMovingError, ShardRouter, inspect_statement
+)
+from src.spendly.models import (
+    Base, DailySpendingRollup, Expense, ExpenseSplit, Group, GroupMember, GroupWriteFreeze, LedgerEvent, User
+)
+from src.spendly.schemas import ExpenseFilter
+from src.spendly.services import shards as shard_service
+from src.spendly.services.crud import CRUDService
+from src.spendly.services.ledger import LedgerService
+from src.spendly.services.shards import ShardRebalanceService
+
+USER_IDS = [901, 902]
+GROUP_ON_SHARD_0 = 902  # group_id % 2
+GROUP_ON_SHARD_1 = 901
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    """A catalog, a shard map and two shards; returns a router factory and its engines."""
+    def sqlite(name):
+        return create_engine(f"sqlite:///{tmp_path / name}.db", connect_args={"check_same_thread": False})
+
+    catalog, map_engine = sqlite("catalog"), sqlite("shardmap")
+    shard_engines = {"shard_0": sqlite("shard0"), "shard_1": sqlite("shard1")}
+    tables = Base.metadata.sorted_tables
+    Base.metadata.create_all(catalog, tables=[table for table in tables
+                                              if table.name not in SHARD_TABLES | SHARD_MAP_TABLES])
+    Base.metadata.create_all(map_engine, tables=[table for table in tables if table.name in SHARD_MAP_TABLES])
+    for shard_engine in shard_engines.values():
+        Base.metadata.create_all(shard_engine, tables=[table for table in tables if table.name in SHARD_TABLES])
+
+    def make_sessions(placement_ttl=60.0):
+        router = ShardRouter(map_engine, catalog, shard_engines, placement_ttl=placement_ttl, id_block_size=10)
+        sessions = sessionmaker(class_=ShardedSession, shards={CATALOG: catalog, **shard_engines},
+                                expire_on_commit=False, **router.session_options())
+        return router, sessions
+
+    router, sessions = make_sessions()
+    db = sessions()
+    db.add_all(User(id=user_id, name=f"User {user_id}", email=f"{user_id}@example.com", hashed_password="x")
+               for user_id in USER_IDS)
+    db.add_all(Group(id=group_id, name=f"Group {group_id}") for group_id in (GROUP_ON_SHARD_0, GROUP_ON_SHARD_1))
+    db.add_all(GroupMember(group_id=group_id, user_id=user_id)
+               for group_id in (GROUP_ON_SHARD_0, GROUP_ON_SHARD_1) for user_id in USER_IDS)
+    db.commit()
+    db.close()
+    yield {"router": router, "sessions": sessions, "make_sessions": make_sessions,
+           "map": map_engine, "shards": shard_engines}
+    for bind in [catalog, map_engine, *shard_engines.values()]:
+        bind.dispose()
+
+
+def add_expense(db, group_id, amount, description="dinner"):
+    return CRUDService.create_expense(db, {
+        "description": description,
+        "amount": amount,
+        "paid_by": USER_IDS[0],
+        "group_id": group_id,
+        "split_among": "all",
+    })
+
+
+def group_expense_count(shard_engine, group_id):
+    with shard_engine.connect() as connection:
+        return len(connection.execute(select(Expense.id).where(Expense.group_id == group_id)).all())
+
+
+def test_inspect_statement_finds_tables_and_groups():
+    assert inspect_statement(select(Expense).where(Expense.group_id == 5)) == ({"expenses"}, {5})
+    assert inspect_statement(select(Expense).where(Expense.group_id.in_([1, 2]))) == ({"expenses"}, {1, 2})
+    assert inspect_statement(
+        select(ExpenseSplit).join(Expense, Expense.id == ExpenseSplit.expense_id).where(Expense.group_id == 3)
+    ) == ({"expense_splits", "expenses"}, {3})
+    # Only a shard table's group_id restricts a statement
+    assert inspect_statement(select(Expense).where(Expense.paid_by == 5)) == ({"expenses"}, set())
+    assert inspect_statement(select(GroupMember).where(GroupMember.group_id == 4)) == ({"group_members"}, set())
+    # The ledger's INSERT names its group in the seq subquery
+    next_seq = select(LedgerEvent.seq).where(LedgerEvent.group_id == 7).scalar_subquery()
+    statement = insert(LedgerEvent).values(group_id=7, seq=next_seq, event_type="expense_added", payload="{}")
+    assert inspect_statement(statement) == ({"ledger_events"}, {7})
+
+
+def test_statements_route_to_the_group_shard(sharded):
+    db = sharded["sessions"]()
+    try:
+        expense = add_expense(db, GROUP_ON_SHARD_1, 40.0)
+        assert group_expense_count(sharded["shards"]["shard_1"], GROUP_ON_SHARD_1) == 1
+        assert group_expense_count(sharded["shards"]["shard_0"], GROUP_ON_SHARD_1) == 0
+        assert sharded["router"].shard_for_expense(expense.id) == "shard_1"
+
+        found = db.query(Expense).filter(Expense.group_id == GROUP_ON_SHARD_1).all()
+        assert [row.id for row in found] == [expense.id]
+        with pytest.raises(ValueError, match="joins catalog tables"):
+            db.execute(select(Expense).join(User, User.id == Expense.paid_by))
+    finally:
+        db.close()
+
+
+def test_query_expenses_merges_and_pages_across_shards(sharded):
+    db = sharded["sessions"]()
+    try:
+        start = datetime(2026, 1, 1)
+        for index in range(10):
+            group_id = GROUP_ON_SHARD_0 if index % 3 else GROUP_ON_SHARD_1
+            db.add(Expense(description=f"expense {index}", amount=10.0 + index, paid_by=USER_IDS[0],
+                           group_id=group_id, created_at=start + timedelta(hours=index)))
+        db.commit()
+        filters = ExpenseFilter(group_ids=[GROUP_ON_SHARD_0, GROUP_ON_SHARD_1])
+
+        pages = [CRUDService.query_expenses(db, filters, skip=skip, limit=4) for skip in (0, 4, 8)]
+        assert [len(page) for page in pages] == [4, 4, 2]
+        descriptions = [expense.description for page in pages for expense in page]
+        assert descriptions == [f"expense {index}" for index in reversed(range(10))]
+        assert all(expense.payer.id == USER_IDS[0] for page in pages for expense in page)
+    finally:
+        db.close()
+
+
+def test_move_freezes_writes_while_the_group_is_copied(sharded, monkeypatch):
+    router, sessions = sharded["router"], sharded["sessions"]
+    source, target = sharded["shards"]["shard_0"], sharded["shards"]["shard_1"]
+    group_id = GROUP_ON_SHARD_0
+    db = sessions()
+    for amount in (30.0, 50.0, 20.0):
+        add_expense(db, group_id, amount)
+
+    # Another worker, whose cached placement predates the freeze
+    worker_router, worker_sessions = sharded["make_sessions"](placement_ttl=0.5)
+    worker_router.shard_for_group(group_id)
+    cached_at = time.monotonic()
+    worker_db = worker_sessions()
+
+    monkeypatch.setattr(shard_service, "shard_router", router)
+    moved = {}
+    mover = threading.Thread(target=lambda: moved.update(ShardRebalanceService.move_group(group_id, 1, 1.5)))
+    mover.start()
+    try:
+        with sharded["map"].connect() as connection:
+            while connection.execute(select(GroupWriteFreeze.group_id)).first() is None:
+                time.sleep(0.01)
+
+        with pytest.raises(GroupMovingError):
+            add_expense(db, group_id, 99.0)
+        # Until its placement expires the worker still writes to the source; the copy picks that up
+        add_expense(worker_db, group_id, 10.0, "late")
+        time.sleep(max(0.0, cached_at + 0.6 - time.monotonic()))
+        with pytest.raises(GroupMovingError):
+            add_expense(worker_db, group_id, 99.0)
+    finally:
+        mover.join()
+        worker_db.close()
+
+    assert moved["expenses"] == 4
+    assert moved["ledger_events"] == 4
+    assert group_expense_count(source, group_id) == 0
+    assert group_expense_count(target, group_id) == 4
+    with target.connect() as connection:
+        assert connection.execute(
+            select(DailySpendingRollup.id).where(DailySpendingRollup.group_id == group_id)
+        ).first() is not None
+
+    # Writes resume on the target, continuing the journal
+    add_expense(db, group_id, 40.0)
+    assert group_expense_count(target, group_id) == 5
+    events = LedgerService.get_events(db, group_id).events
+    assert [event.seq for event in events] == [1, 2, 3, 4, 5]
+    balances = {row.user_id: row.balance for row in LedgerService.get_balances(db, group_id).balances}
+    assert balances == {USER_IDS[0]: 75.0, USER_IDS[1]: -75.0}
+    db.close()
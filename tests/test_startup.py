@@ -0,0 +1,17 @@
+"""Import-time and startup budget."""
+
+from benchmarks.bench_startup import DEFAULT_BUDGET_MS, violations
+from src.spendly.testing import assert_startup_within
+
+
+def test_startup_within_budget():
+    assert_startup_within(DEFAULT_BUDGET_MS)
+
+
+def test_budget_violations_are_reported():
+    results = {"import_ms": 900.0, "create_ms": 700.0, "lazy_modules_imported": []}
+    assert violations(results, 2000.0) == []
+    assert len(violations(results, 1500.0)) == 1
+
+    results["lazy_modules_imported"] = ["google.generativeai"]
+    assert any("google.generativeai" in problem for problem in violations(results, 2000.0))